@@ -1,20 +1,39 @@
 import os
 import shutil
+import threading
 import time
+from datetime import datetime
 from pathlib import Path
 
 from .activation import get_device_id, verify_activation
 from .config import BASE_DIR
 from .constants import SettingKeys
-from .database import get_setting, set_setting, get_all_settings
+from .database import (
+    get_all_settings,
+    get_setting,
+    get_settings_version,
+    get_video_task,
+    iter_video_tasks,
+    set_setting,
+    set_settings,
+    update_video_task,
+)
+from .jobs import JOB_DONE, job_registry
 from .logger import logger
 from .services.media_generation import (
     ImageGenerationRequest,
     VideoGenerationRequest,
+    generate_tracked,
     media_generation_registry,
 )
+from .services.downloader import VIDEO_SEGMENTS, download_file
+from .services.provider_health import provider_health
+from .services.rate_limiter import rate_limiters
+from .services.result_cache import get_result_cache, make_cache_key
+from .thread_pool import get_download_pool_stats, submit_download
 from .services.nanobanana import NanoBananaYunwu, NanoBananaGlinCustom, NanoBananaXiaobanshou
 from .services.sora2 import Sora2Dayangyu, Sora2Xiaobanshou, Sora2Bandianwa
+from .task_events import task_events
 
 
 def get_default_download_dir() -> Path:
@@ -36,6 +55,36 @@ def get_media_download_dir(kind: str) -> Path:
     return download_dir
 
 
+# 批量下载进度（同一时间只允许一个批量下载）
+_bulk_download_lock = threading.Lock()
+_bulk_download_state = {"running": False, "total": 0, "done": 0, "failed": 0}
+
+
+def _parse_int(value, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _image_result_payload(mime_type: str, file_path: str = "", result=None) -> dict:
+    """图片结果回传前端的字段：已落盘时只给路径和 file:// 地址，由 WebView 直接加载文件；
+    未落盘（不下载）时才把 base64 内联进 JS 桥接消息"""
+    payload = {"mime_type": mime_type}
+    if file_path:
+        payload["file_path"] = file_path
+        payload["file_url"] = Path(file_path).resolve().as_uri()
+    elif result is not None:
+        payload["image_data"] = result.image_data
+    return payload
+
+
+def _update_task(task_id: int, **fields) -> None:
+    """写库并通知界面；任务已被删除（没有行被更新）时不发布事件"""
+    if update_video_task(task_id, **fields):
+        task_events.publish_update(task_id, **fields)
+
+
 def _is_winerror_32(exc: Exception) -> bool:
     if getattr(exc, "winerror", None) == 32:
         return True
@@ -108,19 +157,34 @@ class Api:
             image_size=image_size,
             download_dir=self._resolve_download_dir("image") if download else None,
         )
-        result = generator.generate(request, settings)
+        cache = get_result_cache(settings, get_download_root_dir()) if download else None
+        cache_key = ""
+        if cache:
+            cache_key = make_cache_key(
+                "image", resolved_platform, resolved_provider, prompt, request.ref_images,
+                aspect_ratio=aspect_ratio, image_size=image_size,
+            )
+            cached = cache.get(cache_key)
+            if cached:
+                file_path = cache.materialize(cached, request.download_dir, resolved_platform)
+                return {
+                    "ok": True,
+                    **_image_result_payload(cached.mime_type, file_path),
+                    "cached": True,
+                    **response_meta,
+                }
+
+        result = generate_tracked(generator, request, settings)
         if not result.success:
             return {"ok": False, "msg": result.error_message or "图片生成失败", **response_meta}
+        if cache and result.file_path:
+            cache.put(cache_key, result.file_path, mime_type=result.mime_type)
 
-        response = {
+        return {
             "ok": True,
-            "image_data": result.image_data,
-            "mime_type": result.mime_type,
+            **_image_result_payload(result.mime_type, result.file_path, result),
             **response_meta,
         }
-        if result.file_path:
-            response["file_path"] = result.file_path
-        return response
 
     def _generate_video_via_registry(
         self,
@@ -131,6 +195,7 @@ class Api:
         platform: str = "",
         provider: str = "",
         download: bool = True,
+        race: int = 0,
     ) -> dict:
         settings = get_all_settings()
         generator, resolved_platform, resolved_provider = media_generation_registry.resolve_video_generator(
@@ -153,9 +218,46 @@ class Api:
             duration=int(duration or settings.get(SettingKeys.SORA2_DURATION, "10") or 10),
             download_dir=self._resolve_download_dir("video") if download else None,
         )
-        result = generator.generate(request, settings)
+        cache = get_result_cache(settings, get_download_root_dir()) if download else None
+        cache_key = ""
+        if cache:
+            cache_key = make_cache_key(
+                "video", resolved_platform, resolved_provider, prompt, request.ref_images,
+                orientation=orientation, duration=request.duration,
+            )
+            cached = cache.get(cache_key)
+            if cached:
+                return {
+                    "ok": True,
+                    "video_url": cached.video_url,
+                    "file_path": cache.materialize(cached, request.download_dir, resolved_platform),
+                    "cached": True,
+                    **response_meta,
+                }
+
+        fan_out = _parse_int(race or settings.get(SettingKeys.VIDEO_RACE_FAN_OUT), 1)
+        if fan_out > 1:
+            contestants = media_generation_registry.resolve_race_generators(
+                settings,
+                resolved_platform,
+                resolved_provider,
+                fan_out=fan_out,
+            )
+            race_result = media_generation_registry.race_video(request, settings, contestants)
+            result = race_result.result
+            response_meta["race"] = {
+                "contestants": race_result.contestants,
+                "winner": race_result.winner.key if race_result.winner else "",
+            }
+            if race_result.winner:
+                response_meta["platform"] = race_result.winner.platform
+                response_meta["provider"] = race_result.winner.provider
+        else:
+            result = generate_tracked(generator, request, settings)
         if not result.success:
             return {"ok": False, "msg": result.error_message or "视频生成失败", **response_meta}
+        if cache and result.file_path:
+            cache.put(cache_key, result.file_path, video_url=result.video_url)
 
         response = {
             "ok": True,
@@ -200,7 +302,8 @@ class Api:
         logger.info(f"[API] save_settings 调用, keys={list(settings.keys())}")
         for key, value in settings.items():
             logger.info(f"[API] save_settings: {key} = {value}")
-            set_setting(key, str(value))
+        set_settings({key: str(value) for key, value in settings.items()})
+        rate_limiters.configure_from_settings(get_all_settings(), get_settings_version())
         logger.info(f"[API] save_settings -> 保存成功, 共 {len(settings)} 项")
         return {"ok": True}
 
@@ -533,15 +636,11 @@ class Api:
             )
 
             if result.success:
-                resp = {
+                return {
                     "ok": True,
-                    "image_data": result.image_data,
-                    "mime_type": result.mime_type,
+                    **_image_result_payload(result.mime_type, result.file_path, result),
                     "text_content": result.text_content,
                 }
-                if result.file_path:
-                    resp["file_path"] = result.file_path
-                return resp
             else:
                 return {"ok": False, "msg": result.error_message}
         except Exception as e:
@@ -633,8 +732,9 @@ class Api:
         duration: int = 10,
         platform: str = "",
         provider: str = "",
+        race: int = 0,
     ) -> dict:
-        """通过注册表调用指定视频生成器。"""
+        """通过注册表调用指定视频生成器；race > 1 时同时提交到多个渠道，取最先完成者。"""
         try:
             return self._generate_video_via_registry(
                 prompt=prompt,
@@ -644,6 +744,7 @@ class Api:
                 platform=platform,
                 provider=provider,
                 download=True,
+                race=race,
             )
         except Exception as e:
             logger.error(f"[API] generate_media_video -> 异常: {e}")
@@ -671,6 +772,32 @@ class Api:
             logger.error(f"[API] veo_text_to_video -> 异常: {e}")
             return {"ok": False, "msg": str(e)}
 
+    # ==================== 后台作业 ====================
+
+    # 可作为后台作业执行的长耗时接口
+    _JOB_METHODS = {
+        "generate_media_image",
+        "generate_media_video",
+        "veo_text_to_video",
+        "veo_image_to_video",
+    }
+
+    def start_job(self, method: str, args: list = None) -> dict:
+        """以后台作业方式调用长耗时接口，立即返回 job_id；结果通过 get_job 取回"""
+        if method not in self._JOB_METHODS:
+            return {"ok": False, "msg": f"不支持的作业: {method}"}
+        job_id = job_registry.submit(method, getattr(self, method), *(args or []))
+        return {"ok": True, "job_id": job_id}
+
+    def get_job(self, job_id: str) -> dict:
+        """查询作业状态；已结束时返回接口原本的结果（取回后作业即被移除）"""
+        job = job_registry.get(job_id)
+        if job is None:
+            return {"ok": False, "msg": "作业不存在或结果已取回"}
+        if job.status != JOB_DONE:
+            return {"ok": True, "status": job.status}
+        return {"ok": True, "status": job.status, "result": job.result}
+
     def veo_image_to_video(self, prompt: str, image_base64: str, mime_type: str, orientation: str = "landscape") -> dict:
         """VEO 图生视频兼容入口，内部走统一视频生成器。"""
         logger.info(f"[API] veo_image_to_video 调用, orientation={orientation}, prompt={prompt[:50]}...")
@@ -732,7 +859,6 @@ class Api:
 
     def download_veo_video(self, video_url: str) -> dict:
         """下载 VEO 视频（优先用设置的下载路径，否则用默认 Glin 文件夹）"""
-        import requests
         from datetime import datetime
 
         logger.info(f"[API] download_veo_video 调用, url={video_url[:80]}...")
@@ -742,30 +868,16 @@ class Api:
         except Exception as e:
             return {"ok": False, "msg": f"下载目录无法创建: {e}"}
 
-        last_err = None
-        for attempt in range(3):
-            try:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-                filename = f"veo_{timestamp}.mp4"
-                filepath = download_dir / filename
-
-                with requests.get(video_url, timeout=120, stream=True) as resp:
-                    resp.raise_for_status()
-                    with open(str(filepath), "wb") as f:
-                        for chunk in resp.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-
-                logger.info(f"[API] download_veo_video -> 保存成功: {filepath}")
-                return {"ok": True, "path": str(filepath)}
-            except Exception as e:
-                last_err = e
-                logger.warning(f"[API] download_veo_video -> 下载失败(第{attempt+1}次): {e}")
-                import time
-                if attempt < 2:
-                    time.sleep(2)
-        logger.error(f"[API] download_veo_video -> 3次重试均失败: {last_err}")
-        return {"ok": False, "msg": str(last_err)}
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        filepath = download_dir / f"veo_{timestamp}.mp4"
+        try:
+            # 下载引擎内部按已下载字节续传重试，不再整文件重下
+            download_file(video_url, filepath, segments=VIDEO_SEGMENTS, retries=3)
+        except Exception as e:
+            logger.error(f"[API] download_veo_video -> 下载失败: {e}")
+            return {"ok": False, "msg": str(e)}
+        logger.info(f"[API] download_veo_video -> 保存成功: {filepath}")
+        return {"ok": True, "path": str(filepath)}
 
     # ==================== 视频任务 ====================
 
@@ -813,33 +925,110 @@ class Api:
         logger.info("[API] set_qihao_video_prompt -> 保存成功")
         return {"ok": True}
 
-    def get_video_tasks(self) -> dict:
-        """获取所有视频任务"""
-        logger.debug("[API] get_video_tasks 调用")
-        from .database import get_video_tasks
+    @staticmethod
+    def _video_task_dict(t) -> dict:
+        return {
+            "id": t.id,
+            "image_path": t.image_path,
+            "prompt": t.prompt,
+            "status": t.status,
+            "remote_task_id": t.remote_task_id,
+            "video_url": t.video_url,
+            "video_path": t.video_path,
+            "progress": t.progress,
+            "created_at": str(t.created_at),
+            "updated_at": str(t.updated_at),
+        }
+
+    # 增量刷新时向前多取一小段时间，覆盖"先取时间戳、后提交事务"的写入
+    def get_video_tasks(self, limit: int = 0, cursor: str = "", status: str = "") -> dict:
+        """分页获取视频任务（按创建时间倒序）。
+
+        limit 为 0 时返回全部（兼容旧调用）；cursor 为上一页返回的 next_cursor；status 为空表示全部状态。
+        返回的 version 用于 get_video_task_changes 增量刷新。
+        """
+        logger.debug(f"[API] get_video_tasks 调用, limit={limit}, cursor={cursor or 'N/A'}, status={status or 'all'}")
+        from .database import count_video_tasks, get_change_cursor, list_video_tasks
         try:
-            tasks = get_video_tasks()
+            version = get_change_cursor()
+            before = None
+            if cursor:
+                created_at, _, task_id = cursor.rpartition("|")
+                before = (datetime.fromisoformat(created_at), int(task_id))
+            tasks = list_video_tasks(limit=limit or None, before=before, status=status)
+            next_cursor = ""
+            if limit and len(tasks) == limit:
+                last = tasks[-1]
+                next_cursor = f"{last.created_at.isoformat()}|{last.id}"
             logger.debug(f"[API] get_video_tasks -> 返回 {len(tasks)} 条任务")
             return {
                 "ok": True,
-                "tasks": [
-                    {
-                        "id": t.id,
-                        "image_path": t.image_path,
-                        "prompt": t.prompt,
-                        "status": t.status,
-                        "remote_task_id": t.remote_task_id,
-                        "video_url": t.video_url,
-                        "video_path": t.video_path,
-                        "created_at": str(t.created_at),
-                    }
-                    for t in tasks
-                ],
+                "tasks": [self._video_task_dict(t) for t in tasks],
+                "next_cursor": next_cursor,
+                "total": count_video_tasks(status),
+                "version": self._format_change_cursor(version),
             }
         except Exception as e:
             logger.error(f"[API] get_video_tasks -> 异常: {e}")
             return {"ok": False, "msg": str(e)}
 
+    @staticmethod
+    def _format_change_cursor(cursor: tuple) -> str:
+        changed_at, task_id = cursor
+        return f"{changed_at.isoformat()}|{task_id}"
+
+    def get_video_task_changes(self, version: str, status: str = "") -> dict:
+        """获取 version 之后有变化的任务（不按状态过滤，界面据此更新或移出当前列表）。
+
+        version 是形如 "updated_at|id" 的变更游标，取自上一次 get_video_tasks / get_video_task_changes 的返回值；
+        deleted 为期间删除的任务 ID；reload 为 True 时（期间清空过任务，或 version 早于墓碑保留期）界面应整页重新加载。
+        """
+        from .database import (
+            TOMBSTONE_RETENTION,
+            count_video_tasks,
+            get_change_cursor,
+            get_video_tasks_changed_since,
+            get_video_tasks_deleted_since,
+        )
+        try:
+            changed_at, _, task_id = version.rpartition("|")
+            cursor = (datetime.fromisoformat(changed_at), int(task_id))
+            # 水位在查询之前取得：水位之前的写入都已提交，一定出现在本次结果里
+            new_version = get_change_cursor()
+            tasks = get_video_tasks_changed_since(cursor)
+            deleted = get_video_tasks_deleted_since(cursor[0])
+            reload = 0 in deleted or cursor[0] < new_version[0] - TOMBSTONE_RETENTION
+            if tasks:
+                new_version = max(new_version, (tasks[-1].updated_at, tasks[-1].id))
+            return {
+                "ok": True,
+                "tasks": [self._video_task_dict(t) for t in tasks],
+                "deleted": [task_id for task_id in deleted if task_id],
+                "reload": reload,
+                "total": count_video_tasks(status),
+                "version": self._format_change_cursor(new_version),
+            }
+        except Exception as e:
+            logger.error(f"[API] get_video_task_changes -> 异常: {e}")
+            return {"ok": False, "msg": str(e)}
+
+    def get_provider_health(self) -> dict:
+        """获取各生成渠道的健康度与熔断状态"""
+        return {"ok": True, "data": provider_health.snapshot()}
+
+    def get_rate_limits(self) -> dict:
+        """获取各主机的限流配置与排队请求数"""
+        return {"ok": True, "data": rate_limiters.snapshot()}
+
+    def get_video_queue_status(self) -> dict:
+        """获取视频任务调度状态（排队数 / 执行中 / 最大并发）"""
+        from .video_scanner import get_dispatch_status
+        try:
+            return {"ok": True, **get_dispatch_status()}
+        except Exception as e:
+            logger.error(f"[API] get_video_queue_status -> 异常: {e}")
+            return {"ok": False, "msg": str(e)}
+
     def create_video_task(self, image_base64: str, mime_type: str, prompt: str) -> dict:
         """手动创建视频任务"""
         logger.info(f"[API] create_video_task 调用, mime={mime_type}, prompt={prompt[:50]}...")
@@ -860,16 +1049,78 @@ class Api:
             logger.debug(f"[API] create_video_task -> 图片已保存: {filepath}")
 
             from .database import create_video_task as db_create
+            from .video_scanner import enqueue_video_task
             task = db_create(image_path=str(filepath), prompt=prompt)
+            task_events.publish(task.id, "created", status=task.status)
+            enqueue_video_task(task.id)
             logger.info(f"[API] create_video_task -> 成功, id={task.id}, image={filename}")
             return {"ok": True, "task_id": task.id}
         except Exception as e:
             logger.error(f"[API] create_video_task -> 异常: {e}")
             return {"ok": False, "msg": str(e)}
 
-    def auto_create_video_task(self, image_base64: str, mime_type: str) -> dict:
-        """图片生成完毕后自动创建视频任务"""
-        logger.info(f"[API] auto_create_video_task 调用, mime={mime_type}")
+    _BATCH_IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
+
+    def create_video_tasks_batch(self, paths: list = None, folder: str = "", prompt_template: str = "") -> dict:
+        """批量创建视频任务：按本地路径（或文件夹内全部图片）导入，单个事务写入数据库。
+
+        图片以硬链接（跨盘时复制）的方式放入 DATA_DIR/images，不经过 base64 桥接；
+        提示词模板支持 {name}（文件名，不含扩展名）和 {index}（从 1 开始的序号），留空时使用视频提示词设置。
+        """
+        import uuid
+        from .config import DATA_DIR
+        from .database import create_video_tasks
+        from .video_scanner import enqueue_video_task
+
+        sources = [Path(path) for path in (paths or []) if path]
+        if folder:
+            folder_path = Path(folder)
+            if not folder_path.is_dir():
+                return {"ok": False, "msg": f"文件夹不存在: {folder}"}
+            sources.extend(sorted(
+                path for path in folder_path.iterdir()
+                if path.is_file() and path.suffix.lower() in self._BATCH_IMAGE_SUFFIXES
+            ))
+        logger.info(f"[API] create_video_tasks_batch 调用, 图片数={len(sources)}, folder={folder or 'N/A'}")
+        if not sources:
+            return {"ok": False, "msg": "未找到图片文件"}
+
+        template = prompt_template or get_setting(SettingKeys.VIDEO_PROCESS_PROMPT) or self._DEFAULT_VIDEO_PROMPT
+        images_dir = DATA_DIR / "images"
+        images_dir.mkdir(exist_ok=True)
+        rows = []
+        skipped = []
+        try:
+            for source in sources:
+                if not source.is_file() or source.suffix.lower() not in self._BATCH_IMAGE_SUFFIXES:
+                    skipped.append(str(source))
+                    continue
+                target = images_dir / f"{uuid.uuid4().hex}{source.suffix.lower()}"
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copyfile(source, target)
+                prompt = template.replace("{name}", source.stem).replace("{index}", str(len(rows) + 1))
+                rows.append({"image_path": str(target), "prompt": prompt})
+
+            task_ids = create_video_tasks(rows)
+        except Exception as e:
+            for row in rows:
+                Path(row["image_path"]).unlink(missing_ok=True)
+            logger.error(f"[API] create_video_tasks_batch -> 异常: {e}")
+            return {"ok": False, "msg": str(e)}
+
+        for task_id in task_ids:
+            task_events.publish(task_id, "created", status="pending")
+            enqueue_video_task(task_id)
+        if skipped:
+            logger.warning(f"[API] create_video_tasks_batch -> 跳过 {len(skipped)} 个非图片或不存在的文件")
+        logger.info(f"[API] create_video_tasks_batch -> 成功, 共 {len(task_ids)} 个任务")
+        return {"ok": True, "task_ids": task_ids, "skipped": skipped}
+
+    def auto_create_video_task(self, image_base64: str, mime_type: str, image_path: str = "") -> dict:
+        """图片生成完毕后自动创建视频任务；传入 image_path（已落盘的生成结果）时直接复制文件，不经过 base64"""
+        logger.info(f"[API] auto_create_video_task 调用, mime={mime_type}, path={image_path or '-'}")
         import base64
         import os
         import uuid
@@ -881,14 +1132,22 @@ class Api:
             images_dir.mkdir(exist_ok=True)
             ext_map = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp", "image/gif": ".gif"}
             ext = ext_map.get(mime_type or "", ".png")
-            filename = f"{uuid.uuid4().hex}{ext}"
+            source = Path(image_path) if image_path else None
+            if source and not source.is_file():
+                source = None
+            filename = f"{uuid.uuid4().hex}{source.suffix if source else ext}"
             filepath = images_dir / filename
-            image_data = base64.b64decode(image_base64)
-            filepath.write_bytes(image_data)
+            if source:
+                shutil.copyfile(source, filepath)
+            else:
+                filepath.write_bytes(base64.b64decode(image_base64))
             logger.debug(f"[API] auto_create_video_task -> 图片已保存: {filepath}")
 
             from .database import create_video_task as db_create
+            from .video_scanner import enqueue_video_task
             task = db_create(image_path=str(filepath), prompt=prompt)
+            task_events.publish(task.id, "created", status=task.status)
+            enqueue_video_task(task.id)
             logger.info(f"[API] auto_create_video_task -> 成功, id={task.id}, image={filename}")
             return {"ok": True, "task_id": task.id}
         except Exception as e:
@@ -900,18 +1159,66 @@ class Api:
         logger.info(f"[API] delete_video_task 调用, task_id={task_id}")
         from .database import delete_video_task as db_delete
         try:
+            if not get_video_task(task_id):
+                return {"ok": False, "msg": "任务不存在"}
             db_delete(task_id)
+            task_events.publish(task_id, "deleted")
             logger.info(f"[API] delete_video_task -> 成功, id={task_id}")
             return {"ok": True}
         except Exception as e:
             logger.error(f"[API] delete_video_task -> 异常: {e}")
             return {"ok": False, "msg": str(e)}
 
+    def _download_task_video(self, task, download_dir: Path, settings: dict) -> str:
+        """下载单个任务的成品视频并记录 video_path，返回本地路径；失败时抛出异常"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        remote_id = task.remote_task_id or ""
+
+        provider = settings.get(SettingKeys.SORA2_MODEL, "dayangyu")
+        if task.generator_key:
+            platform, _, provider = task.generator_key.partition("/")
+            if platform != "sora2":
+                provider = ""
+
+        if remote_id and provider in {"dayangyu", "xiaobanshou"}:
+            logger.info(f"[API] download_video_task -> 使用 API 下载, remote_id={remote_id}")
+            if provider == "xiaobanshou":
+                service = Sora2Xiaobanshou(settings.get(SettingKeys.XIAOBANSHOU_API_KEY, ""))
+            else:
+                service = Sora2Dayangyu(settings.get(SettingKeys.DAYANGYU_API_KEY, ""))
+
+            data, content_type, err = service.get_video_content(remote_id)
+            if err or not data:
+                logger.warning(f"[API] download_video_task -> API 下载失败: {err}，回退到 URL 下载")
+            else:
+                ext = ".mp4"
+                if content_type and "webm" in content_type:
+                    ext = ".webm"
+                elif content_type and "mov" in content_type:
+                    ext = ".mov"
+                filepath = download_dir / f"video_{task.id}_{timestamp}{ext}"
+                filepath.write_bytes(data)
+                logger.info(f"[API] download_video_task -> API 下载完成: {filepath}")
+                _update_task(task.id, video_path=str(filepath))
+                return str(filepath)
+
+        video_url = task.video_url
+        ext = ".mp4"
+        if ".webm" in video_url:
+            ext = ".webm"
+        elif ".mov" in video_url:
+            ext = ".mov"
+        filepath = download_dir / f"video_{task.id}_{timestamp}{ext}"
+
+        logger.info(f"[API] download_video_task -> 使用 URL 下载: {video_url}")
+        download_file(video_url, filepath, segments=VIDEO_SEGMENTS)
+        logger.info(f"[API] download_video_task -> URL 下载完成: {filepath}")
+
+        _update_task(task.id, video_path=str(filepath))
+        return str(filepath)
+
     def download_video_task(self, task_id: int) -> dict:
         """下载视频（优先用设置的下载路径，否则用默认 Glin 文件夹）"""
-        import requests
-        from datetime import datetime
-
         logger.info(f"[API] download_video_task 调用, task_id={task_id}")
 
         try:
@@ -920,78 +1227,97 @@ class Api:
             logger.error(f"[API] download_video_task -> 创建下载目录失败: {e}")
             return {"ok": False, "msg": f"下载目录无法创建: {e}"}
 
-        from .database import get_video_tasks, update_video_task
         try:
-            tasks = get_video_tasks()
-            task = None
-            for t in tasks:
-                if t.id == task_id:
-                    task = t
-                    break
+            task = get_video_task(task_id)
             if not task:
                 return {"ok": False, "msg": "任务不存在"}
             if not task.video_url:
                 return {"ok": False, "msg": "该任务暂无视频链接"}
+            return {"ok": True, "path": self._download_task_video(task, download_dir, get_all_settings())}
+        except Exception as e:
+            logger.error(f"[API] download_video_task -> 异常: {e}")
+            return {"ok": False, "msg": str(e)}
 
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-            remote_id = task.remote_task_id or ""
+    def download_completed_video_tasks(self, only_missing: bool = True) -> dict:
+        """批量下载所有已完成任务的视频，通过下载池并发执行；进度见 get_bulk_download_status。
 
-            settings = get_all_settings()
-            use_api_download = False
+        only_missing 为真时跳过本地文件仍存在的任务。任务按页流式读取，同时排队的下载数有上限。
+        """
+        with _bulk_download_lock:
+            if _bulk_download_state["running"]:
+                return {"ok": False, "msg": "已有批量下载正在进行"}
+            _bulk_download_state.update(running=True, total=0, done=0, failed=0)
+        try:
+            download_dir = get_media_download_dir("video")
+        except Exception as e:
+            self._finish_bulk_download()
+            return {"ok": False, "msg": f"下载目录无法创建: {e}"}
 
-            provider = settings.get(SettingKeys.SORA2_MODEL, "dayangyu")
-            if remote_id and provider in {"dayangyu", "xiaobanshou"}:
-                use_api_download = True
+        logger.info(f"[API] download_completed_video_tasks 调用, only_missing={only_missing}")
+        try:
+            threading.Thread(
+                target=self._run_bulk_download,
+                args=(download_dir, get_all_settings(), only_missing),
+                daemon=True,
+                name="BulkDownload",
+            ).start()
+        except Exception as e:
+            self._finish_bulk_download()
+            logger.error(f"[API] download_completed_video_tasks -> 异常: {e}")
+            return {"ok": False, "msg": str(e)}
+        return {"ok": True}
 
-            if use_api_download:
-                logger.info(f"[API] download_video_task -> 使用 API 下载, remote_id={remote_id}")
-                if provider == "xiaobanshou":
-                    api_key = settings.get(SettingKeys.XIAOBANSHOU_API_KEY, "")
-                    service = Sora2Xiaobanshou(api_key)
-                else:
-                    api_key = settings.get(SettingKeys.DAYANGYU_API_KEY, "")
-                    service = Sora2Dayangyu(api_key)
+    @staticmethod
+    def _finish_bulk_download() -> None:
+        with _bulk_download_lock:
+            _bulk_download_state["running"] = False
 
-                data, content_type, err = service.get_video_content(remote_id)
-                if err or not data:
-                    logger.warning(f"[API] download_video_task -> API 下载失败: {err}，回退到 URL 下载")
-                    use_api_download = False
-                else:
-                    ext = ".mp4"
-                    if content_type and "webm" in content_type:
-                        ext = ".webm"
-                    elif content_type and "mov" in content_type:
-                        ext = ".mov"
-                    filename = f"video_{task_id}_{timestamp}{ext}"
-                    filepath = download_dir / filename
-                    filepath.write_bytes(data)
-                    logger.info(f"[API] download_video_task -> API 下载完成: {filepath}")
-                    update_video_task(task_id, video_path=str(filepath))
-                    return {"ok": True, "path": str(filepath)}
-
-            video_url = task.video_url
-            ext = ".mp4"
-            if ".webm" in video_url:
-                ext = ".webm"
-            elif ".mov" in video_url:
-                ext = ".mov"
-            filename = f"video_{task_id}_{timestamp}{ext}"
-            filepath = download_dir / filename
+    def _run_bulk_download(self, download_dir: Path, settings: dict, only_missing: bool) -> None:
+        queue_limit = threading.BoundedSemaphore(max(1, get_download_pool_stats()["max_workers"]) * 2)
 
-            logger.info(f"[API] download_video_task -> 使用 URL 下载: {video_url}")
-            with requests.get(video_url, timeout=120, stream=True) as resp:
-                resp.raise_for_status()
-                with open(str(filepath), "wb") as f:
-                    for chunk in resp.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-            logger.info(f"[API] download_video_task -> URL 下载完成: {filepath}")
+        def _job(task):
+            try:
+                self._download_task_video(task, download_dir, settings)
+                key = "done"
+            except Exception as e:
+                logger.error(f"[API] 批量下载失败 id={task.id}: {e}")
+                key = "failed"
+            finally:
+                queue_limit.release()
+            with _bulk_download_lock:
+                _bulk_download_state[key] += 1
 
-            update_video_task(task_id, video_path=str(filepath))
-            return {"ok": True, "path": str(filepath)}
+        try:
+            for task in iter_video_tasks(status="completed"):
+                if not task.video_url or (only_missing and task.video_path and os.path.isfile(task.video_path)):
+                    continue
+                queue_limit.acquire()
+                try:
+                    future = submit_download(_job, task)
+                except Exception:
+                    queue_limit.release()
+                    raise
+                with _bulk_download_lock:
+                    _bulk_download_state["total"] += 1
+                if future is None:
+                    _job(task)
         except Exception as e:
-            logger.error(f"[API] download_video_task -> 异常: {e}")
-            return {"ok": False, "msg": str(e)}
+            logger.error(f"[API] 批量下载中断: {e}")
+        finally:
+            # 已提交的下载仍在运行，等它们全部结束后才允许开始下一次批量下载
+            while True:
+                with _bulk_download_lock:
+                    state = dict(_bulk_download_state)
+                    if state["done"] + state["failed"] >= state["total"]:
+                        _bulk_download_state["running"] = False
+                        break
+                time.sleep(0.2)
+            logger.info(f"[API] 批量下载结束: 成功 {state['done']} / 失败 {state['failed']} / 共 {state['total']}")
+
+    def get_bulk_download_status(self) -> dict:
+        """批量下载进度"""
+        with _bulk_download_lock:
+            return {"ok": True, **_bulk_download_state}
 
     def delete_all_video_tasks(self) -> dict:
         """删除所有视频任务"""
@@ -999,6 +1325,7 @@ class Api:
         from .database import delete_all_video_tasks as db_delete_all
         try:
             count = db_delete_all()
+            task_events.publish(0, "cleared")
             logger.info(f"[API] delete_all_video_tasks -> 成功, 共删除 {count} 条")
             return {"ok": True, "count": count}
         except Exception as e:
@@ -1008,9 +1335,17 @@ class Api:
     def retry_video_task(self, task_id: int) -> dict:
         """重试失败的视频任务（重置状态为 pending）"""
         logger.info(f"[API] retry_video_task 调用, task_id={task_id}")
-        from .database import update_video_task
+        from .video_scanner import enqueue_video_task
         try:
-            update_video_task(task_id, status='pending', video_url='', video_path='')
+            task = get_video_task(task_id)
+            if not task:
+                return {"ok": False, "msg": "任务不存在"}
+            if task.status == 'processing':
+                return {"ok": False, "msg": "任务正在处理中"}
+            _update_task(
+                task_id, status='pending', remote_task_id='', generator_key='', video_url='', video_path='', progress=0
+            )
+            enqueue_video_task(task_id)
             logger.info(f"[API] retry_video_task -> 成功, id={task_id}")
             return {"ok": True}
         except Exception as e:
@@ -1019,8 +1354,11 @@ class Api:
 
     # ==================== 图片下载 ====================
 
-    def download_image(self, image_base64: str, mime_type: str, filename_prefix: str = "image") -> dict:
-        """将 base64 图片保存（优先用设置的下载路径，否则用默认 Glin 文件夹）"""
+    def download_image(self, image_base64: str, mime_type: str, filename_prefix: str = "image", source_path: str = "") -> dict:
+        """将 base64 图片保存（优先用设置的下载路径，否则用默认 Glin 文件夹）。
+
+        source_path 为已落盘的生成结果时直接复制文件；文件本就在下载目录中则原样返回。
+        """
         import base64
         from datetime import datetime
 
@@ -1034,12 +1372,20 @@ class Api:
         try:
             ext_map = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp", "image/gif": ".gif"}
             ext = ext_map.get(mime_type or "", ".png")
+            source = Path(source_path) if source_path else None
+            if source and not source.is_file():
+                source = None
+            if source and source.resolve().parent == download_dir.resolve():
+                logger.info(f"[API] download_image -> 已在下载目录: {source}")
+                return {"ok": True, "path": str(source)}
+
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-            filename = f"{filename_prefix}_{timestamp}{ext}"
+            filename = f"{filename_prefix}_{timestamp}{source.suffix if source else ext}"
             filepath = download_dir / filename
-
-            image_data = base64.b64decode(image_base64)
-            filepath.write_bytes(image_data)
+            if source:
+                shutil.copyfile(source, filepath)
+            else:
+                filepath.write_bytes(base64.b64decode(image_base64))
             logger.info(f"[API] download_image -> 保存成功: {filepath}")
             return {"ok": True, "path": str(filepath)}
         except Exception as e:
@@ -1295,7 +1641,6 @@ class Api:
         import os
         import base64
         import tempfile
-        import time
         from datetime import datetime
         from pathlib import Path
 
@@ -1307,6 +1652,7 @@ class Api:
             from .services.nanobanana import NanoBananaYunwu, NanoBananaGlinCustom, NanoBananaXiaobanshou
             from .services.veo import VeoHetang, VeoXiaobanshou, VeoZyg, VeoChaowen, VeoHolo, VeoCatking
             from .services.sora2 import Sora2Dayangyu, Sora2Xiaobanshou, Sora2Bandianwa, Sora2TaskStatus
+            from .services.media_generation import _poll_sora_task
             from .services.veo.utils import download_video
 
             settings = get_all_settings()
@@ -1350,12 +1696,7 @@ class Api:
                     )
                     if not result.success:
                         return {"ok": False, "msg": result.error_message}
-                    return {
-                        "ok": True,
-                        "file_path": result.file_path,
-                        "preview_b64": result.image_data,
-                        "mime_type": result.mime_type,
-                    }
+                    return {"ok": True, **_image_result_payload(result.mime_type, result.file_path, result)}
 
                 # ── VEO ──
                 if channel_key == "veo_hetang":
@@ -1458,12 +1799,7 @@ class Api:
                     if not video_url:
                         if not task.task_id:
                             return {"ok": False, "msg": "未返回任务 ID"}
-                        deadline = time.time() + 900
-                        while time.time() < deadline:
-                            task = sora.query_task(task.task_id)
-                            if task.status in (Sora2TaskStatus.COMPLETED, Sora2TaskStatus.FAILED):
-                                break
-                            time.sleep(5)
+                        task = _poll_sora_task(sora, task.task_id) or task
                         if task.status != Sora2TaskStatus.COMPLETED or not task.video_url:
                             return {"ok": False, "msg": task.error_message or "任务未完成"}
                         video_url = task.video_url
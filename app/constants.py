@@ -86,5 +86,18 @@ class SettingKeys:
     QIHAO_VIDEO_PROMPT = "qihao_video_prompt"
     # 线程池大小
     THREAD_POOL_SIZE = "thread_pool_size"
+    # 下载池大小（同时下载的成品数）
+    DOWNLOAD_POOL_SIZE = "download_pool_size"
+    # 任务状态推送间隔（毫秒）
+    TASK_EVENT_INTERVAL_MS = "task_event_interval_ms"
+    # 生成结果缓存
+    RESULT_CACHE_ENABLED = "result_cache_enabled"
+    RESULT_CACHE_MAX_MB = "result_cache_max_mb"
+    # 按主机限流：默认每分钟请求数 / 最大并发，及按主机覆盖（每行 "主机 rpm 并发"）
+    RATE_LIMIT_RPM = "rate_limit_rpm"
+    RATE_LIMIT_MAX_IN_FLIGHT = "rate_limit_max_in_flight"
+    RATE_LIMIT_OVERRIDES = "rate_limit_overrides"
+    # 视频竞速：同时提交的渠道数
+    VIDEO_RACE_FAN_OUT = "video_race_fan_out"
     # 主题
     THEME = "theme"
@@ -1,15 +1,30 @@
 import datetime
-from typing import List, Optional
+import threading
+from typing import Dict, Iterator, List, Optional
 
 from peewee import (
-    SqliteDatabase, Model, CharField, AutoField, DateTimeField
+    SqliteDatabase, Model, CharField, AutoField, DateTimeField, IntegerField
 )
 
 from .config import DB_PATH
 from .logger import logger
 
-# 数据库连接
-db = SqliteDatabase(str(DB_PATH))
+# 连接参数：扫描器、线程池工作线程和 pywebview API 线程会同时写任务表
+# - WAL：读写互不阻塞，写事务只追加日志，不再整库加锁
+# - busy_timeout：遇到写锁时等待而不是立刻抛出 "database is locked"
+# - synchronous=NORMAL：WAL 模式下只在检查点时 fsync，掉电最多丢失最后几个事务，不会损坏数据库
+# - mmap / cache：读任务列表时少走系统调用
+DB_PRAGMAS = {
+    "journal_mode": "wal",
+    "busy_timeout": 5000,
+    "synchronous": "normal",
+    "mmap_size": 64 * 1024 * 1024,
+    "cache_size": -8000,
+    "temp_store": "memory",
+}
+
+# peewee 为每个线程维护独立连接（thread_safe），新连接建立时应用 DB_PRAGMAS
+db = SqliteDatabase(str(DB_PATH), pragmas=DB_PRAGMAS, timeout=5, thread_safe=True)
 
 
 class BaseModel(Model):
@@ -27,11 +42,43 @@ class VideoTask(BaseModel):
     id = AutoField()
     image_path = CharField(default='')
     prompt = CharField(default='')
-    status = CharField(default='pending')  # pending / processing / completed / failed
-    remote_task_id = CharField(default='')  # 远程 Sora2 任务 ID
+    status = CharField(default='pending', index=True)  # pending / processing / completed / failed
+    remote_task_id = CharField(default='')  # 远程任务 ID（提交后立即写入，重启时据此续查）
+    generator_key = CharField(default='')  # 提交该远程任务的生成器，形如 sora2/dayangyu
     video_url = CharField(default='')
     video_path = CharField(default='')
-    created_at = DateTimeField(default=datetime.datetime.now)
+    progress = IntegerField(default=0)  # 远程任务进度（0-100），供应商不提供时保持 0
+    created_at = DateTimeField(default=datetime.datetime.now, index=True)
+    updated_at = DateTimeField(default=datetime.datetime.now)  # 每次更新时刷新，供界面增量拉取
+
+
+class DeletedVideoTask(BaseModel):
+    """已删除视频任务的墓碑记录：增量刷新查不到已删除的行，靠它告诉界面移除；task_id 为 0 表示清空全部"""
+    id = AutoField()
+    task_id = IntegerField()
+    deleted_at = DateTimeField(default=datetime.datetime.now, index=True)
+
+
+# 墓碑保留时长；增量刷新的起点早于这个窗口时界面应整页重新加载
+TOMBSTONE_RETENTION = datetime.timedelta(days=1)
+
+# 任务表的 updated_at 与墓碑表的 deleted_at 在 _change_lock 内分配，并在释放锁之前提交：
+# 时间戳顺序与提交顺序一致且严格递增，增量刷新用 (updated_at, id) 游标续读不会漏掉晚提交的写入
+_change_lock = threading.RLock()
+_last_change_at = datetime.datetime.min
+
+
+def _next_change_at() -> datetime.datetime:
+    """分配下一个变更时间戳（调用方须持有 _change_lock）；同一时钟刻度内或时钟回拨时顺延 1 微秒"""
+    global _last_change_at
+    _last_change_at = max(datetime.datetime.now(), _last_change_at + datetime.timedelta(microseconds=1))
+    return _last_change_at
+
+
+def get_change_cursor() -> tuple:
+    """当前变更水位 (时间戳, 0)：之前的写入都已提交，之后的写入都排在它后面"""
+    with _change_lock:
+        return _next_change_at(), 0
 
 
 def _migrate_db() -> None:
@@ -41,16 +88,35 @@ def _migrate_db() -> None:
     if 'remote_task_id' not in columns:
         db.execute_sql("ALTER TABLE videotask ADD COLUMN remote_task_id VARCHAR(255) DEFAULT ''")
         logger.info("[DB] 迁移: 已添加 remote_task_id 字段")
+    if 'generator_key' not in columns:
+        db.execute_sql("ALTER TABLE videotask ADD COLUMN generator_key VARCHAR(255) DEFAULT ''")
+        logger.info("[DB] 迁移: 已添加 generator_key 字段")
+    if 'updated_at' not in columns:
+        db.execute_sql("ALTER TABLE videotask ADD COLUMN updated_at DATETIME")
+        db.execute_sql("UPDATE videotask SET updated_at = created_at")
+        logger.info("[DB] 迁移: 已添加 updated_at 字段")
+    if 'progress' not in columns:
+        db.execute_sql("ALTER TABLE videotask ADD COLUMN progress INTEGER DEFAULT 0")
+        logger.info("[DB] 迁移: 已添加 progress 字段")
+    # updated_at 由迁移添加，索引不能随 create_tables 建立（旧表此时还没有该列）
+    db.execute_sql("CREATE INDEX IF NOT EXISTS videotask_updated_at ON videotask (updated_at)")
+
+
+def connect_thread() -> None:
+    """为当前线程打开（或复用）数据库连接；线程池工作线程启动时调用"""
+    db.connect(reuse_if_open=True)
 
 
 def init_db() -> None:
     """初始化数据库"""
     logger.info(f"[DB] 连接数据库: {DB_PATH}")
-    db.connect()
-    db.create_tables([Settings, VideoTask], safe=True)
+    db.connect(reuse_if_open=True)
+    logger.info(f"[DB] journal_mode={db.journal_mode}, synchronous={db.synchronous}")
+    db.create_tables([Settings, VideoTask, DeletedVideoTask], safe=True)
     _migrate_db()
     _init_default_settings()
-    logger.info("[DB] 数据库初始化完成, 表: Settings, VideoTask")
+    reload_settings()
+    logger.info("[DB] 数据库初始化完成, 表: Settings, VideoTask, DeletedVideoTask")
 
 
 _DEFAULT_BASE_URLS = {
@@ -72,41 +138,104 @@ def _init_default_settings() -> None:
             logger.info(f"[DB] 写入默认配置: {key} = {default_value}")
 
 
+# 设置快照：启动后只读一次 Settings 表，之后所有读取都走内存。
+# 写入时复制一份新字典整体替换（copy-on-write），读取方拿到的字典永远不会被修改；
+# 每次替换版本号加一，长时间运行的线程可比较版本号判断设置是否变化。
+_settings_lock = threading.Lock()
+_settings_snapshot: Optional[Dict[str, str]] = None
+_settings_version = 0
+
+
+def _current_settings() -> Dict[str, str]:
+    global _settings_snapshot
+    snapshot = _settings_snapshot
+    if snapshot is not None:
+        return snapshot
+    with _settings_lock:
+        if _settings_snapshot is None:
+            _settings_snapshot = {setting.key: setting.value for setting in Settings.select()}
+            logger.debug(f"[DB] 加载设置快照: 共 {len(_settings_snapshot)} 项")
+        return _settings_snapshot
+
+
+def _publish_settings(updates: Dict[str, str]) -> None:
+    global _settings_snapshot, _settings_version
+    with _settings_lock:
+        snapshot = dict(_settings_snapshot) if _settings_snapshot is not None else None
+        if snapshot is not None:
+            snapshot.update(updates)
+        _settings_snapshot = snapshot
+        _settings_version += 1
+
+
+def reload_settings() -> None:
+    """丢弃设置快照，下次读取时重新从数据库加载（数据库被外部修改后调用）"""
+    global _settings_snapshot, _settings_version
+    with _settings_lock:
+        _settings_snapshot = None
+        _settings_version += 1
+
+
+def get_settings_version() -> int:
+    """设置版本号，每次写入设置后递增"""
+    return _settings_version
+
+
 def get_setting(key: str) -> Optional[str]:
     """获取配置"""
-    try:
-        setting = Settings.get(Settings.key == key)
-        logger.debug(f"[DB] get_setting: key={key}, value={setting.value[:50] if setting.value else 'None'}")
-        return setting.value
-    except Settings.DoesNotExist:
-        logger.debug(f"[DB] get_setting: key={key}, 不存在")
-        return None
+    return _current_settings().get(key)
 
 
 def set_setting(key: str, value: str) -> None:
     """设置配置"""
     Settings.replace(key=key, value=value).execute()
+    _publish_settings({key: value})
     logger.debug(f"[DB] set_setting: key={key}, value={value[:50] if value else ''}")
 
 
+def set_settings(values: Dict[str, str]) -> None:
+    """在一个事务中写入多项配置，快照只替换一次"""
+    if not values:
+        return
+    with db.atomic():
+        for key, value in values.items():
+            Settings.replace(key=key, value=value).execute()
+    _publish_settings(dict(values))
+    logger.debug(f"[DB] set_settings: keys={list(values.keys())}")
+
+
 def get_all_settings() -> dict:
-    """获取所有设置"""
-    result = {}
-    for setting in Settings.select():
-        result[setting.key] = setting.value
-    logger.debug(f"[DB] get_all_settings: 共 {len(result)} 项")
-    return result
+    """获取所有设置（返回快照的副本，调用方可自由修改）"""
+    return dict(_current_settings())
 
 
 # ==================== VideoTask CRUD ====================
 
 def create_video_task(image_path: str = '', prompt: str = '', status: str = 'pending') -> VideoTask:
     """创建视频任务"""
-    task = VideoTask.create(image_path=image_path, prompt=prompt, status=status)
+    with _change_lock:
+        now = _next_change_at()
+        task = VideoTask.create(image_path=image_path, prompt=prompt, status=status, created_at=now, updated_at=now)
     logger.info(f"[DB] 创建视频任务: id={task.id}, status={status}, prompt={prompt[:50] if prompt else 'N/A'}")
     return task
 
 
+def create_video_tasks(rows: List[dict]) -> List[int]:
+    """批量创建视频任务：所有行在同一个事务中写入，只提交一次；返回新任务 ID（与 rows 顺序一致）"""
+    if not rows:
+        return []
+    with _change_lock, db.atomic():
+        now = _next_change_at()
+        task_ids = [VideoTask.insert(**row, created_at=now, updated_at=now).execute() for row in rows]
+    logger.info(f"[DB] 批量创建视频任务: 共 {len(task_ids)} 条, id={task_ids[0]}..{task_ids[-1]}")
+    return task_ids
+
+
+def get_video_task(task_id: int) -> Optional[VideoTask]:
+    """按主键获取单个视频任务，不存在时返回 None"""
+    return VideoTask.get_or_none(VideoTask.id == task_id)
+
+
 def get_video_tasks() -> List[VideoTask]:
     """获取所有视频任务（按创建时间倒序）"""
     tasks = list(VideoTask.select().order_by(VideoTask.created_at.desc()))
@@ -114,6 +243,72 @@ def get_video_tasks() -> List[VideoTask]:
     return tasks
 
 
+def _status_filter(query, status: str):
+    return query.where(VideoTask.status == status) if status else query
+
+
+def list_video_tasks(limit: Optional[int] = 50, before: Optional[tuple] = None, status: str = '') -> List[VideoTask]:
+    """按创建时间倒序分页获取视频任务（键集分页）。
+
+    before 为上一页最后一条的 (created_at, id)，返回严格排在它之后的 limit 条（None 不限）；status 非空时只返回该状态。
+    """
+    query = _status_filter(VideoTask.select(), status)
+    if before:
+        created_at, task_id = before
+        query = query.where(
+            (VideoTask.created_at < created_at)
+            | ((VideoTask.created_at == created_at) & (VideoTask.id < task_id))
+        )
+    tasks = list(query.order_by(VideoTask.created_at.desc(), VideoTask.id.desc()).limit(limit))
+    logger.debug(f"[DB] list_video_tasks: limit={limit}, status={status or 'all'}, 返回 {len(tasks)} 条")
+    return tasks
+
+
+def iter_video_tasks(status: str = '', page_size: int = 200) -> Iterator[VideoTask]:
+    """按创建时间倒序逐页遍历视频任务，不一次性加载整表"""
+    before = None
+    while True:
+        page = list_video_tasks(limit=page_size, before=before, status=status)
+        yield from page
+        if len(page) < page_size:
+            return
+        before = (page[-1].created_at, page[-1].id)
+
+
+def count_video_tasks(status: str = '') -> int:
+    """统计视频任务数量"""
+    return _status_filter(VideoTask.select(), status).count()
+
+
+def get_video_tasks_changed_since(after: tuple) -> List[VideoTask]:
+    """获取变更游标 after = (updated_at, id) 之后的任务（按 updated_at、id 正序），供界面增量刷新"""
+    changed_at, task_id = after
+    query = VideoTask.select().where(
+        (VideoTask.updated_at > changed_at)
+        | ((VideoTask.updated_at == changed_at) & (VideoTask.id > task_id))
+    )
+    tasks = list(query.order_by(VideoTask.updated_at, VideoTask.id))
+    if tasks:
+        logger.debug(f"[DB] get_video_tasks_changed_since: 共 {len(tasks)} 条变化")
+    return tasks
+
+
+def get_video_tasks_deleted_since(since: datetime.datetime) -> List[int]:
+    """获取 since 之后删除的任务 ID；其中的 0 表示期间清空过全部任务"""
+    query = (
+        DeletedVideoTask.select(DeletedVideoTask.task_id)
+        .where(DeletedVideoTask.deleted_at > since)
+        .order_by(DeletedVideoTask.deleted_at)
+    )
+    return [row.task_id for row in query]
+
+
+def _record_deletion(task_id: int) -> None:
+    now = _next_change_at()
+    DeletedVideoTask.delete().where(DeletedVideoTask.deleted_at < now - TOMBSTONE_RETENTION).execute()
+    DeletedVideoTask.create(task_id=task_id, deleted_at=now)
+
+
 def get_pending_video_tasks() -> List[VideoTask]:
     """获取待处理的视频任务"""
     tasks = list(VideoTask.select().where(VideoTask.status == 'pending'))
@@ -130,20 +325,41 @@ def get_processing_video_tasks() -> List[VideoTask]:
     return tasks
 
 
-def update_video_task(task_id: int, **kwargs) -> None:
-    """更新视频任务"""
-    VideoTask.update(**kwargs).where(VideoTask.id == task_id).execute()
-    logger.debug(f"[DB] update_video_task: id={task_id}, fields={list(kwargs.keys())}")
+def claim_video_task(task_id: int) -> Optional[VideoTask]:
+    """将 pending 任务原子地置为 processing，并返回任务；任务不存在或已被领取时返回 None"""
+    with _change_lock:
+        updated = (
+            VideoTask.update(status='processing', updated_at=_next_change_at())
+            .where((VideoTask.id == task_id) & (VideoTask.status == 'pending'))
+            .execute()
+        )
+    if not updated:
+        logger.debug(f"[DB] claim_video_task: id={task_id}, 非 pending 状态或不存在")
+        return None
+    return get_video_task(task_id)
+
+
+def update_video_task(task_id: int, **kwargs) -> int:
+    """更新视频任务，返回实际更新的行数（任务已被删除时为 0）"""
+    with _change_lock:
+        kwargs['updated_at'] = _next_change_at()
+        rows = VideoTask.update(**kwargs).where(VideoTask.id == task_id).execute()
+    logger.debug(f"[DB] update_video_task: id={task_id}, fields={list(kwargs.keys())}, rows={rows}")
+    return rows
 
 
 def delete_video_task(task_id: int) -> None:
     """删除视频任务"""
-    VideoTask.delete().where(VideoTask.id == task_id).execute()
+    with _change_lock, db.atomic():
+        VideoTask.delete().where(VideoTask.id == task_id).execute()
+        _record_deletion(task_id)
     logger.info(f"[DB] 删除视频任务: id={task_id}")
 
 
 def delete_all_video_tasks() -> int:
     """删除所有视频任务，返回删除数量"""
-    count = VideoTask.delete().execute()
+    with _change_lock, db.atomic():
+        count = VideoTask.delete().execute()
+        _record_deletion(0)
     logger.info(f"[DB] 删除所有视频任务: 共 {count} 条")
     return count
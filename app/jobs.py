@@ -0,0 +1,104 @@
+"""后台作业（供 JS 桥的长耗时调用使用）
+
+生成图片 / 视频的接口同步执行时会占住 pywebview 的桥调用直到生成结束（视频需要数分钟）。
+作业模式下接口立即返回 job_id，真正的调用排队等待公用线程池的空闲槽位后执行；
+结束时通过 glin:job-done 事件通知前端，前端再用 get_job 取回结果（推送丢失时轮询兜底）。
+"""
+
+import itertools
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from .logger import logger
+from .task_events import task_events
+from .thread_pool import acquire_slot, submit_reserved
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+
+# 结束后未被取走的结果保留时长
+_RESULT_TTL_SECONDS = 30 * 60
+
+
+@dataclass
+class Job:
+    job_id: str
+    name: str
+    status: str = JOB_QUEUED
+    result: Any = None
+    finished_at: Optional[float] = None
+    created_at: float = 0.0
+
+
+class JobRegistry:
+    """作业登记与调度：单个调度线程按提交顺序为作业占用线程池槽位"""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._ids = itertools.count(1)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, name: str, fn: Callable, *args, **kwargs) -> str:
+        """登记作业并排队执行，立即返回 job_id"""
+        job = Job(job_id=f"job_{next(self._ids)}", name=name, created_at=self._clock())
+        with self._lock:
+            self._purge_expired()
+            self._jobs[job.job_id] = job
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._dispatch_loop, daemon=True, name="JobDispatcher")
+                self._thread.start()
+        self._queue.put((job, fn, args, kwargs))
+        logger.info(f"[Jobs] 作业已排队 {job.job_id} | {name}")
+        return job.job_id
+
+    def get(self, job_id: str, consume: bool = True) -> Optional[Job]:
+        """查询作业；consume 为真时已结束的作业在返回后移除"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and consume and job.status == JOB_DONE:
+                del self._jobs[job_id]
+            return job
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            job, fn, args, kwargs = self._queue.get()
+            if not acquire_slot():
+                self._finish(job, {"ok": False, "msg": "线程池未初始化"})
+                continue
+            submit_reserved(self._run, job, fn, args, kwargs)
+
+    def _run(self, job: Job, fn: Callable, args: tuple, kwargs: dict) -> None:
+        job.status = JOB_RUNNING
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            logger.error(f"[Jobs] 作业异常 {job.job_id} | {job.name}: {type(exc).__name__}: {exc}")
+            result = {"ok": False, "msg": str(exc)}
+        self._finish(job, result)
+
+    def _finish(self, job: Job, result: Any) -> None:
+        job.result = result
+        job.finished_at = self._clock()
+        job.status = JOB_DONE
+        ok = result.get("ok") if isinstance(result, dict) else None
+        logger.info(f"[Jobs] 作业结束 {job.job_id} | {job.name} | ok={ok} | 耗时 {job.finished_at - job.created_at:.1f}s")
+        task_events.push("glin:job-done", {"job_id": job.job_id, "ok": ok})
+
+    def _purge_expired(self) -> None:
+        now = self._clock()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > _RESULT_TTL_SECONDS
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+job_registry = JobRegistry()
@@ -0,0 +1,241 @@
+"""统一下载引擎
+
+成品视频 / 图片的下载统一走这里：
+- 1 MiB 写缓冲，数据先写入同目录的 .<URL 摘要>.part，校验通过后原子改名；
+- 连接中断时按已写入的字节数发送 Range 请求续传，而不是从零重下；
+  .part 按 URL 命名，调用方即使每次换一个带时间戳的目标文件名，重试同一 URL 也能接着上次的进度；
+- 服务端支持 Range 且文件足够大时，可按字节区间分段并行下载；
+- 下载完成后校验文件大小（Content-Length / Content-Range）和可选的 SHA-256。
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+from ..logger import logger
+from . import http_client
+
+BUFFER_SIZE = 1024 * 1024
+# 视频下载的默认分段数；单段不足 _MIN_SEGMENT_SIZE 时自动退化为单连接
+VIDEO_SEGMENTS = 4
+_MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+_RETRY_DELAY_SECONDS = 2
+# 超过这个时间没人续传的 .part 残片视为放弃，下次往同一目录下载时清理
+_STALE_PART_SECONDS = 24 * 3600
+_PART_SUFFIX_RE = re.compile(r"^\.[0-9a-f]{16}\.part\d*$")
+
+# 同一 .part 同一时间只允许一个下载写入；按摘要分桶加锁，避免锁表随 URL 无限增长
+_PART_LOCKS = tuple(threading.Lock() for _ in range(64))
+
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadError(Exception):
+    """下载失败（重试耗尽或校验不通过）"""
+
+
+def _total_from_response(response, offset: int) -> Optional[int]:
+    match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+    if match and match.group(3) != "*":
+        return int(match.group(3))
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit():
+        return offset + int(length) if response.status_code == 206 else int(length)
+    return None
+
+
+def _probe(url: str, headers: dict, timeout: float) -> tuple:
+    """用 Range: bytes=0-0 探测文件大小与是否支持分段（不少 CDN 的签名链接不允许 HEAD）"""
+    try:
+        with http_client.get(
+            url, headers={**headers, "Range": "bytes=0-0"}, stream=True, timeout=timeout, throttle=False
+        ) as response:
+            if response.status_code == 206:
+                return _total_from_response(response, 0), True
+            if response.ok:
+                return _total_from_response(response, 0), False
+    except Exception as exc:
+        logger.debug(f"[Download] 探测失败，使用单连接下载: {exc}")
+    return None, False
+
+
+def _fetch_range(
+    url: str,
+    part_path: Path,
+    headers: dict,
+    timeout: float,
+    retries: int,
+    start: int = 0,
+    end: Optional[int] = None,
+) -> Optional[int]:
+    """把 [start, end] 字节区间下载到 part_path，断线后按已写入字节续传；返回服务端报告的文件总大小"""
+    total = None
+    last_error = None
+    for attempt in range(retries + 1):
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        if end is not None and start + offset > end:
+            return total
+        request_headers = dict(headers)
+        if start + offset > 0 or end is not None:
+            request_headers["Range"] = f"bytes={start + offset}-{'' if end is None else end}"
+        try:
+            with http_client.get(url, headers=request_headers, stream=True, timeout=timeout, throttle=False) as response:
+                if response.status_code == 416 and offset > 0:
+                    return total
+                response.raise_for_status()
+                resumed = response.status_code == 206
+                if not resumed and (start + offset > 0):
+                    if start > 0:
+                        raise DownloadError("服务端不支持 Range，无法分段下载")
+                    offset = 0
+                total = _total_from_response(response, start + offset if resumed else 0) or total
+                with open(part_path, "ab" if resumed else "wb", buffering=BUFFER_SIZE) as handle:
+                    for chunk in response.iter_content(chunk_size=BUFFER_SIZE):
+                        if chunk:
+                            handle.write(chunk)
+            return total
+        except DownloadError:
+            raise
+        except Exception as exc:
+            last_error = exc
+            if attempt < retries:
+                written = part_path.stat().st_size if part_path.exists() else 0
+                logger.warning(
+                    f"[Download] 下载中断，{_RETRY_DELAY_SECONDS}s 后从 {written} 字节处续传 "
+                    f"({attempt + 1}/{retries}): {exc}"
+                )
+                time.sleep(_RETRY_DELAY_SECONDS)
+    raise DownloadError(f"下载失败: {last_error}")
+
+
+def _download_segments(url: str, part_path: Path, headers: dict, timeout: float, retries: int, total: int, segments: int) -> None:
+    segment_size = -(-total // segments)
+    ranges = [(start, min(start + segment_size, total) - 1) for start in range(0, total, segment_size)]
+    segment_paths = [part_path.with_name(f"{part_path.name}{index}") for index in range(len(ranges))]
+
+    with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="Download") as executor:
+        futures = [
+            executor.submit(_fetch_range, url, path, headers, timeout, retries, start, end)
+            for path, (start, end) in zip(segment_paths, ranges)
+        ]
+        for future in futures:
+            future.result()
+
+    with open(part_path, "wb") as output:
+        for path in segment_paths:
+            with open(path, "rb") as handle:
+                while True:
+                    block = handle.read(BUFFER_SIZE)
+                    if not block:
+                        break
+                    output.write(block)
+    for path in segment_paths:
+        path.unlink()
+
+
+def _part_path_for(url: str, directory: Path) -> Path:
+    """同一目录下同一 URL 总是对应同一个 .part 文件，重试时据此续传"""
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+    return directory / f".{digest}.part"
+
+
+def _part_lock(part_path: Path) -> threading.Lock:
+    return _PART_LOCKS[hash(str(part_path)) % len(_PART_LOCKS)]
+
+
+def _sweep_stale_parts(directory: Path) -> None:
+    cutoff = time.time() - _STALE_PART_SECONDS
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for entry in entries:
+        if not _PART_SUFFIX_RE.match(entry.name):
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                logger.info(f"[Download] 清理过期的未完成下载: {entry.name}")
+        except OSError:
+            pass
+
+
+def _sha256_of(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(BUFFER_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def download_file(
+    url: str,
+    dest: Union[str, Path],
+    headers: Optional[dict] = None,
+    segments: int = 1,
+    expected_size: Optional[int] = None,
+    sha256: Optional[str] = None,
+    retries: int = 3,
+    timeout: float = 120,
+) -> Path:
+    """下载 url 到 dest 并校验，失败时抛出 DownloadError。
+
+    未完成的数据保留在按 URL 命名的 .part 文件里，之后再次下载同一 URL 到同一目录时续传。
+    segments > 1 时若服务端支持 Range 且每段不小于 4 MiB，则分段并行下载。
+    """
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    _sweep_stale_parts(dest.parent)
+    part_path = _part_path_for(url, dest.parent)
+    with _part_lock(part_path):
+        return _download_to(url, dest, part_path, dict(headers or {}), segments, expected_size, sha256, retries, timeout)
+
+
+def _download_to(
+    url: str,
+    dest: Path,
+    part_path: Path,
+    headers: dict,
+    segments: int,
+    expected_size: Optional[int],
+    sha256: Optional[str],
+    retries: int,
+    timeout: float,
+) -> Path:
+    started = time.monotonic()
+    if part_path.exists():
+        logger.info(f"[Download] 发现未完成的下载，从 {part_path.stat().st_size} 字节处续传 | {dest.name}")
+
+    total = None
+    if segments > 1 and not part_path.exists():
+        total, ranged = _probe(url, headers, timeout)
+        if ranged and total:
+            segments = min(segments, total // _MIN_SEGMENT_SIZE)
+            if segments > 1:
+                logger.info(f"[Download] 分段下载 | {segments} 段 | {total / 1024 / 1024:.1f} MB | {dest.name}")
+                _download_segments(url, part_path, headers, timeout, retries, total, segments)
+            else:
+                total = _fetch_range(url, part_path, headers, timeout, retries) or total
+        else:
+            total = _fetch_range(url, part_path, headers, timeout, retries) or total
+    else:
+        total = _fetch_range(url, part_path, headers, timeout, retries)
+
+    size = part_path.stat().st_size
+    expected = expected_size or total
+    if expected is not None and size != expected:
+        part_path.unlink()
+        raise DownloadError(f"文件大小校验失败: 期望 {expected} 字节，实际 {size} 字节")
+    if sha256 and _sha256_of(part_path).lower() != sha256.lower():
+        part_path.unlink()
+        raise DownloadError("文件 SHA-256 校验失败")
+
+    os.replace(part_path, dest)
+    elapsed = time.monotonic() - started
+    logger.info(f"[Download] 下载完成 | {size / 1024 / 1024:.1f} MB | {elapsed:.1f}s | {dest}")
+    return dest
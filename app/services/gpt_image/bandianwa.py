@@ -1,16 +1,18 @@
 """斑点蛙 GPT 图片生成（异步任务型）"""
 
-import base64
 import os
 import re
-import time
 from typing import Optional
 
 import requests
 
 from ...constants import ApiUrls
 from ...logger import logger
-from ..nanobanana.base import NanoBananaResult
+from .. import http_client
+from ..multipart import MultipartEncoder
+from ..nanobanana.base import NanoBananaResult, decode_image_data_url
+from ..polling import remote_task_poller
+from ..ref_image import ReferenceImage
 
 _PENDING_STATUSES = {"pending", "queued", "in_progress", "processing", "running"}
 _FAILED_STATUSES = {"failed", "error", "cancelled"}
@@ -88,9 +90,9 @@ class GptImageBandianwa:
         if not result or not result.success:
             return result or NanoBananaResult(success=False, error_message="任务轮询失败")
 
-        if result.image_data and download_dir:
+        if result.image_bytes and download_dir:
             result.file_path = self._save_to_dir(
-                result.image_data,
+                result.image_bytes,
                 result.mime_type or "image/png",
                 str(download_dir),
             )
@@ -110,7 +112,7 @@ class GptImageBandianwa:
                 f"[{self.provider_name}] 请求 | POST {url} | "
                 f"model={payload.get('model')} | size={payload.get('size')} | 模式={mode}"
             )
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
+            response = http_client.post(url, headers=headers, json=payload, timeout=60)
             logger.info(f"[{self.provider_name}] 响应状态码: {response.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {response.text[:500]}")
             response.raise_for_status()
@@ -132,60 +134,64 @@ class GptImageBandianwa:
         timeout_seconds: int = 300,
         interval_seconds: int = 5,
     ) -> Optional[NanoBananaResult]:
+        return remote_task_poller.wait(
+            lambda: self._check_task(task_id),
+            interval_seconds=interval_seconds,
+            timeout_seconds=timeout_seconds,
+            default=NanoBananaResult(success=False, error_message="轮询图片结果超时"),
+            key=type(self).__name__,
+            succeeded=lambda result: result.success,
+        )
+
+    def _check_task(self, task_id: str) -> Optional[NanoBananaResult]:
+        """查询一次任务状态，仍在处理中时返回 None"""
         url = f"{self.base_url.rstrip('/')}/v1/images/{task_id}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
         }
-        deadline = time.time() + timeout_seconds
+        try:
+            response = http_client.get(url, headers=headers, timeout=30)
+            logger.info(f"[{self.provider_name}] 轮询状态码: {response.status_code}")
+            logger.info(f"[{self.provider_name}] 轮询响应: {response.text[:500]}")
+            response.raise_for_status()
+            data = response.json()
 
-        while time.time() < deadline:
-            try:
-                response = requests.get(url, headers=headers, timeout=30)
-                logger.info(f"[{self.provider_name}] 轮询状态码: {response.status_code}")
-                logger.info(f"[{self.provider_name}] 轮询响应: {response.text[:500]}")
-                response.raise_for_status()
-                data = response.json()
-
-                result = self._extract_result(data)
-                if result:
-                    return result
-
-                status = str(data.get("status") or "").lower()
-                if status == "completed":
-                    return self._fetch_image(task_id)
-                if status in _FAILED_STATUSES:
-                    return NanoBananaResult(
-                        success=False,
-                        error_message=self._extract_error_message(data) or "任务执行失败",
-                    )
-                if status and status not in _PENDING_STATUSES:
-                    logger.warning(f"[{self.provider_name}] 未识别状态，继续轮询: {status}")
-                time.sleep(interval_seconds)
-            except requests.exceptions.Timeout:
-                logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
-                time.sleep(interval_seconds)
-            except requests.exceptions.HTTPError as exc:
-                logger.error(f"[{self.provider_name}] 轮询 HTTP 异常: {self._extract_http_error(exc)}")
-                time.sleep(interval_seconds)
-            except Exception as exc:
-                logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
-                time.sleep(interval_seconds)
+            result = self._extract_result(data)
+            if result:
+                return result
 
-        return NanoBananaResult(success=False, error_message="轮询图片结果超时")
+            status = str(data.get("status") or "").lower()
+            if status == "completed":
+                return self._fetch_image(task_id)
+            if status in _FAILED_STATUSES:
+                return NanoBananaResult(
+                    success=False,
+                    error_message=self._extract_error_message(data) or "任务执行失败",
+                )
+            if status and status not in _PENDING_STATUSES:
+                logger.warning(f"[{self.provider_name}] 未识别状态，继续轮询: {status}")
+        except requests.exceptions.Timeout:
+            logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
+        except requests.exceptions.HTTPError as exc:
+            logger.error(f"[{self.provider_name}] 轮询 HTTP 异常: {self._extract_http_error(exc)}")
+        except Exception as exc:
+            logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
+
+        return None
 
     def _fetch_image(self, task_id: str) -> NanoBananaResult:
         url = f"{self.base_url.rstrip('/')}/v1/images/{task_id}/content"
         headers = {"Authorization": f"Bearer {self.api_key}"}
         try:
-            response = requests.get(url, headers=headers, timeout=60)
+            response = http_client.get(url, headers=headers, timeout=60)
             logger.info(f"[{self.provider_name}] 下载图片状态码: {response.status_code}")
             response.raise_for_status()
             mime_type = (response.headers.get("Content-Type") or "image/png").split(";")[0].strip()
             return NanoBananaResult(
                 success=True,
                 mime_type=mime_type,
-                image_data=base64.b64encode(response.content).decode("ascii"),
+                image_bytes=response.content,
             )
         except requests.exceptions.HTTPError as exc:
             return NanoBananaResult(
@@ -201,24 +207,20 @@ class GptImageBandianwa:
             return None
 
         if image_src.startswith("data:"):
-            match = re.match(r"data:(image/[^;]+);base64,(.*)", image_src, re.DOTALL)
-            if not match:
+            decoded = decode_image_data_url(image_src)
+            if not decoded:
                 return NanoBananaResult(success=False, error_message="无法解析 data URL")
-            return NanoBananaResult(
-                success=True,
-                mime_type=match.group(1),
-                image_data=match.group(2).replace("\n", "").replace("\r", "").replace(" ", ""),
-            )
+            return NanoBananaResult(success=True, mime_type=decoded[0], image_bytes=decoded[1])
 
         if image_src.startswith("http"):
             try:
-                response = requests.get(image_src, timeout=60)
+                response = http_client.get(image_src, timeout=60)
                 response.raise_for_status()
                 mime_type = (response.headers.get("Content-Type") or "image/png").split(";")[0].strip()
                 return NanoBananaResult(
                     success=True,
                     mime_type=mime_type,
-                    image_data=base64.b64encode(response.content).decode("ascii"),
+                    image_bytes=response.content,
                 )
             except Exception as exc:
                 return NanoBananaResult(success=False, error_message=f"下载图片失败: {exc}")
@@ -262,18 +264,20 @@ class GptImageBandianwa:
         return None
 
     def _upload_reference_image(self, image: dict, index: int) -> Optional[str]:
-        image_data = image.get("base64")
-        if not image_data:
+        ref_image = ReferenceImage.coerce(image)
+        if not ref_image or not ref_image.exists():
             return None
 
-        mime_type = image.get("mime", "image/jpeg")
+        mime_type = ref_image.mime
         filename = f"gpt_image_ref_{index}{_MIME_TO_EXT.get(mime_type, '.jpg')}"
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        files = {"file": (filename, base64.b64decode(image_data), mime_type)}
+        # 本地文件直接从磁盘流式上传，只有前端传来的 base64 参考图才解码到内存
+        body = MultipartEncoder(files=[("file", filename, ref_image.get("path") or ref_image.data, mime_type)])
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": body.content_type}
 
         try:
-            logger.info(f"[{self.provider_name}] 上传参考图 | POST {_IMAGE_UPLOAD_URL} | {filename}")
-            response = requests.post(_IMAGE_UPLOAD_URL, headers=headers, files=files, timeout=60)
+            logger.info(f"[{self.provider_name}] 上传参考图 | POST {_IMAGE_UPLOAD_URL} | {filename} | {len(body)} bytes")
+            with body:
+                response = http_client.post(_IMAGE_UPLOAD_URL, headers=headers, data=body, timeout=60)
             logger.info(f"[{self.provider_name}] 图床响应状态码: {response.status_code}")
             logger.info(f"[{self.provider_name}] 图床响应体: {response.text[:500]}")
             response.raise_for_status()
@@ -319,7 +323,7 @@ class GptImageBandianwa:
             return (getattr(exc.response, "text", "") or str(exc))[:500]
 
     @staticmethod
-    def _save_to_dir(image_data: str, mime_type: str, download_dir: str) -> str:
+    def _save_to_dir(image_bytes: bytes, mime_type: str, download_dir: str) -> str:
         os.makedirs(download_dir, exist_ok=True)
         ext = _MIME_TO_EXT.get(mime_type, ".png")
 
@@ -328,8 +332,7 @@ class GptImageBandianwa:
 
         filename = f"gpt_image_bdw_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}{ext}"
         file_path = os.path.join(download_dir, filename)
-        raw = base64.b64decode(image_data)
         with open(file_path, "wb") as handle:
-            handle.write(raw)
-        logger.info(f"[斑点蛙 GPT 图片] 图片已保存: {file_path} ({len(raw)} bytes)")
+            handle.write(image_bytes)
+        logger.info(f"[斑点蛙 GPT 图片] 图片已保存: {file_path} ({len(image_bytes)} bytes)")
         return file_path
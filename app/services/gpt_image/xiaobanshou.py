@@ -1,16 +1,16 @@
 """小扳手 GPT-image-2 图片生成（/v1/videos 异步接口）"""
 
-import base64
 import os
 import re
-import time
 from typing import Optional
 
 import requests
 
 from ...constants import ApiUrls
 from ...logger import logger
-from ..nanobanana.base import NanoBananaResult
+from .. import http_client
+from ..nanobanana.base import NanoBananaResult, decode_image_data_url
+from ..polling import remote_task_poller
 
 _PENDING_STATUSES = {"pending", "queued", "in_progress", "processing", "running"}
 _FAILED_STATUSES = {"failed", "error", "cancelled"}
@@ -66,9 +66,9 @@ class GptImageXiaobanshou:
         }
 
         result = self._submit(payload)
-        if result and result.success and result.image_data and download_dir:
+        if result and result.success and result.image_bytes and download_dir:
             result.file_path = self._save_to_dir(
-                result.image_data,
+                result.image_bytes,
                 result.mime_type or "image/png",
                 str(download_dir),
             )
@@ -89,7 +89,7 @@ class GptImageXiaobanshou:
                 f"[{self.provider_name}] 请求 | POST {url} | "
                 f"model={payload.get('model')} | size={payload.get('metadata', {}).get('size')} | 模式={mode}"
             )
-            response = requests.post(url, headers=headers, json=payload, timeout=300)
+            response = http_client.post(url, headers=headers, json=payload, timeout=300)
             logger.info(f"[{self.provider_name}] 响应状态码: {response.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {response.text[:500]}")
             response.raise_for_status()
@@ -115,45 +115,49 @@ class GptImageXiaobanshou:
             return NanoBananaResult(success=False, error_message=f"生成失败: {exc}")
 
     def _poll_task(self, task_id: str, timeout_seconds: int = 300, interval_seconds: int = 5) -> NanoBananaResult:
+        return remote_task_poller.wait(
+            lambda: self._check_task(task_id),
+            interval_seconds=interval_seconds,
+            timeout_seconds=timeout_seconds,
+            default=NanoBananaResult(success=False, error_message="轮询图片结果超时"),
+            key=type(self).__name__,
+            succeeded=lambda result: result.success,
+        )
+
+    def _check_task(self, task_id: str) -> Optional[NanoBananaResult]:
+        """查询一次任务状态，仍在处理中时返回 None"""
         url = f"{self.base_url.rstrip('/')}/v1/videos/{task_id}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
         }
-        deadline = time.time() + timeout_seconds
+        try:
+            response = http_client.get(url, headers=headers, timeout=30)
+            logger.info(f"[{self.provider_name}] 轮询状态码: {response.status_code}")
+            logger.info(f"[{self.provider_name}] 轮询响应: {response.text[:500]}")
+            response.raise_for_status()
+            data = response.json()
 
-        while time.time() < deadline:
-            try:
-                response = requests.get(url, headers=headers, timeout=30)
-                logger.info(f"[{self.provider_name}] 轮询状态码: {response.status_code}")
-                logger.info(f"[{self.provider_name}] 轮询响应: {response.text[:500]}")
-                response.raise_for_status()
-                data = response.json()
-
-                result = self._extract_result(data)
-                if result:
-                    return result
-
-                status = str(data.get("status") or "").lower()
-                if status in _FAILED_STATUSES:
-                    return NanoBananaResult(
-                        success=False,
-                        error_message=self._extract_error_message(data) or "任务执行失败",
-                    )
-                if status and status not in _PENDING_STATUSES:
-                    logger.warning(f"[{self.provider_name}] 未识别状态，继续轮询: {status}")
-                time.sleep(interval_seconds)
-            except requests.exceptions.Timeout:
-                logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
-                time.sleep(interval_seconds)
-            except requests.exceptions.HTTPError as exc:
-                logger.error(f"[{self.provider_name}] 轮询 HTTP 异常: {self._extract_http_error(exc)}")
-                time.sleep(interval_seconds)
-            except Exception as exc:
-                logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
-                time.sleep(interval_seconds)
+            result = self._extract_result(data)
+            if result:
+                return result
+
+            status = str(data.get("status") or "").lower()
+            if status in _FAILED_STATUSES:
+                return NanoBananaResult(
+                    success=False,
+                    error_message=self._extract_error_message(data) or "任务执行失败",
+                )
+            if status and status not in _PENDING_STATUSES:
+                logger.warning(f"[{self.provider_name}] 未识别状态，继续轮询: {status}")
+        except requests.exceptions.Timeout:
+            logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
+        except requests.exceptions.HTTPError as exc:
+            logger.error(f"[{self.provider_name}] 轮询 HTTP 异常: {self._extract_http_error(exc)}")
+        except Exception as exc:
+            logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
 
-        return NanoBananaResult(success=False, error_message="轮询图片结果超时")
+        return None
 
     def _extract_result(self, data: dict) -> Optional[NanoBananaResult]:
         image_src = self._extract_image_source(data)
@@ -161,24 +165,20 @@ class GptImageXiaobanshou:
             return None
 
         if image_src.startswith("data:"):
-            match = re.match(r"data:(image/[^;]+);base64,(.*)", image_src, re.DOTALL)
-            if not match:
+            decoded = decode_image_data_url(image_src)
+            if not decoded:
                 return NanoBananaResult(success=False, error_message="无法解析 data URL")
-            return NanoBananaResult(
-                success=True,
-                mime_type=match.group(1),
-                image_data=match.group(2).replace("\n", "").replace("\r", "").replace(" ", ""),
-            )
+            return NanoBananaResult(success=True, mime_type=decoded[0], image_bytes=decoded[1])
 
         if image_src.startswith("http"):
             try:
-                response = requests.get(image_src, timeout=60)
+                response = http_client.get(image_src, timeout=60)
                 response.raise_for_status()
                 mime_type = (response.headers.get("Content-Type") or "image/png").split(";")[0].strip()
                 return NanoBananaResult(
                     success=True,
                     mime_type=mime_type,
-                    image_data=base64.b64encode(response.content).decode("ascii"),
+                    image_bytes=response.content,
                 )
             except Exception as exc:
                 return NanoBananaResult(success=False, error_message=f"下载图片失败: {exc}")
@@ -267,7 +267,7 @@ class GptImageXiaobanshou:
             return (getattr(exc.response, "text", "") or str(exc))[:500]
 
     @staticmethod
-    def _save_to_dir(image_data: str, mime_type: str, download_dir: str) -> str:
+    def _save_to_dir(image_bytes: bytes, mime_type: str, download_dir: str) -> str:
         os.makedirs(download_dir, exist_ok=True)
         ext = _MIME_TO_EXT.get(mime_type, ".png")
 
@@ -276,8 +276,7 @@ class GptImageXiaobanshou:
 
         filename = f"gpt_image_xbs_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}{ext}"
         file_path = os.path.join(download_dir, filename)
-        raw = base64.b64decode(image_data)
         with open(file_path, "wb") as handle:
-            handle.write(raw)
-        logger.info(f"[小扳手 GPT 图片] 图片已保存: {file_path} ({len(raw)} bytes)")
+            handle.write(image_bytes)
+        logger.info(f"[小扳手 GPT 图片] 图片已保存: {file_path} ({len(image_bytes)} bytes)")
         return file_path
@@ -0,0 +1,86 @@
+"""共享 HTTP 会话注册表
+
+按 scheme://host 维护带连接池的 requests.Session，所有供应商客户端都通过这里发请求，
+同一主机的提交、轮询和下载复用 TCP/TLS 连接，避免每次轮询都重新握手。
+连接池大小跟随线程池大小配置（configure_http_pool）。
+get / post 默认经过按主机的限流器（rate_limiter），成品下载传 throttle=False 跳过。
+"""
+
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..logger import logger
+from .rate_limiter import rate_limiters
+
+_DEFAULT_POOL_SIZE = 10
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+_pool_size = _DEFAULT_POOL_SIZE
+
+
+def _session_key(url: str) -> str:
+    parts = urlsplit(url or "")
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def _create_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def configure_http_pool(size: int) -> None:
+    """设置每个主机的连接池大小；已创建的会话会被关闭，下次请求时按新大小重建"""
+    global _pool_size
+    with _lock:
+        _pool_size = max(1, int(size))
+        stale = list(_sessions.values())
+        _sessions.clear()
+    for session in stale:
+        session.close()
+    logger.info(f"[HTTP] 连接池已配置, 每主机最大连接数={_pool_size}")
+
+
+def get_session(url: str) -> requests.Session:
+    """获取 url 所属主机的共享会话"""
+    key = _session_key(url)
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _create_session(_pool_size)
+            _sessions[key] = session
+            logger.debug(f"[HTTP] 新建会话: {key}, pool_maxsize={_pool_size}")
+        return session
+
+
+def get(url: str, throttle: bool = True, **kwargs) -> requests.Response:
+    if not throttle:
+        return get_session(url).get(url, **kwargs)
+    with rate_limiters.limit(url):
+        return get_session(url).get(url, **kwargs)
+
+
+def post(url: str, throttle: bool = True, **kwargs) -> requests.Response:
+    if not throttle:
+        return get_session(url).post(url, **kwargs)
+    with rate_limiters.limit(url):
+        return get_session(url).post(url, **kwargs)
+
+
+def close_all_sessions() -> None:
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
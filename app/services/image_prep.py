@@ -0,0 +1,178 @@
+"""参考图上传前预处理
+
+各渠道对参考图的有效分辨率有限（超过后服务端也会缩小），而前端和扫描器送来的往往是原始大图，
+直接 base64 上传既慢又容易触发请求体大小限制。这里在上传前统一处理：
+- 尺寸与体积都在渠道限制内时原样返回，只读取文件头，不解码；
+- 否则先按最长边缩小（JPEG 借助 draft 在解码阶段直接降采样），再做有界的编码搜索：
+  透明图优先 PNG，其余用 JPEG / WebP 按质量二分，最多编码 _MAX_ENCODES 次，取不超限的最高质量；
+- 结果按 (内容 SHA-256, 规格) 缓存，同一张图在批量任务 / 重试 / 竞速中只处理一次。
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+from ..logger import logger
+from .ref_image import ReferenceImage
+
+# 单张图最多编码次数（含首次）
+_MAX_ENCODES = 4
+_QUALITY_HIGH = 90
+_QUALITY_LOW = 60
+_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ImageSpec:
+    """渠道参考图规格：最长边像素数与编码后的最大字节数，0 表示不限"""
+
+    max_side: int = 2048
+    max_bytes: int = 4 * 1024 * 1024
+    # 有损编码格式：JPEG 或 WEBP
+    lossy_format: str = "JPEG"
+
+
+DEFAULT_IMAGE_SPEC = ImageSpec()
+VIDEO_FRAME_SPEC = ImageSpec(max_side=1920, max_bytes=4 * 1024 * 1024)
+
+
+class _PreparedCache:
+    """按总字节数淘汰的 LRU；值为 (bytes, mime)，None 表示原图无需处理"""
+
+    def __init__(self, max_bytes: int = _CACHE_MAX_BYTES):
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, Optional[tuple]]" = OrderedDict()
+        self._size = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, self._entries[key]
+
+    def put(self, key: tuple, value: Optional[tuple]) -> None:
+        size = len(value[0]) if value else 0
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = value
+            self._size += size
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[0]) if evicted else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+_cache = _PreparedCache()
+
+
+def _within_limits(width: int, height: int, size: int, spec: ImageSpec) -> bool:
+    if spec.max_side and max(width, height) > spec.max_side:
+        return False
+    return not spec.max_bytes or size <= spec.max_bytes
+
+
+def _encode(img: Image.Image, fmt: str, quality: Optional[int] = None) -> bytes:
+    output = BytesIO()
+    if fmt == "PNG":
+        img.save(output, format="PNG", compress_level=6)
+    elif fmt == "JPEG":
+        img.convert("RGB").save(output, format="JPEG", quality=quality, optimize=True)
+    else:
+        img.save(output, format="WEBP", quality=quality, method=4)
+    return output.getvalue()
+
+
+def _search_quality(img: Image.Image, fmt: str, max_bytes: int, budget: int) -> bytes:
+    """在 [_QUALITY_LOW, _QUALITY_HIGH] 内二分质量，返回不超过 max_bytes 的最高质量结果；都超限时返回最小的"""
+    data = _encode(img, fmt, _QUALITY_HIGH)
+    budget -= 1
+    if not max_bytes or len(data) <= max_bytes:
+        return data
+    best_fit, smallest = None, data
+    low, high = _QUALITY_LOW, _QUALITY_HIGH - 1
+    while budget > 0 and low <= high:
+        quality = low if best_fit is None and budget == 1 else (low + high) // 2
+        data = _encode(img, fmt, quality)
+        budget -= 1
+        if len(data) <= max_bytes:
+            best_fit = data
+            low = quality + 1
+        else:
+            smallest = min(smallest, data, key=len)
+            high = quality - 1
+    return best_fit or smallest
+
+
+def _process(data: bytes, spec: ImageSpec) -> Optional[tuple]:
+    """返回处理后的 (bytes, mime)；原图已是最优或无法处理时返回 None"""
+    with Image.open(BytesIO(data)) as img:
+        if getattr(img, "is_animated", False):
+            return None
+        if spec.max_side and img.format == "JPEG":
+            img.draft("RGB", (spec.max_side, spec.max_side))
+        img = ImageOps.exif_transpose(img)
+        if spec.max_side:
+            img.thumbnail((spec.max_side, spec.max_side), Image.LANCZOS)
+        has_alpha = "A" in img.getbands() or (img.mode == "P" and "transparency" in img.info)
+
+        budget = _MAX_ENCODES
+        if has_alpha:
+            img = img.convert("RGBA")
+            encoded, mime = _encode(img, "PNG"), "image/png"
+            budget -= 1
+            if spec.max_bytes and len(encoded) > spec.max_bytes:
+                encoded, mime = _search_quality(img, "WEBP", spec.max_bytes, budget), "image/webp"
+        else:
+            fmt = "WEBP" if spec.lossy_format == "WEBP" else "JPEG"
+            encoded = _search_quality(img, fmt, spec.max_bytes, budget)
+            mime = "image/webp" if fmt == "WEBP" else "image/jpeg"
+    return encoded, mime
+
+
+def prepare_ref_image(image: Optional[ReferenceImage], spec: ImageSpec = DEFAULT_IMAGE_SPEC) -> Optional[ReferenceImage]:
+    """按渠道规格缩小 / 重新编码参考图；无需处理、处理无收益或处理失败时返回原句柄"""
+    if image is None or spec is None or not image.exists():
+        return image
+
+    try:
+        with Image.open(image.get("path") or BytesIO(image.data)) as header:
+            width, height = header.size
+        if _within_limits(width, height, image.size, spec):
+            return image
+
+        data = image.data
+        key = (hashlib.sha256(data).digest(), spec)
+        hit, prepared = _cache.get(key)
+        if not hit:
+            prepared = _process(data, spec)
+            _cache.put(key, prepared)
+            if prepared:
+                logger.info(
+                    f"[ImagePrep] 参考图预处理 {image.name} | {width}x{height} | "
+                    f"{len(data) / 1024:.0f}KB -> {len(prepared[0]) / 1024:.0f}KB ({prepared[1]})"
+                )
+    except Exception as exc:
+        logger.warning(f"[ImagePrep] 参考图预处理失败，使用原图 {image.name}: {exc}")
+        return image
+
+    if not prepared:
+        return image
+    return ReferenceImage(data=prepared[0], mime=prepared[1])
+
+
+def prepare_ref_images(images: list, spec: ImageSpec = DEFAULT_IMAGE_SPEC) -> list:
+    return [prepare_ref_image(image, spec) for image in images or []]
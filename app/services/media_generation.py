@@ -6,29 +6,33 @@
 from __future__ import annotations
 
 import base64
-import os
-import tempfile
 import time
 import uuid
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
-import requests
 
 from ..constants import SettingKeys
 from ..logger import logger
+from .downloader import VIDEO_SEGMENTS, download_file
 from .gpt_image import GptImageBandianwa, GptImageXiaobanshou
+from .image_prep import DEFAULT_IMAGE_SPEC, VIDEO_FRAME_SPEC, ImageSpec, prepare_ref_images
 from .nanobanana import NanoBananaGlinCustom, NanoBananaXiaobanshou, NanoBananaYunwu, NanoBananaBandianwa
+from .polling import PollPending, remote_task_poller
+from .provider_health import provider_health
+from .ref_image import ReferenceImage, coerce_ref_images, first_ref_image
 from .sora2 import (
     Sora2Bandianwa,
     Sora2Dayangyu,
     Sora2TaskStatus,
     Sora2Xiaobanshou,
 )
-from .veo import VeoHetang, VeoBandianwa, VeoXiaobanshou, VeoZyg, VeoChaowen, VeoHolo, VeoCatking
+from .veo import VeoBase, VeoHetang, VeoBandianwa, VeoXiaobanshou, VeoZyg, VeoChaowen, VeoHolo, VeoCatking
+from .veo.chaowen import CHAOWEN_IMAGE_SPEC
 
 _IMAGE_EXT_MAP = {
     "image/png": ".png",
@@ -62,15 +66,25 @@ class ImageGenerationRequest:
     image_size: str = "1K"
     download_dir: Optional[Path] = None
 
+    def __post_init__(self):
+        self.ref_images = coerce_ref_images(self.ref_images)
+
 
 @dataclass
 class ImageGenerationResult:
     success: bool
-    image_data: Optional[str] = None
+    image_bytes: Optional[bytes] = None
     mime_type: Optional[str] = None
     file_path: Optional[str] = None
     error_message: Optional[str] = None
 
+    @property
+    def image_data(self) -> Optional[str]:
+        """base64 形式的图片，按需从 image_bytes 编码；已落盘时界面应改用 file_path"""
+        if self.image_bytes is None:
+            return None
+        return base64.b64encode(self.image_bytes).decode("ascii")
+
 
 @dataclass
 class VideoGenerationRequest:
@@ -80,6 +94,9 @@ class VideoGenerationRequest:
     duration: int = 10
     download_dir: Optional[Path] = None
 
+    def __post_init__(self):
+        self.ref_images = coerce_ref_images(self.ref_images)
+
 
 @dataclass
 class VideoGenerationResult:
@@ -89,6 +106,25 @@ class VideoGenerationResult:
     error_message: Optional[str] = None
 
 
+@dataclass
+class VideoSubmission:
+    """分步生成的提交结果；remote_task_id 需持久化，重启后据此续查而不是重新提交。"""
+
+    success: bool
+    remote_task_id: Optional[str] = None
+    video_url: Optional[str] = None  # 部分渠道提交即返回成品地址
+    error_message: Optional[str] = None
+
+
+@dataclass
+class VideoRaceResult:
+    """竞速生成结果：winner 为最先成功的生成器，contestants 为参与竞速的生成器标识"""
+
+    result: VideoGenerationResult
+    winner: Optional["BaseVideoGenerator"] = None
+    contestants: list = field(default_factory=list)
+
+
 class BaseGenerator(ABC):
     """生成器基类。"""
 
@@ -98,6 +134,8 @@ class BaseGenerator(ABC):
     platform_label: str = ""
     provider_label: str = ""
     setting_key: str = ""
+    # 参考图上传前按此规格缩小 / 重新编码，None 表示原样上传
+    ref_image_spec: Optional[ImageSpec] = DEFAULT_IMAGE_SPEC
 
     def get_api_key(self, settings: dict) -> str:
         return (settings.get(self.setting_key) or "").strip()
@@ -108,6 +146,17 @@ class BaseGenerator(ABC):
     def get_missing_key_message(self) -> str:
         return f"未配置 {self.provider_label} API Key，请前往设置页面配置"
 
+    @property
+    def key(self) -> str:
+        """生成器唯一标识，形如 platform/provider"""
+        return f"{self.platform}/{self.provider}"
+
+    def prepare_ref_images(self, ref_images: list) -> list:
+        """按渠道规格预处理参考图（结果按内容缓存，重复调用不会重复编码）"""
+        if not ref_images or self.ref_image_spec is None:
+            return ref_images or []
+        return prepare_ref_images(ref_images, self.ref_image_spec)
+
     def to_option(self, settings: dict) -> GeneratorOption:
         return GeneratorOption(
             platform=self.platform,
@@ -128,19 +177,86 @@ class BaseImageGenerator(BaseGenerator, ABC):
 
 
 class BaseVideoGenerator(BaseGenerator, ABC):
+    """视频生成器基类。
+
+    generate() 同步完成 提交 → 轮询 → 下载。supports_resume 为 True 的生成器还提供分步接口：
+    submit() 提交并返回远程任务 ID，watch() 交给统一轮询器跟踪，fetch() 下载成品。
+    """
+
     kind = "video"
+    ref_image_spec = VIDEO_FRAME_SPEC
+    supports_resume: bool = False
 
     @abstractmethod
     def generate(self, request: VideoGenerationRequest, settings: dict) -> VideoGenerationResult:
         raise NotImplementedError
 
+    def submit(self, request: VideoGenerationRequest, settings: dict) -> VideoSubmission:
+        raise NotImplementedError(f"{self.key} 不支持分步提交")
+
+    def watch(
+        self,
+        remote_task_id: str,
+        settings: dict,
+        on_progress: Optional[Callable[[int], None]] = None,
+        record_history: bool = True,
+    ) -> Future:
+        """跟踪远程任务，返回 Future，结果为不含本地文件的 VideoGenerationResult；on_progress 接收 0-100 进度。
+
+        重启后续查的任务以 record_history=False 跟踪，其耗时不计入轮询历史。
+        """
+        raise NotImplementedError(f"{self.key} 不支持分步轮询")
+
+    def fetch(self, video_url: str, download_dir: Path, settings: dict) -> str:
+        """下载成品视频，返回本地文件路径；失败时抛出异常，不返回 None"""
+        return _download_remote_file(video_url, download_dir, f"{self.platform}_{self.provider}")
+
+
+def _map_future(source: Future, transform) -> Future:
+    """把 source 的结果经 transform 转换后写入新的 Future（取消新 Future 会一并取消 source）"""
+    target = Future()
+
+    def _on_done(done: Future):
+        if target.done():
+            return
+        if done.cancelled():
+            target.cancel()
+            return
+        try:
+            target.set_result(transform(done.result()))
+        except Exception as exc:
+            target.set_exception(exc)
+
+    def _on_target_done(done: Future):
+        if done.cancelled():
+            source.cancel()
+
+    target.add_done_callback(_on_target_done)
+    source.add_done_callback(_on_done)
+    return target
 
-def _save_base64_image(image_data: str, mime_type: str, download_dir: Path, prefix: str) -> str:
+
+def generate_tracked(generator: BaseGenerator, request, settings: dict):
+    """调用 generator.generate()，并把成败与耗时计入渠道健康度"""
+    started = time.monotonic()
+    try:
+        result = generator.generate(request, settings)
+    except Exception as exc:
+        provider_health.record_failure(generator.key, str(exc), time.monotonic() - started)
+        raise
+    if result.success:
+        provider_health.record_success(generator.key, time.monotonic() - started)
+    else:
+        provider_health.record_failure(generator.key, result.error_message, time.monotonic() - started)
+    return result
+
+
+def _save_image_bytes(image_bytes: bytes, mime_type: str, download_dir: Path, prefix: str) -> str:
     download_dir.mkdir(parents=True, exist_ok=True)
     ext = _IMAGE_EXT_MAP.get(mime_type or "", ".png")
     filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:6]}{ext}"
     file_path = download_dir / filename
-    file_path.write_bytes(base64.b64decode(image_data))
+    file_path.write_bytes(image_bytes)
     return str(file_path)
 
 
@@ -148,49 +264,47 @@ def _download_remote_file(url: str, download_dir: Path, prefix: str, default_ext
     download_dir.mkdir(parents=True, exist_ok=True)
     filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{default_ext}"
     file_path = download_dir / filename
-    with requests.get(url, timeout=120, stream=True) as response:
-        response.raise_for_status()
-        with open(file_path, "wb") as handle:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    handle.write(chunk)
+    download_file(url, file_path, segments=VIDEO_SEGMENTS)
     return str(file_path)
 
 
-def _write_temp_image(ref_images: list) -> Optional[str]:
-    if not ref_images:
-        return None
-    image = ref_images[0]
-    image_data = image.get("base64", "")
-    if not image_data:
-        return None
-
-    ext = _IMAGE_EXT_MAP.get(image.get("mime", "image/png"), ".png")
-    tmp = tempfile.NamedTemporaryFile(suffix=ext, delete=False)
-    try:
-        tmp.write(base64.b64decode(image_data))
-        tmp.flush()
-        return tmp.name
-    finally:
-        tmp.close()
-
-
 def _is_invalid_bearer_token(value: str) -> bool:
     token = (value or "").strip()
     return (not token) or (not token.isascii()) or any(ch.isspace() for ch in token)
 
 
-def _poll_sora_task(service, task_id: str, timeout_seconds: int = 900, interval_seconds: int = 5):
-    deadline = time.time() + timeout_seconds
+def _watch_sora_task(
+    service,
+    task_id: str,
+    timeout_seconds: int = 900,
+    interval_seconds: int = 5,
+    on_progress: Optional[Callable[[int], None]] = None,
+    record_history: bool = True,
+) -> Future:
+    """跟踪 Sora2 任务；Future 结果为最终 Sora2Task，超时时为最后一次查询到的任务（可能为 None）"""
     last_task = None
-    while time.time() < deadline:
+
+    def _check():
+        nonlocal last_task
         last_task = service.query_task(task_id)
-        if last_task.status == Sora2TaskStatus.COMPLETED:
-            return last_task
-        if last_task.status == Sora2TaskStatus.FAILED:
+        if last_task.status in (Sora2TaskStatus.COMPLETED, Sora2TaskStatus.FAILED):
             return last_task
-        time.sleep(interval_seconds)
-    return last_task
+        return PollPending(last_task.progress or None)
+
+    future = remote_task_poller.watch(
+        _check,
+        interval_seconds=interval_seconds,
+        timeout_seconds=timeout_seconds,
+        key=type(service).__name__,
+        succeeded=lambda task: task.status == Sora2TaskStatus.COMPLETED,
+        on_progress=on_progress,
+        record_history=record_history,
+    )
+    return _map_future(future, lambda task: task or last_task)
+
+
+def _poll_sora_task(service, task_id: str, timeout_seconds: int = 900, interval_seconds: int = 5):
+    return _watch_sora_task(service, task_id, timeout_seconds, interval_seconds).result()
 
 
 class NanoBananaYunwuGenerator(BaseImageGenerator):
@@ -207,7 +321,7 @@ class NanoBananaYunwuGenerator(BaseImageGenerator):
 
         service = NanoBananaYunwu(api_key)
         kwargs = {
-            "ref_images": request.ref_images or [],
+            "ref_images": self.prepare_ref_images(request.ref_images),
             "download_dir": request.download_dir,
         }
 
@@ -221,9 +335,9 @@ class NanoBananaYunwuGenerator(BaseImageGenerator):
             return ImageGenerationResult(success=False, error_message=result.error_message)
 
         file_path = result.file_path
-        if not file_path and result.image_data and result.mime_type and request.download_dir:
-            file_path = _save_base64_image(
-                result.image_data,
+        if not file_path and result.image_bytes and result.mime_type and request.download_dir:
+            file_path = _save_image_bytes(
+                result.image_bytes,
                 result.mime_type,
                 request.download_dir,
                 "nanobanana_yw",
@@ -231,7 +345,7 @@ class NanoBananaYunwuGenerator(BaseImageGenerator):
 
         return ImageGenerationResult(
             success=True,
-            image_data=result.image_data,
+            image_bytes=result.image_bytes,
             mime_type=result.mime_type,
             file_path=file_path,
         )
@@ -254,15 +368,15 @@ class NanoBananaXiaobanshouGenerator(BaseImageGenerator):
             prompt=request.prompt,
             aspect_ratio=request.aspect_ratio,
             image_size=request.image_size,
-            ref_images=request.ref_images or [],
+            ref_images=self.prepare_ref_images(request.ref_images),
         )
         if not result.success:
             return ImageGenerationResult(success=False, error_message=result.error_message)
 
         file_path = result.file_path
-        if not file_path and result.image_data and result.mime_type and request.download_dir:
-            file_path = _save_base64_image(
-                result.image_data,
+        if not file_path and result.image_bytes and result.mime_type and request.download_dir:
+            file_path = _save_image_bytes(
+                result.image_bytes,
                 result.mime_type,
                 request.download_dir,
                 "nanobanana_xbs",
@@ -270,7 +384,7 @@ class NanoBananaXiaobanshouGenerator(BaseImageGenerator):
 
         return ImageGenerationResult(
             success=True,
-            image_data=result.image_data,
+            image_bytes=result.image_bytes,
             mime_type=result.mime_type,
             file_path=file_path,
         )
@@ -303,16 +417,16 @@ class NanoBananaHetangGenerator(BaseImageGenerator):
             prompt=request.prompt,
             aspect_ratio=request.aspect_ratio,
             image_size=request.image_size,
-            ref_images=request.ref_images or [],
+            ref_images=self.prepare_ref_images(request.ref_images),
             download_dir=str(request.download_dir) if request.download_dir else None,
         )
         if not result.success:
             return ImageGenerationResult(success=False, error_message=result.error_message)
 
         file_path = result.file_path
-        if not file_path and result.image_data and result.mime_type and request.download_dir:
-            file_path = _save_base64_image(
-                result.image_data,
+        if not file_path and result.image_bytes and result.mime_type and request.download_dir:
+            file_path = _save_image_bytes(
+                result.image_bytes,
                 result.mime_type,
                 request.download_dir,
                 "nanobanana_hetang",
@@ -320,7 +434,7 @@ class NanoBananaHetangGenerator(BaseImageGenerator):
 
         return ImageGenerationResult(
             success=True,
-            image_data=result.image_data,
+            image_bytes=result.image_bytes,
             mime_type=result.mime_type,
             file_path=file_path,
         )
@@ -340,7 +454,7 @@ class NanoBananaBandianwaGenerator(BaseImageGenerator):
 
         service = NanoBananaBandianwa(api_key)
         kwargs = {
-            "ref_images": request.ref_images or [],
+            "ref_images": self.prepare_ref_images(request.ref_images),
             "download_dir": request.download_dir,
         }
 
@@ -354,9 +468,9 @@ class NanoBananaBandianwaGenerator(BaseImageGenerator):
             return ImageGenerationResult(success=False, error_message=result.error_message)
 
         file_path = result.file_path
-        if not file_path and result.image_data and result.mime_type and request.download_dir:
-            file_path = _save_base64_image(
-                result.image_data,
+        if not file_path and result.image_bytes and result.mime_type and request.download_dir:
+            file_path = _save_image_bytes(
+                result.image_bytes,
                 result.mime_type,
                 request.download_dir,
                 "nanobanana_bdw",
@@ -364,7 +478,7 @@ class NanoBananaBandianwaGenerator(BaseImageGenerator):
 
         return ImageGenerationResult(
             success=True,
-            image_data=result.image_data,
+            image_bytes=result.image_bytes,
             mime_type=result.mime_type,
             file_path=file_path,
         )
@@ -387,16 +501,16 @@ class GptImageBandianwaGenerator(BaseImageGenerator):
             prompt=request.prompt,
             aspect_ratio=request.aspect_ratio,
             image_size=request.image_size,
-            ref_images=request.ref_images or [],
+            ref_images=self.prepare_ref_images(request.ref_images),
             download_dir=request.download_dir,
         )
         if not result.success:
             return ImageGenerationResult(success=False, error_message=result.error_message)
 
         file_path = result.file_path
-        if not file_path and result.image_data and result.mime_type and request.download_dir:
-            file_path = _save_base64_image(
-                result.image_data,
+        if not file_path and result.image_bytes and result.mime_type and request.download_dir:
+            file_path = _save_image_bytes(
+                result.image_bytes,
                 result.mime_type,
                 request.download_dir,
                 "gpt_image_bdw",
@@ -404,7 +518,7 @@ class GptImageBandianwaGenerator(BaseImageGenerator):
 
         return ImageGenerationResult(
             success=True,
-            image_data=result.image_data,
+            image_bytes=result.image_bytes,
             mime_type=result.mime_type,
             file_path=file_path,
         )
@@ -427,16 +541,16 @@ class GptImageXiaobanshouGenerator(BaseImageGenerator):
             prompt=request.prompt,
             aspect_ratio=request.aspect_ratio,
             image_size=request.image_size,
-            ref_images=request.ref_images or [],
+            ref_images=self.prepare_ref_images(request.ref_images),
             download_dir=request.download_dir,
         )
         if not result.success:
             return ImageGenerationResult(success=False, error_message=result.error_message)
 
         file_path = result.file_path
-        if not file_path and result.image_data and result.mime_type and request.download_dir:
-            file_path = _save_base64_image(
-                result.image_data,
+        if not file_path and result.image_bytes and result.mime_type and request.download_dir:
+            file_path = _save_image_bytes(
+                result.image_bytes,
                 result.mime_type,
                 request.download_dir,
                 "gpt_image_xbs",
@@ -444,7 +558,7 @@ class GptImageXiaobanshouGenerator(BaseImageGenerator):
 
         return ImageGenerationResult(
             success=True,
-            image_data=result.image_data,
+            image_bytes=result.image_bytes,
             mime_type=result.mime_type,
             file_path=file_path,
         )
@@ -472,7 +586,7 @@ class HetangVeo3Generator(BaseVideoGenerator):
         if not api_key or not base_url:
             return VideoGenerationResult(success=False, error_message=self.get_missing_key_message())
 
-        image_path = _write_temp_image(request.ref_images)
+        ref_image = first_ref_image(self.prepare_ref_images(request.ref_images))
 
         try:
             service = VeoHetang(api_key, base_url)
@@ -480,7 +594,7 @@ class HetangVeo3Generator(BaseVideoGenerator):
                 prompt=request.prompt,
                 orientation=request.orientation,
                 duration=request.duration,
-                ref_image_path=image_path,
+                ref_image_path=ref_image,
                 download_dir=str(request.download_dir) if request.download_dir else None,
             )
             if not result.success:
@@ -494,35 +608,42 @@ class HetangVeo3Generator(BaseVideoGenerator):
         except Exception as exc:
             logger.error(f"[{self.platform_label}/{self.provider_label}] 视频生成异常: {exc}")
             return VideoGenerationResult(success=False, error_message=str(exc))
-        finally:
-            if image_path and os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except OSError:
-                    pass
 
 
-class BandianwaVeoGenerator(BaseVideoGenerator):
+class BaseVeoGenerator(BaseVideoGenerator, ABC):
+    """异步任务型 VEO 渠道的通用生成器：渠道差异由 create_service() 返回的 VeoBase 实例承担。"""
+
     platform = "veo3"
-    provider = "bandianwa"
     platform_label = "VEO3"
-    provider_label = "BDW"
-    setting_key = SettingKeys.BANDIANWA_API_KEY
+    supports_resume = True
+
+    @abstractmethod
+    def create_service(self, api_key: str, settings: dict) -> VeoBase:
+        raise NotImplementedError
+
+    def validate(self, settings: dict) -> Optional[str]:
+        """校验配置，返回错误信息；配置可用时返回 None"""
+        if not self.get_api_key(settings):
+            return self.get_missing_key_message()
+        return None
+
+    def _log_error(self, action: str, exc: Exception) -> None:
+        logger.error(f"[{self.platform_label}/{self.provider_label}] {action}异常: {exc}")
 
     def generate(self, request: VideoGenerationRequest, settings: dict) -> VideoGenerationResult:
-        api_key = self.get_api_key(settings)
-        if not api_key:
-            return VideoGenerationResult(success=False, error_message=self.get_missing_key_message())
+        error_message = self.validate(settings)
+        if error_message:
+            return VideoGenerationResult(success=False, error_message=error_message)
 
-        image_path = _write_temp_image(request.ref_images)
+        ref_image = first_ref_image(self.prepare_ref_images(request.ref_images))
 
         try:
-            service = VeoBandianwa(api_key)
+            service = self.create_service(self.get_api_key(settings), settings)
             result = service.generate(
                 prompt=request.prompt,
                 orientation=request.orientation,
                 duration=request.duration,
-                ref_image_path=image_path,
+                ref_image_path=ref_image,
                 download_dir=str(request.download_dir) if request.download_dir else None,
             )
             if not result.success:
@@ -534,296 +655,212 @@ class BandianwaVeoGenerator(BaseVideoGenerator):
                 file_path=result.file_path,
             )
         except Exception as exc:
-            logger.error(f"[{self.platform_label}/{self.provider_label}] 视频生成异常: {exc}")
+            self._log_error("视频生成", exc)
             return VideoGenerationResult(success=False, error_message=str(exc))
-        finally:
-            if image_path and os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except OSError:
-                    pass
 
+    def submit(self, request: VideoGenerationRequest, settings: dict) -> VideoSubmission:
+        error_message = self.validate(settings)
+        if error_message:
+            return VideoSubmission(success=False, error_message=error_message)
 
-class XiaobanshouVeoGenerator(BaseVideoGenerator):
-    platform = "veo3"
-    provider = "xiaobanshou"
-    platform_label = "VEO3"
-    provider_label = "XBS"
-    setting_key = SettingKeys.XIAOBANSHOU_API_KEY
-
-    def generate(self, request: VideoGenerationRequest, settings: dict) -> VideoGenerationResult:
-        api_key = self.get_api_key(settings)
-        if not api_key:
-            return VideoGenerationResult(success=False, error_message=self.get_missing_key_message())
-
-        image_path = _write_temp_image(request.ref_images)
+        ref_image = first_ref_image(self.prepare_ref_images(request.ref_images))
 
         try:
-            service = VeoXiaobanshou(api_key)
-            result = service.generate(
+            service = self.create_service(self.get_api_key(settings), settings)
+            task_id = service.submit(
                 prompt=request.prompt,
                 orientation=request.orientation,
                 duration=request.duration,
-                ref_image_path=image_path,
-                download_dir=str(request.download_dir) if request.download_dir else None,
-            )
-            if not result.success:
-                return VideoGenerationResult(success=False, error_message=result.error_message)
-
-            return VideoGenerationResult(
-                success=True,
-                video_url=result.video_url,
-                file_path=result.file_path,
+                ref_image_path=ref_image,
             )
+            if not task_id:
+                return VideoSubmission(success=False, error_message="任务提交失败")
+            return VideoSubmission(success=True, remote_task_id=str(task_id))
         except Exception as exc:
-            logger.error(f"[{self.platform_label}/{self.provider_label}] 视频生成异常: {exc}")
-            return VideoGenerationResult(success=False, error_message=str(exc))
-        finally:
-            if image_path and os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except OSError:
-                    pass
+            self._log_error("视频任务提交", exc)
+            return VideoSubmission(success=False, error_message=str(exc))
+
+    def watch(
+        self,
+        remote_task_id: str,
+        settings: dict,
+        on_progress: Optional[Callable[[int], None]] = None,
+        record_history: bool = True,
+    ) -> Future:
+        service = self.create_service(self.get_api_key(settings), settings)
+
+        def _to_result(result) -> VideoGenerationResult:
+            if not result or not result.success or not result.video_url:
+                return VideoGenerationResult(
+                    success=False,
+                    error_message=(result.error_message if result else None) or "任务轮询失败",
+                )
+            return VideoGenerationResult(success=True, video_url=result.video_url)
+
+        return _map_future(
+            service.watch(remote_task_id, on_progress=on_progress, record_history=record_history), _to_result
+        )
 
+    def fetch(self, video_url: str, download_dir: Path, settings: dict) -> str:
+        service = self.create_service(self.get_api_key(settings), settings)
+        return service.fetch(video_url, str(download_dir))
 
-class ZygVeoGenerator(BaseVideoGenerator):
-    platform = "veo3"
+
+class BandianwaVeoGenerator(BaseVeoGenerator):
+    provider = "bandianwa"
+    provider_label = "BDW"
+    setting_key = SettingKeys.BANDIANWA_API_KEY
+
+    def create_service(self, api_key: str, settings: dict) -> VeoBase:
+        return VeoBandianwa(api_key)
+
+
+class XiaobanshouVeoGenerator(BaseVeoGenerator):
+    provider = "xiaobanshou"
+    provider_label = "XBS"
+    setting_key = SettingKeys.XIAOBANSHOU_API_KEY
+
+    def create_service(self, api_key: str, settings: dict) -> VeoBase:
+        return VeoXiaobanshou(api_key)
+
+
+class ZygVeoGenerator(BaseVeoGenerator):
     provider = "zyg"
-    platform_label = "VEO3"
     provider_label = "ZYG"
     setting_key = SettingKeys.ZYG_API_KEY
 
-    def generate(self, request: VideoGenerationRequest, settings: dict) -> VideoGenerationResult:
-        api_key = self.get_api_key(settings)
-        if not api_key:
-            return VideoGenerationResult(success=False, error_message=self.get_missing_key_message())
-        if _is_invalid_bearer_token(api_key):
-            return VideoGenerationResult(
-                success=False,
-                error_message="ZYG API Key 配置异常：当前内容包含中文或空白字符，请在设置页重新粘贴正确的 API Key",
-            )
-
-        image_path = _write_temp_image(request.ref_images)
-
-        try:
-            service = VeoZyg(api_key)
-            result = service.generate(
-                prompt=request.prompt,
-                orientation=request.orientation,
-                duration=request.duration,
-                ref_image_path=image_path,
-                download_dir=str(request.download_dir) if request.download_dir else None,
-            )
-            if not result.success:
-                return VideoGenerationResult(success=False, error_message=result.error_message)
+    def validate(self, settings: dict) -> Optional[str]:
+        error_message = super().validate(settings)
+        if error_message:
+            return error_message
+        if _is_invalid_bearer_token(self.get_api_key(settings)):
+            return "ZYG API Key 配置异常：当前内容包含中文或空白字符，请在设置页重新粘贴正确的 API Key"
+        return None
 
-            return VideoGenerationResult(
-                success=True,
-                video_url=result.video_url,
-                file_path=result.file_path,
-            )
-        except Exception as exc:
-            logger.error(f"[{self.platform_label}/{self.provider_label}] 视频生成异常: {exc}")
-            return VideoGenerationResult(success=False, error_message=str(exc))
-        finally:
-            if image_path and os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except OSError:
-                    pass
+    def create_service(self, api_key: str, settings: dict) -> VeoBase:
+        return VeoZyg(api_key)
 
 
-class ChaowenVeoGenerator(BaseVideoGenerator):
-    platform = "veo3"
+class ChaowenVeoGenerator(BaseVeoGenerator):
     provider = "chaowen"
-    platform_label = "VEO3"
     provider_label = "CW"
     setting_key = SettingKeys.CHAOWEN_VEO_API_KEY
+    ref_image_spec = CHAOWEN_IMAGE_SPEC
 
     def get_base_url(self, settings: dict) -> str:
         return (settings.get(SettingKeys.CHAOWEN_VEO_BASE_URL) or "").strip().rstrip("/")
 
-    def generate(self, request: VideoGenerationRequest, settings: dict) -> VideoGenerationResult:
-        api_key = self.get_api_key(settings)
-        if not api_key:
-            return VideoGenerationResult(success=False, error_message=self.get_missing_key_message())
-
-        base_url = self.get_base_url(settings)
-        image_path = _write_temp_image(request.ref_images)
-
-        try:
-            service = VeoChaowen(api_key, base_url)
-            result = service.generate(
-                prompt=request.prompt,
-                orientation=request.orientation,
-                duration=request.duration,
-                ref_image_path=image_path,
-                download_dir=str(request.download_dir) if request.download_dir else None,
-            )
-            if not result.success:
-                return VideoGenerationResult(success=False, error_message=result.error_message)
-
-            return VideoGenerationResult(
-                success=True,
-                video_url=result.video_url,
-                file_path=result.file_path,
-            )
-        except Exception as exc:
-            logger.error(f"[{self.platform_label}/{self.provider_label}] 视频生成异常: {exc}")
-            return VideoGenerationResult(success=False, error_message=str(exc))
-        finally:
-            if image_path and os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except OSError:
-                    pass
+    def create_service(self, api_key: str, settings: dict) -> VeoBase:
+        return VeoChaowen(api_key, self.get_base_url(settings))
 
 
-class HoloVeoGenerator(BaseVideoGenerator):
-    platform = "veo3"
+class HoloVeoGenerator(BaseVeoGenerator):
     provider = "holo"
-    platform_label = "VEO3"
     provider_label = "HOLO"
     setting_key = SettingKeys.HOLO_VEO_API_KEY
 
     def get_base_url(self, settings: dict) -> str:
         return (settings.get(SettingKeys.HOLO_VEO_BASE_URL) or "").strip().rstrip("/")
 
-    def generate(self, request: VideoGenerationRequest, settings: dict) -> VideoGenerationResult:
-        api_key = self.get_api_key(settings)
-        if not api_key:
-            return VideoGenerationResult(success=False, error_message=self.get_missing_key_message())
+    def create_service(self, api_key: str, settings: dict) -> VeoBase:
+        return VeoHolo(api_key, self.get_base_url(settings))
 
-        base_url = self.get_base_url(settings)
-        image_path = _write_temp_image(request.ref_images)
 
-        try:
-            service = VeoHolo(api_key, base_url)
-            result = service.generate(
-                prompt=request.prompt,
-                orientation=request.orientation,
-                duration=request.duration,
-                ref_image_path=image_path,
-                download_dir=str(request.download_dir) if request.download_dir else None,
-            )
-            if not result.success:
-                return VideoGenerationResult(success=False, error_message=result.error_message)
-
-            return VideoGenerationResult(
-                success=True,
-                video_url=result.video_url,
-                file_path=result.file_path,
-            )
-        except Exception as exc:
-            logger.error(f"[{self.platform_label}/{self.provider_label}] 视频生成异常: {exc}")
-            return VideoGenerationResult(success=False, error_message=str(exc))
-        finally:
-            if image_path and os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except OSError:
-                    pass
-
-
-class CatKingVeoGenerator(BaseVideoGenerator):
-    platform = "veo3"
+class CatKingVeoGenerator(BaseVeoGenerator):
     provider = "catking"
-    platform_label = "VEO3"
     provider_label = "CatKing"
     setting_key = SettingKeys.CATKING_VEO_API_KEY
 
     def get_base_url(self, settings: dict) -> str:
         return (settings.get(SettingKeys.CATKING_VEO_BASE_URL) or "").strip().rstrip("/")
 
-    def generate(self, request: VideoGenerationRequest, settings: dict) -> VideoGenerationResult:
-        api_key = self.get_api_key(settings)
-        if not api_key:
-            return VideoGenerationResult(success=False, error_message=self.get_missing_key_message())
-
-        base_url = self.get_base_url(settings)
-        image_path = _write_temp_image(request.ref_images)
-
-        try:
-            service = VeoCatking(api_key, base_url)
-            result = service.generate(
-                prompt=request.prompt,
-                orientation=request.orientation,
-                duration=request.duration,
-                ref_image_path=image_path,
-                download_dir=str(request.download_dir) if request.download_dir else None,
-            )
-            if not result.success:
-                return VideoGenerationResult(success=False, error_message=result.error_message)
-
-            return VideoGenerationResult(
-                success=True,
-                video_url=result.video_url,
-                file_path=result.file_path,
-            )
-        except Exception as exc:
-            logger.error(f"[{self.platform_label}/{self.provider_label}] 视频生成异常: {exc}")
-            return VideoGenerationResult(success=False, error_message=str(exc))
-        finally:
-            if image_path and os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except OSError:
-                    pass
+    def create_service(self, api_key: str, settings: dict) -> VeoBase:
+        return VeoCatking(api_key, self.get_base_url(settings))
 
 
 class BaseSora2Generator(BaseVideoGenerator, ABC):
     platform = "sora2"
     platform_label = "Sora2"
+    supports_resume = True
+    poll_interval_seconds = 5
+    poll_timeout_seconds = 900
 
     @abstractmethod
     def create_service(self, api_key: str):
         raise NotImplementedError
 
     @abstractmethod
-    def build_create_kwargs(self, request: VideoGenerationRequest, image_path: Optional[str]) -> dict:
+    def build_create_kwargs(self, request: VideoGenerationRequest, ref_image: Optional[ReferenceImage]) -> dict:
         raise NotImplementedError
 
-    def generate(self, request: VideoGenerationRequest, settings: dict) -> VideoGenerationResult:
+    def submit(self, request: VideoGenerationRequest, settings: dict) -> VideoSubmission:
         api_key = self.get_api_key(settings)
         if not api_key:
-            return VideoGenerationResult(success=False, error_message=self.get_missing_key_message())
+            return VideoSubmission(success=False, error_message=self.get_missing_key_message())
 
-        image_path = _write_temp_image(request.ref_images)
+        ref_image = first_ref_image(self.prepare_ref_images(request.ref_images))
         try:
             service = self.create_service(api_key)
-            task = service.create_task(request.prompt, **self.build_create_kwargs(request, image_path))
+            task = service.create_task(request.prompt, **self.build_create_kwargs(request, ref_image))
             if task.status == Sora2TaskStatus.FAILED:
-                return VideoGenerationResult(success=False, error_message=task.error_message or "视频任务创建失败")
-
-            if task.video_url:
-                video_url = task.video_url
-            else:
-                if not task.task_id:
-                    return VideoGenerationResult(success=False, error_message=task.error_message or "未返回任务 ID")
-                queried = _poll_sora_task(service, task.task_id)
-                if queried is None:
-                    return VideoGenerationResult(success=False, error_message="任务轮询失败")
-                if queried.status != Sora2TaskStatus.COMPLETED or not queried.video_url:
-                    return VideoGenerationResult(
-                        success=False,
-                        error_message=queried.error_message or "视频任务未完成",
-                    )
-                video_url = queried.video_url
+                return VideoSubmission(success=False, error_message=task.error_message or "视频任务创建失败")
+            if not task.video_url and not task.task_id:
+                return VideoSubmission(success=False, error_message=task.error_message or "未返回任务 ID")
+            return VideoSubmission(success=True, remote_task_id=task.task_id or "", video_url=task.video_url)
+        except Exception as exc:
+            logger.error(f"[{self.platform_label}/{self.provider_label}] 视频任务提交异常: {exc}")
+            return VideoSubmission(success=False, error_message=str(exc))
+
+    def watch(
+        self,
+        remote_task_id: str,
+        settings: dict,
+        on_progress: Optional[Callable[[int], None]] = None,
+        record_history: bool = True,
+    ) -> Future:
+        service = self.create_service(self.get_api_key(settings))
+
+        def _to_result(task) -> VideoGenerationResult:
+            if task is None:
+                return VideoGenerationResult(success=False, error_message="任务轮询失败")
+            if task.status != Sora2TaskStatus.COMPLETED or not task.video_url:
+                return VideoGenerationResult(success=False, error_message=task.error_message or "视频任务未完成")
+            return VideoGenerationResult(success=True, video_url=task.video_url)
+
+        future = _watch_sora_task(
+            service,
+            remote_task_id,
+            timeout_seconds=self.poll_timeout_seconds,
+            interval_seconds=self.poll_interval_seconds,
+            on_progress=on_progress,
+            record_history=record_history,
+        )
+        return _map_future(future, _to_result)
+
+    def fetch(self, video_url: str, download_dir: Path, settings: dict) -> str:
+        return _download_remote_file(video_url, download_dir, f"sora2_{self.provider}")
+
+    def generate(self, request: VideoGenerationRequest, settings: dict) -> VideoGenerationResult:
+        submission = self.submit(request, settings)
+        if not submission.success:
+            return VideoGenerationResult(success=False, error_message=submission.error_message)
+
+        try:
+            video_url = submission.video_url
+            if not video_url:
+                polled = self.watch(submission.remote_task_id, settings).result()
+                if not polled.success:
+                    return polled
+                video_url = polled.video_url
 
             file_path = None
             if request.download_dir:
-                file_path = _download_remote_file(video_url, request.download_dir, f"sora2_{self.provider}")
+                file_path = self.fetch(video_url, request.download_dir, settings)
 
             return VideoGenerationResult(success=True, video_url=video_url, file_path=file_path)
         except Exception as exc:
             logger.error(f"[{self.platform_label}/{self.provider_label}] 视频生成异常: {exc}")
             return VideoGenerationResult(success=False, error_message=str(exc))
-        finally:
-            if image_path and os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except OSError:
-                    pass
 
 
 class Sora2DayangyuGenerator(BaseSora2Generator):
@@ -834,14 +871,14 @@ class Sora2DayangyuGenerator(BaseSora2Generator):
     def create_service(self, api_key: str):
         return Sora2Dayangyu(api_key)
 
-    def build_create_kwargs(self, request: VideoGenerationRequest, image_path: Optional[str]) -> dict:
+    def build_create_kwargs(self, request: VideoGenerationRequest, ref_image: Optional[ReferenceImage]) -> dict:
         # 模型由 Sora2Dayangyu.resolve_model() 根据 orientation/duration 自动选取
         kwargs = {
             "orientation": request.orientation,
             "duration": request.duration,
         }
-        if image_path:
-            kwargs["image_path"] = image_path
+        if ref_image:
+            kwargs["image_path"] = ref_image
         return kwargs
 
 
@@ -853,14 +890,14 @@ class Sora2XiaobanshouGenerator(BaseSora2Generator):
     def create_service(self, api_key: str):
         return Sora2Xiaobanshou(api_key)
 
-    def build_create_kwargs(self, request: VideoGenerationRequest, image_path: Optional[str]) -> dict:
+    def build_create_kwargs(self, request: VideoGenerationRequest, ref_image: Optional[ReferenceImage]) -> dict:
         # 模型由 Sora2Xiaobanshou.resolve_model() 根据 orientation/duration 自动选取
         kwargs = {
             "orientation": request.orientation,
             "duration": request.duration,
         }
-        if image_path:
-            kwargs["image_path"] = image_path
+        if ref_image:
+            kwargs["image_path"] = ref_image
         return kwargs
 
 
@@ -872,14 +909,14 @@ class Sora2BandianwaGenerator(BaseSora2Generator):
     def create_service(self, api_key: str):
         return Sora2Bandianwa(api_key)
 
-    def build_create_kwargs(self, request: VideoGenerationRequest, image_path: Optional[str]) -> dict:
+    def build_create_kwargs(self, request: VideoGenerationRequest, ref_image: Optional[ReferenceImage]) -> dict:
         # 模型由 Sora2Bandianwa.resolve_model() 根据 orientation/duration 自动选取
         kwargs = {
             "orientation": request.orientation,
             "duration": request.duration,
         }
-        if image_path:
-            kwargs["image_path"] = image_path
+        if ref_image:
+            kwargs["image_path"] = ref_image
         return kwargs
 
 
@@ -912,18 +949,38 @@ class MediaGenerationRegistry:
         if not matches:
             return None
 
+        # is_available 在半开状态会占用唯一的试探名额，只对最终会选中的生成器调用
+        def first_healthy(exclude=None):
+            return next(
+                (
+                    generator for generator in matches
+                    if generator is not exclude
+                    and generator.is_configured(settings)
+                    and provider_health.is_available(generator.key)
+                ),
+                None,
+            )
+
         provider = (provider or "").strip()
         if provider:
             exact = next((generator for generator in matches if generator.provider == provider), None)
             if exact:
-                return exact
+                if provider_health.is_available(exact.key):
+                    return exact
+                healthy = first_healthy(exclude=exact)
+                if not healthy:
+                    return exact
+                logger.warning(f"[Registry] {exact.key} 已熔断，改用同平台渠道 {healthy.key}")
+                return healthy
 
         configured = next((generator for generator in matches if generator.is_configured(settings)), None)
-        return configured or matches[0]
+        return first_healthy() or configured or matches[0]
 
     @staticmethod
     def _pick_first_configured(generators: dict, settings: dict):
-        return next((generator for generator in generators.values() if generator.is_configured(settings)), None)
+        configured = [generator for generator in generators.values() if generator.is_configured(settings)]
+        healthy = next((generator for generator in configured if provider_health.is_available(generator.key)), None)
+        return healthy or next(iter(configured), None)
 
     def _resolve_generator(self, generators: dict, settings: dict, platform: str, provider: str, candidates: list[tuple[str, str]]):
         platform = self._clean(platform)
@@ -1008,6 +1065,111 @@ class MediaGenerationRegistry:
             ],
         )
 
+    def resolve_race_generators(
+        self,
+        settings: dict,
+        platform: str = "",
+        provider: str = "",
+        fan_out: int = 2,
+    ) -> list:
+        """竞速候选：首选生成器 + 同平台其余已配置、支持分步接口且未熔断的视频生成器，数量不超过 fan_out。
+
+        不同平台（如 Sora2 与 VEO）产出的视频不同，不混在一起竞速。
+        """
+        primary, _, _ = self.resolve_video_generator(settings, platform, provider)
+        if not primary:
+            return []
+
+        others = []
+        for generator in self._video_generators.values():
+            if len(others) >= fan_out - 1:
+                break
+            if (
+                generator is primary
+                or generator.platform != primary.platform
+                or not generator.supports_resume
+                or not generator.is_configured(settings)
+            ):
+                continue
+            # is_available 在半开状态会占用试探名额，只对确定加入竞速的候选调用
+            if provider_health.is_available(generator.key):
+                others.append(generator)
+        return [primary] + others
+
+    @staticmethod
+    def _start_race_entry(generator: BaseVideoGenerator, request: VideoGenerationRequest, settings: dict):
+        """提交一个竞速分支：返回跟踪中的 Future，或已确定的 VideoGenerationResult"""
+        if not generator.supports_resume:
+            return generator.generate(request, settings)
+        submission = generator.submit(request, settings)
+        if not submission.success:
+            return VideoGenerationResult(success=False, error_message=submission.error_message)
+        if submission.video_url:
+            return VideoGenerationResult(success=True, video_url=submission.video_url)
+        return generator.watch(submission.remote_task_id, settings)
+
+    def race_video(self, request: VideoGenerationRequest, settings: dict, contestants: list) -> VideoRaceResult:
+        """同一请求并发提交到多个渠道，取最先成功者；其余分支停止跟踪，只有胜出者下载成品。
+
+        注意：落败分支只是在本地取消跟踪，供应商没有取消接口，远程任务仍会跑完并照常计费，
+        竞速的费用约为 fan_out 倍。
+        """
+        keys = [generator.key for generator in contestants]
+        if len(contestants) <= 1:
+            generator = contestants[0] if contestants else None
+            if not generator:
+                return VideoRaceResult(VideoGenerationResult(success=False, error_message="没有可用的视频生成器"))
+            return VideoRaceResult(generate_tracked(generator, request, settings), generator, keys)
+
+        logger.info(f"[Registry] 竞速生成 | contestants={keys}")
+        started = time.monotonic()
+        probe = replace(request, download_dir=None)
+        executor = ThreadPoolExecutor(max_workers=len(contestants), thread_name_prefix="VideoRace")
+        pending = {
+            executor.submit(self._start_race_entry, generator, probe, settings): generator
+            for generator in contestants
+        }
+        winner, result, errors = None, None, []
+        try:
+            while pending and winner is None:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    generator = pending.pop(future)
+                    try:
+                        outcome = future.result()
+                    except Exception as exc:
+                        outcome = VideoGenerationResult(success=False, error_message=str(exc))
+                    if isinstance(outcome, Future):
+                        pending[outcome] = generator
+                        continue
+                    if outcome.success and outcome.video_url:
+                        provider_health.record_success(generator.key, time.monotonic() - started)
+                        winner, result = generator, outcome
+                        break
+                    provider_health.record_failure(generator.key, outcome.error_message, time.monotonic() - started)
+                    errors.append(f"{generator.key}: {outcome.error_message or '生成失败'}")
+                    logger.warning(f"[Registry] 竞速分支失败 | {errors[-1]}")
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+        if not winner:
+            return VideoRaceResult(
+                VideoGenerationResult(success=False, error_message="；".join(errors) or "所有渠道均生成失败"),
+                None,
+                keys,
+            )
+
+        logger.info(f"[Registry] 竞速胜出 | winner={winner.key} | 放弃 {len(pending)} 个分支")
+        if request.download_dir:
+            try:
+                result.file_path = winner.fetch(result.video_url, request.download_dir, settings)
+            except Exception as exc:
+                logger.error(f"[Registry] 竞速胜出者下载失败 | winner={winner.key} | {exc}")
+                result = VideoGenerationResult(success=False, video_url=result.video_url, error_message=f"视频下载失败: {exc}")
+        return VideoRaceResult(result, winner, keys)
+
     def list_image_options(self, settings: dict) -> list[GeneratorOption]:
         return [generator.to_option(settings) for generator in self._image_generators.values()]
 
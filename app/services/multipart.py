@@ -0,0 +1,164 @@
+"""流式 multipart/form-data 请求体
+
+requests 的 files= 会把整个请求体（含图片）拼成 bytes 再发送，十几 MB 的参考图在多任务并发时
+会让内存峰值成倍增长。MultipartEncoder 只在内存中保存各段的头部，文件内容在发送时按块从磁盘读取：
+- 作为 http_client.post(data=encoder) 传入，长度已知，requests 发送 Content-Length 而非分块编码；
+- 支持 read() / 迭代 / seek(0)，请求被重定向或重试时可以从头重发。
+
+文件来源可以是本地路径（含 ReferenceImage 等 PathLike）或已在内存中的 bytes。
+"""
+
+import io
+import mimetypes
+import os
+import uuid
+from typing import Iterable, Optional, Union
+
+CHUNK_SIZE = 64 * 1024
+
+FileSource = Union[str, os.PathLike, bytes]
+
+
+def _quote(value: str) -> str:
+    """按 HTML5 规则转义 Content-Disposition 中的参数值（与 urllib3 一致）"""
+    return value.replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class _FileSegment:
+    def __init__(self, path: str):
+        self.path = path
+        self.length = os.path.getsize(path)
+
+
+class MultipartEncoder(io.RawIOBase):
+    """按需从磁盘读取文件内容的 multipart 请求体"""
+
+    def __init__(
+        self,
+        fields: Iterable[tuple] = (),
+        files: Iterable[tuple] = (),
+        field_content_type: Optional[str] = None,
+        boundary: Optional[str] = None,
+    ):
+        """
+        Args:
+            fields:             (字段名, 值) 列表，值按 UTF-8 编码
+            files:              (字段名, 文件名, 来源, MIME) 列表，MIME 为空时按文件名推断
+            field_content_type: 普通字段的 Content-Type 头，如 "text/plain; charset=utf-8"；None 表示不写
+        """
+        super().__init__()
+        self.boundary = boundary or f"glin-{uuid.uuid4().hex}"
+        self._segments: list = []
+        for name, value in fields:
+            header = f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n'
+            if field_content_type:
+                header += f"Content-Type: {field_content_type}\r\n"
+            value = value if isinstance(value, bytes) else str("" if value is None else value).encode("utf-8")
+            self._append(header.encode("utf-8") + b"\r\n" + value + b"\r\n")
+        for name, filename, source, mime in files:
+            mime = mime or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            self._append((
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"; '
+                f'filename="{_quote(filename)}"\r\nContent-Type: {mime}\r\n\r\n'
+            ).encode("utf-8"))
+            self._append(bytes(source) if isinstance(source, (bytes, bytearray)) else _FileSegment(os.fspath(source)))
+            self._append(b"\r\n")
+        self._append(f"--{self.boundary}--\r\n".encode("ascii"))
+
+        self._length = sum(self._segment_length(segment) for segment in self._segments)
+        self._position = 0
+        self._index = 0
+        self._offset = 0
+        self._handle = None
+
+    def _append(self, segment) -> None:
+        if isinstance(segment, bytes) and self._segments and isinstance(self._segments[-1], bytes):
+            self._segments[-1] += segment
+        else:
+            self._segments.append(segment)
+
+    @staticmethod
+    def _segment_length(segment) -> int:
+        return len(segment) if isinstance(segment, bytes) else segment.length
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def file_count(self) -> int:
+        return sum(1 for segment in self._segments if isinstance(segment, _FileSegment))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._position, os.SEEK_END: self._length}[whence]
+        position = max(0, min(self._length, base + offset))
+        self._close_handle()
+        self._position, self._index, self._offset = position, 0, position
+        while self._index < len(self._segments) and self._offset >= self._segment_length(self._segments[self._index]):
+            self._offset -= self._segment_length(self._segments[self._index])
+            self._index += 1
+        return position
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self._length - self._position if size is None or size < 0 else size
+        chunks = []
+        while remaining > 0 and self._index < len(self._segments):
+            segment = self._segments[self._index]
+            if isinstance(segment, bytes):
+                piece = segment[self._offset:self._offset + remaining]
+            else:
+                if self._handle is None:
+                    self._handle = open(segment.path, "rb")
+                    self._handle.seek(self._offset)
+                piece = self._handle.read(min(remaining, segment.length - self._offset))
+                if not piece:
+                    raise OSError(f"上传文件在发送过程中被截断: {segment.path}")
+            chunks.append(piece)
+            self._offset += len(piece)
+            self._position += len(piece)
+            remaining -= len(piece)
+            if self._offset >= self._segment_length(segment):
+                self._close_handle()
+                self._index += 1
+                self._offset = 0
+        return b"".join(chunks)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def to_bytes(self) -> bytes:
+        """读出完整请求体（调试与测试用，会把文件内容读入内存）"""
+        self.seek(0)
+        data = self.read()
+        self.seek(0)
+        return data
+
+    def _close_handle(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def close(self) -> None:
+        self._close_handle()
+        super().close()
@@ -1,15 +1,15 @@
 """斑点蛙 API NanoBanana 图片生成（异步任务型）"""
 
-import base64
 import os
-import re
-import time
 from typing import Optional
 
 import requests
 
 from ...logger import logger
-from .base import NanoBananaBase, NanoBananaResult
+from .. import http_client
+from ..polling import remote_task_poller
+from ..ref_image import ReferenceImage
+from .base import NanoBananaBase, NanoBananaResult, decode_image_data_url
 
 BDW_BASE = "https://api.hellobabygo.com"
 
@@ -70,15 +70,11 @@ class NanoBananaBandianwa(NanoBananaBase):
                 ref_image_path: 单张图片路径
                 download_dir:  生成后自动保存到本地的目录
         """
-        # 支持 ref_image_path：从磁盘读取图片并转为 base64
+        # 支持 ref_image_path：以参考图句柄加入列表，发送时才读取并编码
         ref_image_path = kwargs.get("ref_image_path")
         if ref_image_path and os.path.isfile(ref_image_path):
-            import mimetypes
-            mime = mimetypes.guess_type(ref_image_path)[0] or "image/jpeg"
-            with open(ref_image_path, "rb") as _f:
-                _b64 = base64.b64encode(_f.read()).decode("ascii")
             existing = list(kwargs.get("ref_images") or [])
-            existing.insert(0, {"base64": _b64, "mime": mime})
+            existing.insert(0, ReferenceImage.from_path(ref_image_path))
             kwargs = {**kwargs, "ref_images": existing}
 
         ref_images = self._collect_ref_images(kwargs)
@@ -114,9 +110,9 @@ class NanoBananaBandianwa(NanoBananaBase):
             return result or NanoBananaResult(success=False, error_message="任务轮询失败")
 
         # 如果配置了下载目录，保存图片
-        if result.success and result.image_data and download_dir:
+        if result.success and result.image_bytes and download_dir:
             result.file_path = self._save_to_dir(
-                result.image_data, result.mime_type or "image/png", str(download_dir)
+                result.image_bytes, result.mime_type or "image/png", str(download_dir)
             )
 
         return result
@@ -137,7 +133,7 @@ class NanoBananaBandianwa(NanoBananaBase):
         )
 
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
+            resp = http_client.post(url, headers=headers, json=payload, timeout=60)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
             resp.raise_for_status()
@@ -169,48 +165,51 @@ class NanoBananaBandianwa(NanoBananaBase):
         interval_seconds: int = 15,
     ) -> Optional[NanoBananaResult]:
         """轮询任务状态"""
+        return remote_task_poller.wait(
+            lambda: self._check_task(task_id),
+            interval_seconds=interval_seconds,
+            timeout_seconds=timeout_seconds,
+            default=NanoBananaResult(success=False, error_message="轮询图片结果超时"),
+            key=type(self).__name__,
+            succeeded=lambda result: result.success,
+        )
+
+    def _check_task(self, task_id: str) -> Optional[NanoBananaResult]:
+        """查询一次任务状态，仍在处理中时返回 None"""
         url = f"{self.base_url.rstrip('/')}/v1/images/{task_id}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
         }
-        deadline = time.time() + timeout_seconds
-
-        while time.time() < deadline:
-            try:
-                resp = requests.get(url, headers=headers, timeout=30)
-                logger.info(f"[{self.provider_name}] 轮询状态码: {resp.status_code}")
-                logger.info(f"[{self.provider_name}] 轮询响应: {resp.text[:500]}")
-                resp.raise_for_status()
-
-                data = resp.json()
-                status = str(data.get("status") or "").lower()
-
-                # 检查是否完成：status=completed 或 data 数组中有 url
-                if status == "completed" or self._has_image_url(data):
-                    logger.info(f"[{self.provider_name}] 任务完成 | task_id={task_id}")
-                    return self._extract_result(data)
-
-                # 检查是否失败
-                if status in _FAILED_STATUSES:
-                    error_msg = data.get("error") or data.get("message") or "任务执行失败"
-                    logger.error(f"[{self.provider_name}] 任务失败 | task_id={task_id} | error={error_msg}")
-                    return NanoBananaResult(success=False, error_message=str(error_msg))
-
-                # 继续轮询
-                if status not in _PENDING_STATUSES and status != "":
-                    logger.warning(f"[{self.provider_name}] 未识别状态: {status}")
-
-                time.sleep(interval_seconds)
+        try:
+            resp = http_client.get(url, headers=headers, timeout=30)
+            logger.info(f"[{self.provider_name}] 轮询状态码: {resp.status_code}")
+            logger.info(f"[{self.provider_name}] 轮询响应: {resp.text[:500]}")
+            resp.raise_for_status()
 
-            except requests.exceptions.Timeout:
-                logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
-                time.sleep(interval_seconds)
-            except Exception as exc:
-                logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
-                time.sleep(interval_seconds)
+            data = resp.json()
+            status = str(data.get("status") or "").lower()
+
+            # 检查是否完成：status=completed 或 data 数组中有 url
+            if status == "completed" or self._has_image_url(data):
+                logger.info(f"[{self.provider_name}] 任务完成 | task_id={task_id}")
+                return self._extract_result(data)
+
+            # 检查是否失败
+            if status in _FAILED_STATUSES:
+                error_msg = data.get("error") or data.get("message") or "任务执行失败"
+                logger.error(f"[{self.provider_name}] 任务失败 | task_id={task_id} | error={error_msg}")
+                return NanoBananaResult(success=False, error_message=str(error_msg))
+
+            # 继续轮询
+            if status not in _PENDING_STATUSES and status != "":
+                logger.warning(f"[{self.provider_name}] 未识别状态: {status}")
+        except requests.exceptions.Timeout:
+            logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
+        except Exception as exc:
+            logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
 
-        return NanoBananaResult(success=False, error_message="轮询图片结果超时")
+        return None
 
     def _has_image_url(self, data: dict) -> bool:
         """检查响应中是否包含图片 URL"""
@@ -241,11 +240,10 @@ class NanoBananaBandianwa(NanoBananaBase):
             # 如果是 URL，下载图片
             if image_url.startswith("http"):
                 logger.info(f"[{self.provider_name}] 下载图片 | url={image_url[:100]}")
-                resp = requests.get(image_url, timeout=60)
+                resp = http_client.get(image_url, timeout=60)
                 resp.raise_for_status()
 
                 mime_type = resp.headers.get("Content-Type", "image/jpeg").split(";")[0].strip()
-                image_data = base64.b64encode(resp.content).decode("ascii")
 
                 logger.info(
                     f"[{self.provider_name}] 成功下载图片 | "
@@ -254,26 +252,25 @@ class NanoBananaBandianwa(NanoBananaBase):
 
                 return NanoBananaResult(
                     success=True,
-                    image_data=image_data,
+                    image_bytes=resp.content,
                     mime_type=mime_type,
                 )
 
             # 如果是 data URL 格式
             if image_url.startswith("data:"):
-                match = re.match(r"data:(image/[^;]+);base64,(.*)", image_url, re.DOTALL)
-                if not match:
+                decoded = decode_image_data_url(image_url)
+                if not decoded:
                     return NanoBananaResult(success=False, error_message="无法解析 data URL")
-                mime_type = match.group(1)
-                image_data = match.group(2).replace("\n", "").replace(" ", "").replace("\r", "")
+                mime_type, image_bytes = decoded
 
                 logger.info(
                     f"[{self.provider_name}] 成功解析 data URL | "
-                    f"mime={mime_type} | 长度={len(image_data)}"
+                    f"mime={mime_type} | 大小={len(image_bytes)} bytes"
                 )
 
                 return NanoBananaResult(
                     success=True,
-                    image_data=image_data,
+                    image_bytes=image_bytes,
                     mime_type=mime_type,
                 )
 
@@ -298,13 +295,12 @@ class NanoBananaBandianwa(NanoBananaBase):
         }
 
         try:
-            resp = requests.get(url, headers=headers, timeout=60)
+            resp = http_client.get(url, headers=headers, timeout=60)
             logger.info(f"[{self.provider_name}] 获取图片状态码: {resp.status_code}")
             resp.raise_for_status()
 
             # 获取 MIME 类型
             mime_type = resp.headers.get("Content-Type", "image/png").split(";")[0].strip()
-            image_data = base64.b64encode(resp.content).decode("ascii")
 
             logger.info(
                 f"[{self.provider_name}] 成功获取图片 | "
@@ -313,7 +309,7 @@ class NanoBananaBandianwa(NanoBananaBase):
 
             return NanoBananaResult(
                 success=True,
-                image_data=image_data,
+                image_bytes=resp.content,
                 mime_type=mime_type,
             )
 
@@ -373,7 +369,7 @@ class NanoBananaBandianwa(NanoBananaBase):
             return response.text[:500] if response.text else str(response)
 
     @staticmethod
-    def _save_to_dir(image_data: str, mime_type: str, download_dir: str) -> str:
+    def _save_to_dir(image_bytes: bytes, mime_type: str, download_dir: str) -> str:
         """保存图片到本地"""
         os.makedirs(download_dir, exist_ok=True)
         ext_map = {
@@ -391,9 +387,8 @@ class NanoBananaBandianwa(NanoBananaBase):
         filename = f"nanobanana_bdw_{ts}_{uuid.uuid4().hex[:6]}{ext}"
         file_path = os.path.join(download_dir, filename)
 
-        raw = base64.b64decode(image_data)
         with open(file_path, "wb") as f:
-            f.write(raw)
+            f.write(image_bytes)
 
-        logger.info(f"[{NanoBananaBandianwa(None).provider_name}] 图片已保存: {file_path} ({len(raw)} bytes)")
+        logger.info(f"[{NanoBananaBandianwa(None).provider_name}] 图片已保存: {file_path} ({len(image_bytes)} bytes)")
         return file_path
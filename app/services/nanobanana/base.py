@@ -1,20 +1,42 @@
 """NanoBanana 生成基类"""
 
+import base64
+import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Optional
 
+_DATA_URL_RE = re.compile(r"data:(image/[^;,]+);base64,")
+
 
 @dataclass
 class NanoBananaResult:
     """NanoBanana 生成结果"""
     success: bool                         # 是否成功
-    image_data: Optional[str] = None      # 图片 base64 数据
+    image_bytes: Optional[bytes] = None   # 图片二进制数据
     mime_type: Optional[str] = None       # 图片 MIME 类型（如 image/png）
     text_content: Optional[str] = None    # 文本内容（模型返回的文本）
     error_message: Optional[str] = None   # 错误信息
     file_path: Optional[str] = None       # 自动下载后的本地文件路径
 
+    @property
+    def image_data(self) -> Optional[str]:
+        """图片 base64 数据，每次访问时从 image_bytes 编码，只在需要内联传输时使用"""
+        if self.image_bytes is None:
+            return None
+        return base64.b64encode(self.image_bytes).decode("ascii")
+
+
+def decode_image_data_url(image_src: str) -> Optional[tuple]:
+    """把 data:image/...;base64,... 解码为 (mime, bytes)；格式不符时返回 None。
+
+    b64decode 默认跳过换行、空格等非 base64 字符，不需要先逐个 replace 复制整段字符串。
+    """
+    match = _DATA_URL_RE.match(image_src)
+    if not match:
+        return None
+    return match.group(1), base64.b64decode(image_src[match.end():])
+
 
 class NanoBananaBase(ABC):
     """NanoBanana 生成基类"""
@@ -1,17 +1,18 @@
 """万米霖渠道 NanoBanana 图片生成（gemini-3.0-pro-image 系列 + 自动下载）"""
 
-import base64
-import json
 import os
-import re
 import uuid
 from datetime import datetime
+from typing import Optional
 
 import requests
 
 from ...constants import ApiUrls
 from ...logger import logger
-from .base import NanoBananaBase, NanoBananaResult
+from .. import http_client
+from ..ref_image import ReferenceImage
+from ..sse import MarkdownImageBuffer, iter_chat_deltas
+from .base import NanoBananaBase, NanoBananaResult, decode_image_data_url
 
 _RATIO_TO_ORIENTATION = {
     "16:9": "landscape",
@@ -65,15 +66,11 @@ class NanoBananaGlin(NanoBananaBase):
             "Content-Type": "application/json",
         }
 
-        # 支持 ref_image_path：从磁盘读取图片并转为 base64
+        # 支持 ref_image_path：以参考图句柄加入列表，发送时才读取并编码
         ref_image_path = kwargs.get("ref_image_path")
         if ref_image_path and os.path.isfile(ref_image_path):
-            import mimetypes
-            mime = mimetypes.guess_type(ref_image_path)[0] or "image/jpeg"
-            with open(ref_image_path, "rb") as _f:
-                _b64 = base64.b64encode(_f.read()).decode("ascii")
             existing = list(kwargs.get("ref_images") or [])
-            existing.insert(0, {"base64": _b64, "mime": mime})
+            existing.insert(0, ReferenceImage.from_path(ref_image_path))
             kwargs = {**kwargs, "ref_images": existing}
 
         ref_images = kwargs.get("ref_images") or []
@@ -101,37 +98,31 @@ class NanoBananaGlin(NanoBananaBase):
                 f"比例={aspect_ratio} 清晰度={image_size} 模式={mode} | base_url={self.base_url}"
             )
 
-            resp = requests.post(url, headers=headers, json=payload, timeout=300, stream=True)
+            resp = http_client.post(url, headers=headers, json=payload, timeout=300, stream=True)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
             resp.raise_for_status()
 
-            full_content = ""
-            for line in resp.iter_lines(decode_unicode=True):
-                if not line or not line.startswith("data: "):
-                    continue
-                data_str = line[6:]
-                if data_str.strip() == "[DONE]":
-                    break
-                try:
-                    chunk = json.loads(data_str)
-                    choices = chunk.get("choices", [])
-                    if choices:
-                        delta = choices[0].get("delta", {})
-                        c = delta.get("content")
-                        if c:
-                            full_content += c
-                except json.JSONDecodeError:
-                    continue
-
-            if not full_content:
+            content = MarkdownImageBuffer()
+            try:
+                for delta in iter_chat_deltas(resp):
+                    content.append(delta.get("content") or "")
+                    if content.complete:
+                        # 图片链接已完整到达，不再读取流的剩余部分
+                        break
+            finally:
+                resp.close()
+
+            if not content:
                 return NanoBananaResult(success=False, error_message="SSE 流中未收到 content 数据")
 
-            logger.info(f"[{self.provider_name}] SSE 完成, content 长度: {len(full_content)}")
+            logger.info(
+                f"[{self.provider_name}] SSE {'提前结束' if content.complete else '完成'}, content 长度: {len(content)}"
+            )
 
-            result = self._extract_image(full_content)
+            result = self._extract_image(content.image_src())
 
-            if result.success and result.image_data and download_dir:
-                result.file_path = self._save_to_dir(result.image_data, result.mime_type, download_dir)
+            if result.success and result.image_bytes and download_dir:
+                result.file_path = self._save_to_dir(result.image_bytes, result.mime_type, download_dir)
 
             return result
 
@@ -154,32 +145,27 @@ class NanoBananaGlin(NanoBananaBase):
             logger.error(f"[{self.provider_name}] 生成异常: {e}")
             return NanoBananaResult(success=False, error_message=f"生成失败: {str(e)}")
 
-    def _extract_image(self, content: str) -> NanoBananaResult:
-        """从 markdown content 中提取图片（base64 或 URL）"""
-        match = re.search(r'!\[.*?\]\((.*?)\)', content, re.DOTALL)
-        if not match:
+    def _extract_image(self, image_src: Optional[str]) -> NanoBananaResult:
+        """解析 markdown 图片链接（base64 data URL 或 http URL）"""
+        if not image_src:
             return NanoBananaResult(success=False, error_message="未能从响应中提取图片")
 
-        image_src = match.group(1).strip()
-
         if image_src.startswith("data:"):
-            data_match = re.match(r'data:(image/[^;]+);base64,(.*)', image_src, re.DOTALL)
-            if not data_match:
+            decoded = decode_image_data_url(image_src)
+            if not decoded:
                 return NanoBananaResult(success=False, error_message="无法解析 base64 data URL")
-            mime_type = data_match.group(1)
-            image_data = data_match.group(2).replace("\n", "").replace(" ", "").replace("\r", "")
-            logger.info(f"[{self.provider_name}] 提取到 base64 图片 | mime={mime_type}")
-            return NanoBananaResult(success=True, image_data=image_data, mime_type=mime_type)
+            mime_type, image_bytes = decoded
+            logger.info(f"[{self.provider_name}] 提取到 base64 图片 | mime={mime_type}, size={len(image_bytes)} bytes")
+            return NanoBananaResult(success=True, image_bytes=image_bytes, mime_type=mime_type)
 
         if image_src.startswith("http"):
             logger.info(f"[{self.provider_name}] 提取到图片 URL，下载中: {image_src[:80]}")
             try:
-                img_resp = requests.get(image_src, timeout=60)
+                img_resp = http_client.get(image_src, timeout=60)
                 img_resp.raise_for_status()
                 ct = (img_resp.headers.get("Content-Type") or "image/jpeg").split(";")[0].strip()
-                image_data = base64.b64encode(img_resp.content).decode("ascii")
                 logger.info(f"[{self.provider_name}] 图片下载成功 | mime={ct}, size={len(img_resp.content)} bytes")
-                return NanoBananaResult(success=True, image_data=image_data, mime_type=ct)
+                return NanoBananaResult(success=True, image_bytes=img_resp.content, mime_type=ct)
             except Exception as e:
                 logger.error(f"[{self.provider_name}] 图片下载失败: {e}")
                 return NanoBananaResult(success=False, error_message=f"图片下载失败: {str(e)}")
@@ -187,17 +173,16 @@ class NanoBananaGlin(NanoBananaBase):
         return NanoBananaResult(success=False, error_message=f"未知的图片格式: {image_src[:100]}")
 
     @staticmethod
-    def _save_to_dir(image_data: str, mime_type: str, download_dir: str) -> str:
-        """将 base64 图片保存到指定目录，返回文件路径"""
+    def _save_to_dir(image_bytes: bytes, mime_type: str, download_dir: str) -> str:
+        """将图片字节保存到指定目录，返回文件路径"""
         os.makedirs(download_dir, exist_ok=True)
         ext = _MIME_TO_EXT.get(mime_type, ".png")
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"nanobanana_{ts}_{uuid.uuid4().hex[:6]}{ext}"
         filepath = os.path.join(download_dir, filename)
-        raw = base64.b64decode(image_data)
         with open(filepath, "wb") as f:
-            f.write(raw)
-        logger.info(f"[万米霖 API] 图片已保存: {filepath} ({len(raw)} bytes)")
+            f.write(image_bytes)
+        logger.info(f"[万米霖 API] 图片已保存: {filepath} ({len(image_bytes)} bytes)")
         return filepath
 
 
@@ -1,15 +1,16 @@
 """小扳手 NanoBanana 图片生成"""
 
-import base64
 import os
 import re
-import time
 from typing import Optional
 
 import requests
 
 from ...logger import logger
-from .base import NanoBananaBase, NanoBananaResult
+from .. import http_client
+from ..polling import remote_task_poller
+from ..ref_image import ReferenceImage
+from .base import NanoBananaBase, NanoBananaResult, decode_image_data_url
 
 XIAOBANSHOU_NANOBANANA_BASE = "https://xibapi.com"
 _PENDING_STATUSES = {"pending", "queued", "processing", "running"}
@@ -40,15 +41,11 @@ class NanoBananaXiaobanshou(NanoBananaBase):
         image_size: str = "1K",
         **kwargs,
     ) -> NanoBananaResult:
-        # 支持 ref_image_path：从磁盘读取图片并转为 base64
+        # 支持 ref_image_path：以参考图句柄加入列表，发送时才读取并编码
         ref_image_path = kwargs.get("ref_image_path")
         if ref_image_path and os.path.isfile(ref_image_path):
-            import mimetypes
-            mime = mimetypes.guess_type(ref_image_path)[0] or "image/jpeg"
-            with open(ref_image_path, "rb") as _f:
-                _b64 = base64.b64encode(_f.read()).decode("ascii")
             existing = list(kwargs.get("ref_images") or [])
-            existing.insert(0, {"base64": _b64, "mime": mime})
+            existing.insert(0, ReferenceImage.from_path(ref_image_path))
             kwargs = {**kwargs, "ref_images": existing}
 
         model = self._SIZE_TO_MODEL.get(image_size, "nano_banana_pro-1K")
@@ -81,7 +78,7 @@ class NanoBananaXiaobanshou(NanoBananaBase):
                 f"aspectRatio={aspect_ratio!r}, ref_count={len(payload['metadata'].get('urls', []))}"
             )
 
-            response = requests.post(url, headers=headers, json=payload, timeout=120)
+            response = http_client.post(url, headers=headers, json=payload, timeout=120)
             logger.info(f"[{self.provider_name}] 响应状态码: {response.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {response.text[:500]}")
             response.raise_for_status()
@@ -110,35 +107,42 @@ class NanoBananaXiaobanshou(NanoBananaBase):
             return NanoBananaResult(success=False, error_message=f"生成失败: {exc}")
 
     def _poll_task(self, task_id: str, timeout_seconds: int = 180, interval_seconds: int = 3) -> Optional[NanoBananaResult]:
+        return remote_task_poller.wait(
+            lambda: self._check_task(task_id),
+            interval_seconds=interval_seconds,
+            timeout_seconds=timeout_seconds,
+            default=NanoBananaResult(success=False, error_message="轮询图片结果超时"),
+            key=type(self).__name__,
+            succeeded=lambda result: result.success,
+        )
+
+    def _check_task(self, task_id: str) -> Optional[NanoBananaResult]:
+        """查询一次任务状态，仍在处理中时返回 None"""
         url = f"{self.base_url.rstrip('/')}/v1/videos/{task_id}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
         }
-        deadline = time.time() + timeout_seconds
-
-        while time.time() < deadline:
-            response = requests.get(url, headers=headers, timeout=30)
-            logger.info(f"[{self.provider_name}] 轮询状态码: {response.status_code}")
-            logger.info(f"[{self.provider_name}] 轮询响应: {response.text[:500]}")
-            response.raise_for_status()
-            data = response.json()
-
-            result = self._extract_result(data)
-            if result:
-                return result
-
-            status = str(data.get("status") or "").lower()
-            if status in _FAILED_STATUSES:
-                return NanoBananaResult(
-                    success=False,
-                    error_message=self._extract_error_message(data) or "任务执行失败",
-                )
-            if status and status not in _PENDING_STATUSES:
-                logger.warning(f"[{self.provider_name}] 未识别状态，继续轮询: {status}")
-            time.sleep(interval_seconds)
+        response = http_client.get(url, headers=headers, timeout=30)
+        logger.info(f"[{self.provider_name}] 轮询状态码: {response.status_code}")
+        logger.info(f"[{self.provider_name}] 轮询响应: {response.text[:500]}")
+        response.raise_for_status()
+        data = response.json()
+
+        result = self._extract_result(data)
+        if result:
+            return result
+
+        status = str(data.get("status") or "").lower()
+        if status in _FAILED_STATUSES:
+            return NanoBananaResult(
+                success=False,
+                error_message=self._extract_error_message(data) or "任务执行失败",
+            )
+        if status and status not in _PENDING_STATUSES:
+            logger.warning(f"[{self.provider_name}] 未识别状态，继续轮询: {status}")
 
-        return NanoBananaResult(success=False, error_message="轮询图片结果超时")
+        return None
 
     def _extract_result(self, data: dict) -> Optional[NanoBananaResult]:
         image_src = self._extract_image_source(data)
@@ -146,23 +150,19 @@ class NanoBananaXiaobanshou(NanoBananaBase):
             return None
 
         if image_src.startswith("data:"):
-            match = re.match(r"data:(image/[^;]+);base64,(.*)", image_src, re.DOTALL)
-            if not match:
+            decoded = decode_image_data_url(image_src)
+            if not decoded:
                 return NanoBananaResult(success=False, error_message="无法解析 data URL")
-            return NanoBananaResult(
-                success=True,
-                mime_type=match.group(1),
-                image_data=match.group(2).replace("\n", "").replace(" ", "").replace("\r", ""),
-            )
+            return NanoBananaResult(success=True, mime_type=decoded[0], image_bytes=decoded[1])
 
         if image_src.startswith("http"):
-            response = requests.get(image_src, timeout=60)
+            response = http_client.get(image_src, timeout=60)
             response.raise_for_status()
             mime_type = (response.headers.get("Content-Type") or "image/png").split(";")[0].strip()
             return NanoBananaResult(
                 success=True,
                 mime_type=mime_type,
-                image_data=base64.b64encode(response.content).decode("ascii"),
+                image_bytes=response.content,
             )
 
         return None
@@ -10,6 +10,8 @@ from typing import Optional
 import requests
 
 from ...logger import logger
+from .. import http_client
+from ..ref_image import ReferenceImage
 from .base import NanoBananaBase, NanoBananaResult
 
 YUNWU_BASE = "https://yunwu.ai"
@@ -58,15 +60,11 @@ class NanoBananaYunwu(NanoBananaBase):
                 ref_mime_type: 单张图片 MIME（兼容旧调用）
                 download_dir:  生成后自动保存到本地的目录
         """
-        # 支持 ref_image_path：从磁盘读取图片并转为 base64
+        # 支持 ref_image_path：以参考图句柄加入列表，发送时才读取并编码
         ref_image_path = kwargs.get("ref_image_path")
         if ref_image_path and os.path.isfile(ref_image_path):
-            import mimetypes
-            mime = mimetypes.guess_type(ref_image_path)[0] or "image/jpeg"
-            with open(ref_image_path, "rb") as _f:
-                _b64 = base64.b64encode(_f.read()).decode("ascii")
             existing = list(kwargs.get("ref_images") or [])
-            existing.insert(0, {"base64": _b64, "mime": mime})
+            existing.insert(0, ReferenceImage.from_path(ref_image_path))
             kwargs = {**kwargs, "ref_images": existing}
 
         ref_images = self._collect_ref_images(kwargs)
@@ -117,17 +115,18 @@ class NanoBananaYunwu(NanoBananaBase):
         )
 
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=300)
+            resp = http_client.post(url, headers=headers, json=payload, timeout=300)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
-            logger.info(f"[{self.provider_name}] 响应体（前500字符）: {resp.text[:500]}")
+            # 响应体含整张图片的 base64，只解码前 500 字节用于日志
+            logger.info(f"[{self.provider_name}] 响应体（前500字符）: {resp.content[:500].decode('utf-8', errors='replace')}")
             resp.raise_for_status()
             data = resp.json()
 
             result = self._extract_image(data)
 
-            if result.success and result.image_data and download_dir:
+            if result.success and result.image_bytes and download_dir:
                 result.file_path = self._save_to_dir(
-                    result.image_data, result.mime_type or "image/png", str(download_dir)
+                    result.image_bytes, result.mime_type or "image/png", str(download_dir)
                 )
 
             return result
@@ -192,17 +191,16 @@ class NanoBananaYunwu(NanoBananaBase):
                 inline = part.get("inlineData") or part.get("inline_data")
                 if inline:
                     mime_type = inline.get("mimeType") or inline.get("mime_type") or "image/png"
-                    image_data = inline.get("data", "")
-                    # 清理可能的换行
-                    image_data = image_data.replace("\n", "").replace(" ", "").replace("\r", "")
-                    if image_data:
+                    # b64decode 会跳过可能的换行和空格
+                    image_bytes = base64.b64decode(inline.get("data", ""))
+                    if image_bytes:
                         logger.info(
                             f"[{self.provider_name}] 提取到 base64 图片 | "
-                            f"mime={mime_type} | 长度={len(image_data)}"
+                            f"mime={mime_type} | 大小={len(image_bytes)} bytes"
                         )
                         return NanoBananaResult(
                             success=True,
-                            image_data=image_data,
+                            image_bytes=image_bytes,
                             mime_type=mime_type,
                         )
 
@@ -217,14 +215,13 @@ class NanoBananaYunwu(NanoBananaBase):
             return NanoBananaResult(success=False, error_message=f"响应解析失败: {exc}")
 
     @staticmethod
-    def _save_to_dir(image_data: str, mime_type: str, download_dir: str) -> str:
+    def _save_to_dir(image_bytes: bytes, mime_type: str, download_dir: str) -> str:
         os.makedirs(download_dir, exist_ok=True)
         ext = _MIME_TO_EXT.get(mime_type, ".png")
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"nanobanana_yw_{ts}_{uuid.uuid4().hex[:6]}{ext}"
         file_path = os.path.join(download_dir, filename)
-        raw = base64.b64decode(image_data)
         with open(file_path, "wb") as f:
-            f.write(raw)
-        logger.info(f"[云雾 API] 图片已保存: {file_path} ({len(raw)} bytes)")
+            f.write(image_bytes)
+        logger.info(f"[云雾 API] 图片已保存: {file_path} ({len(image_bytes)} bytes)")
         return file_path
@@ -0,0 +1,262 @@
+"""统一远程任务轮询器
+
+所有供应商的异步任务（Sora2 / VEO / NanoBanana / GPT-Image）都通过同一个 asyncio 事件循环调度轮询：
+事件循环只负责计时，单次状态查询交给少量 IO 线程执行，等待期间不占用任何线程。
+调用方既可以阻塞等待结果（wait），也可以拿到 Future 后注册回调（watch），
+这样数百个远程任务只需要少量线程即可同时跟踪。
+
+传入 key 的任务使用自适应轮询间隔：根据供应商返回的进度和该供应商历史完成耗时估算剩余时间，
+任务早期稀疏轮询，临近预计完成时加密轮询。
+"""
+
+import asyncio
+import json
+import statistics
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from ..logger import logger
+
+_DEFAULT_IO_WORKERS = 8
+_HISTORY_SIZE = 50
+_MIN_HISTORY_SAMPLES = 3
+# 远程生成任务不可能在 1 秒内完成，更短的耗时来自测试桩或异常返回，计入会把间隔压到下限
+_MIN_SAMPLE_SECONDS = 1.0
+
+
+@dataclass
+class PollPending:
+    """check 函数的“仍在处理中”返回值，可携带供应商上报的进度（0-100）"""
+
+    progress: Optional[int] = None
+
+
+def parse_progress(value: Any) -> Optional[int]:
+    """解析供应商返回的进度字段（45 / "45" / "45%" / 0.45），无法解析时返回 None"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(str(value).strip().rstrip("%"))
+    except (TypeError, ValueError):
+        return None
+    if 0 < number < 1 and not str(value).strip().endswith("%"):
+        number *= 100
+    return max(0, min(100, int(number)))
+
+
+class CompletionHistory:
+    """按供应商记录最近若干次任务的完成耗时（秒），用于估算新任务的预计完成时间"""
+
+    def __init__(self, path: Optional[Path] = None, size: int = _HISTORY_SIZE):
+        self._path = path
+        self._size = size
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self._loaded = False
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self._path or not self._path.is_file():
+            return
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+            for key, values in data.items():
+                # 丢弃旧版本写入的接近 0 的样本
+                samples = (float(v) for v in values)
+                self._samples[key] = deque((v for v in samples if v >= _MIN_SAMPLE_SECONDS), maxlen=self._size)
+        except Exception as exc:
+            logger.warning(f"[Poller] 读取历史耗时失败: {exc}")
+
+    def _save(self) -> None:
+        if not self._path:
+            return
+        try:
+            payload = {key: list(values) for key, values in self._samples.items()}
+            self._path.write_text(json.dumps(payload), encoding="utf-8")
+        except Exception as exc:
+            logger.warning(f"[Poller] 保存历史耗时失败: {exc}")
+
+    def record(self, key: str, duration_seconds: float) -> None:
+        if not duration_seconds or duration_seconds < _MIN_SAMPLE_SECONDS:
+            return
+        with self._lock:
+            self._ensure_loaded()
+            self._samples.setdefault(key, deque(maxlen=self._size)).append(round(duration_seconds, 1))
+            self._save()
+
+    def quantiles(self, key: str) -> Optional[tuple]:
+        """返回 (中位数, P90) 完成耗时；样本不足时返回 None"""
+        with self._lock:
+            self._ensure_loaded()
+            values = sorted(self._samples.get(key) or ())
+        if len(values) < _MIN_HISTORY_SAMPLES:
+            return None
+        p90 = values[min(len(values) - 1, int(len(values) * 0.9))]
+        return statistics.median(values), p90
+
+
+class AdaptivePollSchedule:
+    """自适应轮询间隔：间隔取预计剩余时间的一半，并限制在 [min, max] 范围内。
+
+    min / max 由供应商的基准间隔推导：min = max(2, base/4)，max = max(base*4, 60)。
+    既无进度也无足够历史样本时退回基准间隔。
+    """
+
+    def __init__(self, history: CompletionHistory):
+        self.history = history
+
+    @staticmethod
+    def bounds(base_interval: float) -> tuple:
+        return max(2.0, base_interval / 4), max(base_interval * 4, 60.0)
+
+    def estimate_remaining(self, key: str, elapsed: float, progress: Optional[int]) -> Optional[float]:
+        if progress and 0 < progress < 100 and elapsed > 0:
+            return elapsed * (100 - progress) / progress
+
+        quantiles = self.history.quantiles(key) if key else None
+        if not quantiles:
+            return None
+        median, p90 = quantiles
+        if elapsed < median:
+            return median - elapsed
+        # 已超过中位耗时：按 P90 估算，仍超过则视为随时可能完成
+        return max(0.0, p90 - elapsed)
+
+    def next_interval(self, key: str, elapsed: float, progress: Optional[int], base_interval: float) -> float:
+        if base_interval <= 0:
+            return 0.0
+        remaining = self.estimate_remaining(key, elapsed, progress)
+        if remaining is None:
+            return base_interval
+        low, high = self.bounds(base_interval)
+        return max(low, min(high, remaining / 2))
+
+
+class RemoteTaskPoller:
+    """远程任务轮询器。
+
+    check 函数执行一次状态查询：任务仍在处理中时返回 None 或 PollPending，否则返回最终结果。
+    超时后返回 default。check 抛出的异常会原样传递给等待方。
+
+    传入 key（通常为供应商标识）时启用自适应间隔，interval_seconds 作为基准间隔；
+    任务成功结束（succeeded 判定为真）后其耗时计入该 key 的历史；重启后续查的任务不知道真实提交时间，
+    以 record_history=False 跟踪，不计入历史。
+    默认历史只在内存中，应用启动时通过 use_history 换成持久化到数据目录的历史。
+    传入 on_progress 时，供应商报告的进度发生变化会在 IO 线程中回调（参数为 0-100 的整数）。
+    """
+
+    def __init__(self, io_workers: int = _DEFAULT_IO_WORKERS, history: Optional[CompletionHistory] = None):
+        self._io_workers = io_workers
+        self.schedule = AdaptivePollSchedule(history or CompletionHistory())
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def use_history(self, history: CompletionHistory) -> None:
+        self.schedule.history = history
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            self._io_pool = ThreadPoolExecutor(max_workers=self._io_workers, thread_name_prefix="PollerIO")
+            thread = threading.Thread(target=loop.run_forever, daemon=True, name="RemoteTaskPoller")
+            thread.start()
+            self._loop = loop
+            logger.info(f"[Poller] 轮询事件循环已启动, io_workers={self._io_workers}")
+            return loop
+
+    @property
+    def pending_count(self) -> int:
+        """当前正在跟踪的远程任务数"""
+        return self._pending
+
+    def watch(
+        self,
+        check: Callable[[], Any],
+        interval_seconds: float,
+        timeout_seconds: float,
+        default: Any = None,
+        key: str = "",
+        succeeded: Optional[Callable[[Any], bool]] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        record_history: bool = True,
+    ) -> Future:
+        """注册一个远程任务，返回在任务结束（完成 / 失败 / 超时）时完成的 Future"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(
+            self._watch(check, interval_seconds, timeout_seconds, default, key, succeeded, on_progress, record_history),
+            loop,
+        )
+
+    def wait(
+        self,
+        check: Callable[[], Any],
+        interval_seconds: float,
+        timeout_seconds: float,
+        default: Any = None,
+        key: str = "",
+        succeeded: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """阻塞等待远程任务结束并返回结果"""
+        return self.watch(check, interval_seconds, timeout_seconds, default, key, succeeded).result()
+
+    async def _watch(
+        self,
+        check: Callable[[], Any],
+        interval_seconds: float,
+        timeout_seconds: float,
+        default: Any,
+        key: str,
+        succeeded: Optional[Callable[[Any], bool]],
+        on_progress: Optional[Callable[[int], None]] = None,
+        record_history: bool = True,
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + timeout_seconds
+        polls = 0
+        reported = None
+        self._pending += 1
+        try:
+            while True:
+                outcome = await loop.run_in_executor(self._io_pool, check)
+                polls += 1
+                progress = None
+                if isinstance(outcome, PollPending):
+                    progress = outcome.progress
+                    if on_progress is not None and progress is not None and progress != reported:
+                        reported = progress
+                        try:
+                            await loop.run_in_executor(self._io_pool, on_progress, progress)
+                        except Exception as exc:
+                            logger.debug(f"[Poller] 进度回调失败: {exc}")
+                elif outcome is not None:
+                    elapsed = loop.time() - started
+                    if key and record_history and (succeeded is None or succeeded(outcome)):
+                        self.schedule.history.record(key, elapsed)
+                    logger.debug(f"[Poller] 任务结束 key={key or '-'} | 耗时 {elapsed:.1f}s | 轮询 {polls} 次")
+                    return outcome
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return default
+
+                interval = interval_seconds
+                if key:
+                    interval = self.schedule.next_interval(key, loop.time() - started, progress, interval_seconds)
+                await asyncio.sleep(min(interval, remaining))
+        finally:
+            self._pending -= 1
+
+
+remote_task_poller = RemoteTaskPoller()
@@ -0,0 +1,170 @@
+"""渠道健康度与熔断
+
+按生成器标识（platform/provider）记录最近若干次调用的成功率、耗时与错误类型。
+窗口内失败率过高或连续失败达到阈值时熔断（open），冷却期内路由跳过该渠道；
+冷却结束后进入半开（half_open），只放行一次试探调用，其余调用在试探结束前仍视为熔断；
+试探成功即恢复，失败则重新熔断。
+本地未配置 API Key 等配置错误与渠道本身无关，只记录不计入熔断。
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from ..logger import logger
+
+_WINDOW_SIZE = 20
+_MIN_SAMPLES = 5
+_FAILURE_RATE_THRESHOLD = 0.5
+_CONSECUTIVE_FAILURE_THRESHOLD = 3
+_COOLDOWN_SECONDS = 120
+# 试探调用可能是一次完整的视频生成（5~15 分钟），超过该时长仍未回报结果才视为放弃
+_PROBE_TIMEOUT_SECONDS = 1800
+
+ERROR_CONFIG = "config"
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def classify_error(message: Optional[str]) -> str:
+    """把错误信息归类为 config / timeout / auth / quota / network / error"""
+    text = (message or "").lower()
+    if "未配置" in text:
+        return ERROR_CONFIG
+    if "超时" in text or "timeout" in text or "timed out" in text:
+        return "timeout"
+    if "401" in text or "403" in text or "unauthorized" in text or "api key" in text:
+        return "auth"
+    if "余额" in text or "额度" in text or "quota" in text or "429" in text or "rate limit" in text:
+        return "quota"
+    if "connection" in text or "连接" in text:
+        return "network"
+    return "error"
+
+
+@dataclass
+class _Sample:
+    success: bool
+    latency: float
+    error_type: str = ""
+
+
+@dataclass
+class _ProviderState:
+    samples: deque = field(default_factory=lambda: deque(maxlen=_WINDOW_SIZE))
+    consecutive_failures: int = 0
+    opened_at: Optional[float] = None
+    probe_started_at: Optional[float] = None
+
+
+class ProviderHealth:
+    """线程安全的渠道健康度记录器"""
+
+    def __init__(
+        self,
+        cooldown_seconds: float = _COOLDOWN_SECONDS,
+        probe_timeout_seconds: float = _PROBE_TIMEOUT_SECONDS,
+        clock=time.monotonic,
+    ):
+        self._cooldown = cooldown_seconds
+        self._probe_timeout = probe_timeout_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._states: dict = {}
+
+    def _state(self, key: str) -> _ProviderState:
+        return self._states.setdefault(key, _ProviderState())
+
+    def record_success(self, key: str, latency: float = 0.0) -> None:
+        with self._lock:
+            state = self._state(key)
+            state.samples.append(_Sample(True, latency))
+            state.consecutive_failures = 0
+            if state.opened_at is not None:
+                logger.info(f"[Health] 渠道恢复，关闭熔断: {key}")
+            state.opened_at = None
+            state.probe_started_at = None
+
+    def record_failure(self, key: str, error_message: str = "", latency: float = 0.0) -> None:
+        with self._lock:
+            state = self._state(key)
+            error_type = classify_error(error_message)
+            state.samples.append(_Sample(False, latency, error_type))
+            if error_type == ERROR_CONFIG:
+                state.probe_started_at = None
+                return
+            state.consecutive_failures += 1
+            half_open = state.opened_at is not None and self._clock() - state.opened_at >= self._cooldown
+            state.probe_started_at = None
+            if (state.opened_at is None and self._should_open(state)) or half_open:
+                state.opened_at = self._clock()
+                logger.warning(
+                    f"[Health] 渠道熔断 {self._cooldown:.0f}s: {key} | "
+                    f"连续失败 {state.consecutive_failures} 次 | 最近错误={state.samples[-1].error_type}"
+                )
+
+    @staticmethod
+    def _should_open(state: _ProviderState) -> bool:
+        if state.consecutive_failures >= _CONSECUTIVE_FAILURE_THRESHOLD:
+            return True
+        samples = [sample for sample in state.samples if sample.error_type != ERROR_CONFIG]
+        if len(samples) < _MIN_SAMPLES:
+            return False
+        failures = sum(1 for sample in samples if not sample.success)
+        return failures / len(samples) >= _FAILURE_RATE_THRESHOLD
+
+    def state(self, key: str) -> str:
+        with self._lock:
+            opened_at = self._states.get(key, _ProviderState()).opened_at
+        if opened_at is None:
+            return STATE_CLOSED
+        if self._clock() - opened_at < self._cooldown:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    def is_available(self, key: str) -> bool:
+        """关闭状态返回 True，熔断冷却期内返回 False；
+        半开状态只对第一个调用者返回 True（占用试探名额），试探结束前其余调用者返回 False。
+        名额在试探方回报结果（record_success / record_failure）时释放；
+        超过试探超时仍无结果（如进程内任务被删除）才视为放弃，重新放行一次。"""
+        with self._lock:
+            state = self._states.get(key)
+            if state is None or state.opened_at is None:
+                return True
+            now = self._clock()
+            if now - state.opened_at < self._cooldown:
+                return False
+            if state.probe_started_at is not None and now - state.probe_started_at < self._probe_timeout:
+                return False
+            state.probe_started_at = now
+            logger.info(f"[Health] 渠道半开，放行一次试探调用: {key}")
+            return True
+
+    def snapshot(self) -> dict:
+        """各渠道的健康概况：状态、成功率、平均耗时、错误类型分布"""
+        with self._lock:
+            keys = list(self._states)
+            states = {key: list(self._states[key].samples) for key in keys}
+        result = {}
+        for key in keys:
+            samples = states[key]
+            successes = [sample for sample in samples if sample.success]
+            result[key] = {
+                "state": self.state(key),
+                "samples": len(samples),
+                "success_rate": round(len(successes) / len(samples), 2) if samples else None,
+                "avg_latency": round(sum(s.latency for s in successes) / len(successes), 1) if successes else None,
+                "errors": dict(Counter(sample.error_type for sample in samples if not sample.success)),
+            }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+provider_health = ProviderHealth()
@@ -0,0 +1,189 @@
+"""按渠道主机限流
+
+扫描器、生成接口、调试入口和 GlineFlow 接口都直接调用供应商接口，各自并不知道彼此的请求量，
+并发一高就会触发供应商的 429 / "任务过多"。这里按主机（与 http_client 的会话划分一致，
+同一主机即同一供应商账号）维护令牌桶和最大并发数，所有提交与轮询请求都经过这里：
+超出配额的请求排队等待，而不是直接失败。
+
+设置项：
+- rate_limit_rpm：每个主机默认每分钟请求数，0 表示不限
+- rate_limit_max_in_flight：每个主机默认最大并发请求数，0 表示不限
+- rate_limit_overrides：按主机覆盖，每行 "主机 每分钟请求数 最大并发"，如 "api.hellobabygo.com 60 5"
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from ..constants import SettingKeys
+from ..logger import logger
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """单个主机的限流配置；数值为 0 表示不限"""
+
+    rpm: float = 0
+    max_in_flight: int = 0
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rpm <= 0 and self.max_in_flight <= 0
+
+
+class RateLimiter:
+    """令牌桶 + 并发上限。令牌不足时预占下一个令牌并睡眠到可用时刻，等待者按到达顺序依次放行。"""
+
+    def __init__(self, limit: RateLimit, clock=time.monotonic, sleep=time.sleep):
+        self.limit = limit
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._rate = limit.rpm / 60.0
+        # 桶容量为一秒的令牌量（至少 1 个），允许小幅突发
+        self._capacity = max(1.0, self._rate)
+        self._tokens = self._capacity
+        self._updated = clock()
+        self._in_flight = (
+            threading.BoundedSemaphore(limit.max_in_flight) if limit.max_in_flight > 0 else None
+        )
+        self.waiting = 0
+
+    def _reserve_token(self) -> float:
+        """取一个令牌，返回需要等待的秒数"""
+        if self._rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self._rate
+
+    def acquire(self) -> None:
+        with self._lock:
+            self.waiting += 1
+        try:
+            if self._in_flight is not None:
+                self._in_flight.acquire()
+            delay = self._reserve_token()
+            if delay > 0:
+                self._sleep(delay)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+    def release(self) -> None:
+        if self._in_flight is not None:
+            self._in_flight.release()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+def _host_key(url: str) -> str:
+    return (urlsplit(url or "").netloc or url or "").lower()
+
+
+def parse_overrides(text: str) -> Dict[str, RateLimit]:
+    """解析 rate_limit_overrides；格式错误的行忽略并记录日志"""
+    overrides = {}
+    for line in (text or "").splitlines():
+        parts = line.split()
+        if not parts or parts[0].startswith("#"):
+            continue
+        try:
+            rpm = float(parts[1]) if len(parts) > 1 else 0
+            max_in_flight = int(parts[2]) if len(parts) > 2 else 0
+        except ValueError:
+            logger.warning(f"[RateLimit] 忽略无法解析的限流配置: {line}")
+            continue
+        overrides[_host_key(parts[0])] = RateLimit(rpm, max_in_flight)
+    return overrides
+
+
+class RateLimiterRegistry:
+    """按主机维护 RateLimiter；配置变化时为新请求重建限流器，已排队的请求按旧配置完成"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._default = RateLimit()
+        self._overrides: Dict[str, RateLimit] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        # 最近一次应用的设置版本号（database.get_settings_version），None 表示尚未按设置配置过
+        self._settings_version: Optional[int] = None
+
+    def configure(self, default: RateLimit, overrides: Optional[Dict[str, RateLimit]] = None) -> None:
+        with self._lock:
+            self._default = default
+            self._overrides = dict(overrides or {})
+            self._limiters.clear()
+        logger.info(
+            f"[RateLimit] 限流已配置 | 默认 rpm={default.rpm:g} 并发={default.max_in_flight} | "
+            f"覆盖 {len(self._overrides)} 个主机"
+        )
+
+    def configure_from_settings(self, settings: dict, version: Optional[int] = None) -> None:
+        """按设置配置限流。传入设置版本号时，版本未变化直接返回；限流相关的值没变时也不重建限流器"""
+        if version is not None and version == self._settings_version:
+            return
+
+        def _number(key: str, cast):
+            try:
+                return max(0, cast(settings.get(key) or 0))
+            except (TypeError, ValueError):
+                return 0
+
+        default = RateLimit(
+            _number(SettingKeys.RATE_LIMIT_RPM, float), _number(SettingKeys.RATE_LIMIT_MAX_IN_FLIGHT, int)
+        )
+        overrides = parse_overrides(settings.get(SettingKeys.RATE_LIMIT_OVERRIDES) or "")
+        changed = self._settings_version is None or (default, overrides) != (self._default, self._overrides)
+        self._settings_version = version
+        if changed:
+            self.configure(default, overrides)
+
+    def get(self, url: str) -> Optional[RateLimiter]:
+        """返回 url 所属主机的限流器；未限流的主机返回 None"""
+        host = _host_key(url)
+        limiter = self._limiters.get(host)
+        if limiter is not None:
+            return limiter
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limit = self._overrides.get(host, self._default)
+                if limit.unlimited:
+                    return None
+                limiter = RateLimiter(limit)
+                self._limiters[host] = limiter
+            return limiter
+
+    @contextmanager
+    def limit(self, url: str):
+        limiter = self.get(url)
+        if limiter is None:
+            yield
+            return
+        with limiter.slot():
+            yield
+
+    def snapshot(self) -> dict:
+        """各主机的限流配置与排队数"""
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {
+            host: {"rpm": limiter.limit.rpm, "max_in_flight": limiter.limit.max_in_flight, "waiting": limiter.waiting}
+            for host, limiter in limiters.items()
+        }
+
+
+rate_limiters = RateLimiterRegistry()
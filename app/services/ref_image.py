@@ -0,0 +1,185 @@
+"""参考图句柄
+
+参考图在扫描器、生成器和各渠道客户端之间以 ReferenceImage 传递：
+优先持有本地路径，字节 / base64 / data URL 在首次访问时计算并缓存，每种表示最多计算一次。
+只有 base64 来源（前端上传）且渠道需要文件路径时，才会落地一个临时文件，句柄回收时自动删除。
+
+为兼容旧代码，句柄同时支持：
+- os.fspath() / open() / os.path.isfile()：可直接作为 ref_image_path / image_path 传入；
+- image.get("base64") / image.get("mime") / image["path"]：可当作旧的 {base64, mime} 字典使用。
+"""
+
+import base64
+import mimetypes
+import os
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from typing import Optional, Union
+
+_EXT_BY_MIME = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ReferenceImage:
+    """参考图：路径 + 惰性计算的 bytes / base64 / data URL"""
+
+    def __init__(
+        self,
+        path: Optional[Union[str, os.PathLike]] = None,
+        data: Optional[bytes] = None,
+        base64_data: Optional[str] = None,
+        mime: Optional[str] = None,
+    ):
+        if not (path or data or base64_data):
+            raise ValueError("参考图缺少路径或内容")
+        self._path = os.fspath(path) if path else None
+        self._data = data
+        self._base64 = base64_data or None
+        self._mime = mime or None
+        self._temp_path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_path(cls, path: Union[str, os.PathLike], mime: Optional[str] = None) -> "ReferenceImage":
+        return cls(path=path, mime=mime)
+
+    @classmethod
+    def from_base64(cls, base64_data: str, mime: Optional[str] = None) -> "ReferenceImage":
+        return cls(base64_data=base64_data, mime=mime)
+
+    @classmethod
+    def coerce(cls, value) -> Optional["ReferenceImage"]:
+        """把旧格式（{base64, mime} / {path} 字典、路径字符串）统一转换为句柄；无内容时返回 None"""
+        if value is None or isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            if value.get("path"):
+                return cls(path=value["path"], base64_data=value.get("base64"), mime=value.get("mime"))
+            if value.get("base64"):
+                return cls(base64_data=value["base64"], mime=value.get("mime"))
+            return None
+        if isinstance(value, (str, os.PathLike)) and os.fspath(value):
+            return cls(path=value)
+        return None
+
+    # ---------- 惰性表示 ----------
+
+    @property
+    def mime(self) -> str:
+        if not self._mime:
+            guessed = mimetypes.guess_type(self._path)[0] if self._path else None
+            self._mime = guessed or "image/jpeg"
+        return self._mime
+
+    @property
+    def name(self) -> str:
+        if self._path:
+            return os.path.basename(self._path)
+        return f"reference{_EXT_BY_MIME.get(self.mime, '.png')}"
+
+    @property
+    def data(self) -> bytes:
+        with self._lock:
+            if self._data is None:
+                if self._path:
+                    with open(self._path, "rb") as handle:
+                        self._data = handle.read()
+                else:
+                    self._data = base64.b64decode(self._base64)
+            return self._data
+
+    @property
+    def base64(self) -> str:
+        if self._base64 is None:
+            encoded = base64.b64encode(self.data).decode("ascii")
+            with self._lock:
+                self._base64 = self._base64 or encoded
+        return self._base64
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime};base64,{self.base64}"
+
+    @property
+    def size(self) -> int:
+        if self._path and self._data is None:
+            return os.path.getsize(self._path)
+        return len(self.data)
+
+    @property
+    def path(self) -> str:
+        """本地文件路径；内存来源的参考图首次访问时写入临时文件"""
+        if self._path:
+            return self._path
+        with self._lock:
+            if self._temp_path is None:
+                payload = self._data if self._data is not None else base64.b64decode(self._base64)
+                fd, temp_path = tempfile.mkstemp(suffix=_EXT_BY_MIME.get(self.mime, ".png"))
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(payload)
+                self._temp_path = temp_path
+                weakref.finalize(self, _remove_file, temp_path)
+            return self._temp_path
+
+    def exists(self) -> bool:
+        return bool(self._data is not None or self._base64) or bool(self._path and os.path.isfile(self._path))
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    # ---------- 兼容旧的 {base64, mime} 字典 ----------
+
+    def get(self, key: str, default=None):
+        if key == "base64":
+            return self.base64 if self.exists() else default
+        if key == "mime":
+            return self.mime
+        if key == "path":
+            return self._path or default
+        return default
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __repr__(self) -> str:
+        source = self._path or f"<{len(self._base64 or '')} base64 chars>"
+        return f"ReferenceImage({source!r}, mime={self.mime!r})"
+
+
+def coerce_ref_images(values) -> list:
+    """把参考图列表统一转换为 ReferenceImage 列表，丢弃空项"""
+    images = []
+    for value in values or []:
+        image = ReferenceImage.coerce(value)
+        if image is not None:
+            images.append(image)
+    return images
+
+
+def first_ref_image(values) -> Optional[ReferenceImage]:
+    images = coerce_ref_images(values)
+    return images[0] if images else None
+
+
+def load_ref_images(image_path: Optional[Union[str, Path]]) -> list:
+    """从磁盘路径构造参考图列表（不读取文件内容），路径无效时返回空列表"""
+    path = Path(str(image_path or "").strip())
+    if not str(path).strip() or str(path) == "." or not path.is_file():
+        return []
+    return [ReferenceImage.from_path(path)]
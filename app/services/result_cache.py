@@ -0,0 +1,154 @@
+"""生成结果缓存（可选）
+
+同一产品图 + 同一提示词 + 同一参数重复生成时（失败重跑、批量中重复的 SKU 等），
+直接复用上次的成品文件，不再调用付费的远程接口。
+
+缓存按内容寻址：键为 (类型, 平台, 渠道, 提示词, 参考图字节, 生成参数) 的 SHA-256，
+成品文件存放在下载根目录的 .cache/results 下，总大小超过上限时按最近使用时间淘汰。
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from ..constants import SettingKeys
+from ..logger import logger
+from .ref_image import ReferenceImage
+
+DEFAULT_MAX_MB = 2048
+_CACHE_DIR = Path(".cache") / "results"
+
+
+@dataclass
+class CachedResult:
+    """缓存命中的成品信息"""
+
+    file_path: str
+    mime_type: str = ""
+    video_url: str = ""
+
+
+def make_cache_key(kind: str, platform: str, provider: str, prompt: str, ref_images: list = None, **params) -> str:
+    """计算结果缓存键；params 为影响成品的生成参数（比例 / 尺寸 / 方向 / 时长）"""
+    digest = hashlib.sha256()
+    header = {
+        "kind": kind,
+        "platform": platform,
+        "provider": provider,
+        "prompt": prompt or "",
+        "params": {key: str(value) for key, value in sorted(params.items())},
+    }
+    digest.update(json.dumps(header, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    for image in ref_images or []:
+        ref_image = ReferenceImage.coerce(image)
+        payload = ref_image.data if ref_image and ref_image.exists() else b""
+        digest.update(hashlib.sha256(payload).digest())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """磁盘结果缓存：每个条目为 <key>.json 元信息 + <key><ext> 成品文件，元信息的 mtime 即最近使用时间"""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        meta_path = self._meta_path(key)
+        try:
+            cached = CachedResult(**json.loads(meta_path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+        if not os.path.isfile(cached.file_path):
+            self._remove_entry(meta_path)
+            return None
+        now = time.time()
+        os.utime(meta_path, (now, now))
+        logger.info(f"[Cache] 命中结果缓存: {key[:12]}")
+        return cached
+
+    def put(self, key: str, file_path: str, mime_type: str = "", video_url: str = "") -> Optional[CachedResult]:
+        """把成品文件存入缓存，失败时只记录日志（缓存不影响主流程）"""
+        if not file_path or not os.path.isfile(file_path):
+            return None
+        meta_path = self._meta_path(key)
+        blob_path = meta_path.with_suffix(Path(file_path).suffix or ".bin")
+        try:
+            meta_path.parent.mkdir(parents=True, exist_ok=True)
+            _link_or_copy(Path(file_path), blob_path)
+            cached = CachedResult(file_path=str(blob_path), mime_type=mime_type or "", video_url=video_url or "")
+            meta_path.write_text(json.dumps(asdict(cached), ensure_ascii=False), encoding="utf-8")
+        except OSError as exc:
+            logger.warning(f"[Cache] 写入结果缓存失败: {exc}")
+            return None
+        self._evict()
+        return cached
+
+    def materialize(self, cached: CachedResult, download_dir: Path, prefix: str) -> str:
+        """把缓存文件放到下载目录（优先硬链接），返回新文件路径"""
+        download_dir = Path(download_dir)
+        download_dir.mkdir(parents=True, exist_ok=True)
+        suffix = Path(cached.file_path).suffix
+        target = download_dir / f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{os.urandom(3).hex()}{suffix}"
+        _link_or_copy(Path(cached.file_path), target)
+        return str(target)
+
+    def _remove_entry(self, meta_path: Path) -> None:
+        for path in meta_path.parent.glob(f"{meta_path.stem}.*"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        """总大小超过上限时，从最久未使用的条目开始删除"""
+        with self._lock:
+            entries = []
+            total = 0
+            for meta_path in self.root.glob("*/*.json"):
+                size = sum(
+                    path.stat().st_size
+                    for path in meta_path.parent.glob(f"{meta_path.stem}.*")
+                    if path.is_file()
+                )
+                entries.append((meta_path.stat().st_mtime, size, meta_path))
+                total += size
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _, size, meta_path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove_entry(meta_path)
+                total -= size
+            logger.info(f"[Cache] 淘汰结果缓存后占用 {total / 1024 / 1024:.1f} MB")
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    if dst.exists():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def get_result_cache(settings: dict, download_root: Path) -> Optional[ResultCache]:
+    """按设置返回结果缓存；未开启时返回 None"""
+    if settings.get(SettingKeys.RESULT_CACHE_ENABLED) != "true":
+        return None
+    try:
+        max_mb = int(settings.get(SettingKeys.RESULT_CACHE_MAX_MB) or DEFAULT_MAX_MB)
+    except (TypeError, ValueError):
+        max_mb = DEFAULT_MAX_MB
+    return ResultCache(Path(download_root) / _CACHE_DIR, max(1, max_mb) * 1024 * 1024)
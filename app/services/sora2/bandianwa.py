@@ -7,6 +7,8 @@ import requests
 
 from ...constants import ApiUrls
 from ...logger import logger
+from .. import http_client
+from ..multipart import MultipartEncoder
 from .base import Sora2Task, Sora2TaskStatus
 from .dayangyu import Sora2Dayangyu, _read_error_message
 
@@ -73,21 +75,19 @@ class Sora2Bandianwa(Sora2Dayangyu):
         if seconds is None:
             seconds = self._infer_seconds_from_model(model)
 
-        with open(image_path, "rb") as file_obj:
-            file_name = os.path.basename(image_path)
-            files = {
-                "input_reference": (file_name, file_obj),
-            }
-            data = {
-                "model": model,
-                "prompt": prompt,
-                "n": "1",
-            }
-            if seconds is not None:
-                data["seconds"] = str(seconds)
-            if size:
-                data["size"] = str(size)
+        file_name = os.path.basename(image_path)
+        data = {
+            "model": model,
+            "prompt": prompt,
+            "n": "1",
+        }
+        if seconds is not None:
+            data["seconds"] = str(seconds)
+        if size:
+            data["size"] = str(size)
 
+        body = MultipartEncoder(fields=data.items(), files=[("input_reference", file_name, image_path, None)])
+        with body:
             try:
                 logger.info(
                     f"[{self.provider_name}] 图生视频 | URL: {url} | "
@@ -96,7 +96,9 @@ class Sora2Bandianwa(Sora2Dayangyu):
                 logger.info(f"[{self.provider_name}] 请求头: {headers}")
                 logger.info(f"[{self.provider_name}] 表单数据: {data}")
 
-                resp = requests.post(url, headers=headers, files=files, data=data, timeout=120)
+                resp = http_client.post(
+                    url, headers={**headers, "Content-Type": body.content_type}, data=body, timeout=120
+                )
                 logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
                 logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
                 resp.raise_for_status()
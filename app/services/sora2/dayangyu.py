@@ -7,6 +7,8 @@ import requests
 
 from ...constants import ApiUrls
 from ...logger import logger
+from .. import http_client
+from ..multipart import MultipartEncoder
 from .base import Sora2Base, Sora2Task, Sora2TaskStatus
 
 def _map_status(api_status: str) -> Sora2TaskStatus:
@@ -81,7 +83,7 @@ class Sora2Dayangyu(Sora2Base):
             logger.info(f"[{self.provider_name}] 文生视频 | URL: {url} | model={model} | prompt={prompt[:50]}...")
             logger.info(f"[{self.provider_name}] 请求头: {headers}")
             logger.info(f"[{self.provider_name}] 请求体: {body}")
-            resp = requests.post(url, json=body, headers=headers, timeout=60)
+            resp = http_client.post(url, json=body, headers=headers, timeout=60)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
             resp.raise_for_status()
@@ -118,19 +120,21 @@ class Sora2Dayangyu(Sora2Base):
         size = kwargs.get("size")  # 可选，如 1280x720
         seconds = kwargs.get("seconds")  # 可选，如 "4"
 
-        with open(image_path, "rb") as f:
-            file_name = os.path.basename(image_path)
-            files = {"input_reference": (file_name, f)}
-            data: dict = {"prompt": prompt, "model": model}
-            if size is not None:
-                data["size"] = str(size)
-            if seconds is not None:
-                data["seconds"] = str(seconds)
+        file_name = os.path.basename(image_path)
+        data: dict = {"prompt": prompt, "model": model}
+        if size is not None:
+            data["size"] = str(size)
+        if seconds is not None:
+            data["seconds"] = str(seconds)
+        body = MultipartEncoder(fields=data.items(), files=[("input_reference", file_name, image_path, None)])
+        with body:
             try:
                 logger.info(f"[{self.provider_name}] 图生视频 | URL: {url} | model={model} | file={file_name}")
                 logger.info(f"[{self.provider_name}] 请求头: {headers}")
                 logger.info(f"[{self.provider_name}] 表单数据: {data}")
-                resp = requests.post(url, headers=headers, files=files, data=data, timeout=120)
+                resp = http_client.post(
+                    url, headers={**headers, "Content-Type": body.content_type}, data=body, timeout=120
+                )
                 logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
                 logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
                 resp.raise_for_status()
@@ -186,7 +190,7 @@ class Sora2Dayangyu(Sora2Base):
         }
         try:
             logger.info(f"[{self.provider_name}] 查询任务 | GET {url}")
-            resp = requests.get(url, headers=headers, timeout=30)
+            resp = http_client.get(url, headers=headers, timeout=30)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
             resp.raise_for_status()
@@ -249,7 +253,7 @@ class Sora2Dayangyu(Sora2Base):
         }
         try:
             logger.info(f"[{self.provider_name}] 查看视频内容 | GET {url}")
-            with requests.get(url, headers=headers, timeout=120) as resp:
+            with http_client.get(url, headers=headers, timeout=120) as resp:
                 logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code} | Content-Type: {resp.headers.get('Content-Type', 'N/A')} | 大小: {len(resp.content)} bytes")
                 resp.raise_for_status()
                 content_type = (resp.headers.get("Content-Type") or "").split(";")[0].strip()
@@ -7,6 +7,8 @@ import requests
 
 from ...constants import ApiUrls
 from ...logger import logger
+from .. import http_client
+from ..multipart import MultipartEncoder
 from .base import Sora2Base, Sora2Task, Sora2TaskStatus
 
 
@@ -83,7 +85,7 @@ class Sora2Xiaobanshou(Sora2Base):
             logger.info(f"[{self.provider_name}] 文生视频 | POST {url} | model={model} | prompt={prompt[:50]}...")
             logger.info(f"[{self.provider_name}] 请求头: {req_headers}")
             logger.info(f"[{self.provider_name}] 请求体: {payload}")
-            resp = requests.post(url, headers=req_headers, json=payload, timeout=60)
+            resp = http_client.post(url, headers=req_headers, json=payload, timeout=60)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
             resp.raise_for_status()
@@ -115,15 +117,17 @@ class Sora2Xiaobanshou(Sora2Base):
         image_path: str,
     ) -> Sora2Task:
         """图生视频：POST multipart/form-data（input_reference + prompt + model）"""
-        with open(image_path, "rb") as f:
-            file_name = os.path.basename(image_path)
-            files = {"input_reference": (file_name, f)}
-            data = {"prompt": prompt, "model": model}
+        file_name = os.path.basename(image_path)
+        data = {"prompt": prompt, "model": model}
+        body = MultipartEncoder(fields=data.items(), files=[("input_reference", file_name, image_path, None)])
+        with body:
             try:
                 logger.info(f"[{self.provider_name}] 图生视频 | POST {url} | model={model} | file={file_name}")
                 logger.info(f"[{self.provider_name}] 请求头: {headers}")
                 logger.info(f"[{self.provider_name}] 表单数据: {data}")
-                resp = requests.post(url, headers=headers, files=files, data=data, timeout=120)
+                resp = http_client.post(
+                    url, headers={**headers, "Content-Type": body.content_type}, data=body, timeout=120
+                )
                 logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
                 logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
                 resp.raise_for_status()
@@ -176,7 +180,7 @@ class Sora2Xiaobanshou(Sora2Base):
         }
         try:
             logger.info(f"[{self.provider_name}] 查询任务 | GET {url}")
-            resp = requests.get(url, headers=headers, timeout=30)
+            resp = http_client.get(url, headers=headers, timeout=30)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
             resp.raise_for_status()
@@ -239,7 +243,7 @@ class Sora2Xiaobanshou(Sora2Base):
         }
         try:
             logger.info(f"[{self.provider_name}] 查看视频内容 | GET {url}")
-            with requests.get(url, headers=headers, timeout=120) as resp:
+            with http_client.get(url, headers=headers, timeout=120) as resp:
                 logger.info(
                     f"[{self.provider_name}] 响应状态码: {resp.status_code} | "
                     f"Content-Type: {resp.headers.get('Content-Type', 'N/A')} | 大小: {len(resp.content)} bytes"
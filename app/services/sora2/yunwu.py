@@ -6,6 +6,7 @@ import requests
 
 from ...constants import ApiUrls
 from ...logger import logger
+from .. import http_client
 from .base import Sora2Base, Sora2Task, Sora2TaskStatus
 
 # 云雾 Sora2 接口固定地址
@@ -49,7 +50,7 @@ class Sora2Yunwu(Sora2Base):
             logger.info(f"[{self.provider_name}] 图床上传 | POST {url} | {filename} | {len(image_data)} bytes")
             logger.info(f"[{self.provider_name}] 请求头: {headers}")
 
-            resp = requests.post(url, headers=headers, files=files, timeout=60)
+            resp = http_client.post(url, headers=headers, files=files, timeout=60)
             logger.info(f"[{self.provider_name}] 图床响应状态码: {resp.status_code}")
             logger.info(f"[{self.provider_name}] 图床响应体: {resp.text[:500]}")
             resp.raise_for_status()
@@ -145,7 +146,7 @@ class Sora2Yunwu(Sora2Base):
             logger.info(f"[{self.provider_name}] 请求头: {headers}")
             logger.info(f"[{self.provider_name}] 请求体: {payload}")
 
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
+            resp = http_client.post(url, headers=headers, json=payload, timeout=60)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
             resp.raise_for_status()
@@ -191,7 +192,7 @@ class Sora2Yunwu(Sora2Base):
         try:
             logger.info(f"[{self.provider_name}] Sora2 查询任务 | GET {url} | task_id={task_id}")
 
-            resp = requests.get(url, headers=headers, params=params, timeout=30)
+            resp = http_client.get(url, headers=headers, params=params, timeout=30)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
             resp.raise_for_status()
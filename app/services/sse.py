@@ -0,0 +1,142 @@
+"""Chat Completions SSE 流的增量读取
+
+荷塘 VEO、万米霖 / 荷塘 NanoBanana 都通过 stream=True 的 chat.completions 返回结果，
+图片渠道的一次响应里可能带有数 MB 的 base64 图片。这里：
+- 按块读取原始字节，在 bytearray 中切分行，只扫描新到达的字节，超长的 data 行也是线性开销；
+- 增量内容以列表累积（ContentBuffer），只在需要时拼接一次，避免逐段 += 的二次复杂度；
+- 调用方在识别到完整结果后即可停止迭代并关闭响应，不必等服务端把流发完。
+"""
+
+import json
+from typing import Iterator, Optional
+
+# SSE 响应为分块传输，每次读取在收到一个分块时即返回，不会等满这个大小
+_CHUNK_SIZE = 64 * 1024
+
+
+def _data_payload(line: bytes) -> Optional[str]:
+    if not line.startswith(b"data:"):
+        return None
+    return line[5:].decode("utf-8", errors="replace").strip()
+
+
+def iter_sse_data(response, chunk_size: int = _CHUNK_SIZE) -> Iterator[str]:
+    """逐条产出 SSE 事件的 data 内容（不含 "data:" 前缀），遇到 [DONE] 结束"""
+    buffer = bytearray()
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if not chunk:
+            continue
+        scan_from = len(buffer)
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", scan_from)
+            if end < 0:
+                break
+            payload = _data_payload(bytes(buffer[start:end]).rstrip(b"\r"))
+            start = scan_from = end + 1
+            if payload is None:
+                continue
+            if payload == "[DONE]":
+                return
+            yield payload
+        if start:
+            del buffer[:start]
+
+    payload = _data_payload(bytes(buffer).rstrip(b"\r"))
+    if payload and payload != "[DONE]":
+        yield payload
+
+
+def iter_chat_deltas(response, chunk_size: int = _CHUNK_SIZE) -> Iterator[dict]:
+    """逐条产出 chat.completions 流的 choices[0].delta，跳过无法解析的事件"""
+    for payload in iter_sse_data(response, chunk_size):
+        try:
+            data = json.loads(payload)
+        except json.JSONDecodeError:
+            continue
+        choices = data.get("choices") if isinstance(data, dict) else None
+        if choices:
+            yield choices[0].get("delta") or {}
+
+
+class ContentBuffer:
+    """累积流式 content 片段，拼接推迟到 getvalue()"""
+
+    def __init__(self):
+        self._parts: list = []
+        self._length = 0
+        self._joined: Optional[str] = None
+
+    def append(self, text: str) -> None:
+        if text:
+            self._parts.append(text)
+            self._length += len(text)
+            self._joined = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def recent(self, size: int) -> str:
+        """末尾至多 size 个字符（只拼接用到的片段）"""
+        parts, total = [], 0
+        for part in reversed(self._parts):
+            parts.append(part)
+            total += len(part)
+            if total >= size:
+                break
+        return "".join(reversed(parts))[-size:] if size > 0 else ""
+
+    def getvalue(self) -> str:
+        if self._joined is None:
+            self._joined = "".join(self._parts)
+            self._parts = [self._joined] if self._joined else []
+        return self._joined
+
+
+class MarkdownImageBuffer(ContentBuffer):
+    """在累积的同时识别第一个 markdown 图片 ![...](...)，链接的右括号一到达 complete 即为真。
+
+    只扫描新片段（加上与前一片段衔接处的一个字符），图片 base64 再大也只扫描一遍。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._alt_start = -1  # "![" 的位置
+        self._src_start = -1  # "](" 之后的位置
+        self._src_end = -1  # ")" 的位置
+
+    @property
+    def complete(self) -> bool:
+        return self._src_end >= 0
+
+    def append(self, text: str) -> None:
+        if not text or self.complete:
+            super().append(text)
+            return
+        offset = len(self) - 1 if len(self) else 0
+        window = self.recent(1) + text
+        super().append(text)
+
+        position = 0
+        if self._alt_start < 0:
+            found = window.find("![")
+            if found < 0:
+                return
+            self._alt_start = offset + found
+            position = found + 2
+        if self._src_start < 0:
+            found = window.find("](", max(position, self._alt_start - offset + 2))
+            if found < 0:
+                return
+            self._src_start = offset + found + 2
+            position = found + 2
+        found = window.find(")", max(position, self._src_start - offset))
+        if found >= 0:
+            self._src_end = offset + found
+
+    def image_src(self) -> Optional[str]:
+        """完整到达的图片链接（去除首尾空白）；未到达时返回 None"""
+        if not self.complete:
+            return None
+        return self.getvalue()[self._src_start:self._src_end].strip()
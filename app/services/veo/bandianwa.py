@@ -1,15 +1,14 @@
 """斑点蛙 API VEO 视频生成（异步任务型）"""
 
-import base64
-import os
-import time
 from typing import Optional
 
 import requests
 
 from ...logger import logger
+from .. import http_client
+from ..polling import PollPending, parse_progress
+from ..ref_image import ReferenceImage
 from .base import VeoBase, VeoResult, VeoTask, VeoTaskStatus
-from .utils import download_video
 
 BDW_BASE = "https://api.hellobabygo.com"
 
@@ -34,6 +33,9 @@ _I2V_MODELS = {
 class VeoBandianwa(VeoBase):
     """斑点蛙 API VEO 视频生成"""
 
+    poll_interval_seconds = 35
+    download_prefix = "veo_bdw"
+
     @property
     def provider_name(self) -> str:
         return "斑点蛙 API"
@@ -42,29 +44,28 @@ class VeoBandianwa(VeoBase):
     def base_url(self) -> str:
         return BDW_BASE
 
-    def generate(
+    def submit(
         self,
         prompt: str,
         orientation: str = "portrait",
         duration: int = 10,
         ref_image_path: Optional[str] = None,
-        download_dir: Optional[str] = None,
         **kwargs,
-    ) -> VeoResult:
+    ) -> Optional[str]:
         """
-        生成视频（异步任务型）。
+        提交视频任务（异步任务型），返回远程任务 ID。
 
         Args:
             prompt:          视频描述提示词
             orientation:     方向，portrait（竖屏）/ landscape（横屏）
             duration:        视频时长（秒）
             ref_image_path:  参考图片本地路径（图生视频时使用）
-            download_dir:    视频下载目录
             **kwargs:
                 quality: 保留兼容；当前不参与斑点蛙模型路由
         """
         # 斑点蛙 VEO 当前文生走普通模型，首尾帧走 -fl-hd 模型。
-        if ref_image_path:
+        ref_image = ReferenceImage.coerce(ref_image_path)
+        if ref_image:
             model = _I2V_MODELS.get(orientation, _I2V_MODELS["portrait"])
         else:
             model = _T2V_MODELS.get(orientation, _T2V_MODELS["portrait"])
@@ -78,29 +79,10 @@ class VeoBandianwa(VeoBase):
         }
 
         # 如果有参考图，添加到 payload
-        if ref_image_path and os.path.isfile(ref_image_path):
-            mime = "image/jpeg"
-            with open(ref_image_path, "rb") as f:
-                img_b64 = base64.b64encode(f.read()).decode()
-            payload["input_reference"] = f"data:{mime};base64,{img_b64}"
-
-        # 提交任务
-        task_id = self._submit_task(payload)
-        if not task_id:
-            return VeoResult(success=False, error_message="任务提交失败")
-
-        # 轮询任务状态
-        result = self._poll_task(task_id)
-        if not result or not result.success:
-            return result or VeoResult(success=False, error_message="任务轮询失败")
-
-        # 如果配置了下载目录，下载视频
-        if result.success and result.video_url and download_dir:
-            result.file_path = download_video(
-                result.video_url, download_dir, f"veo_bdw"
-            )
-
-        return result
+        if ref_image and ref_image.exists():
+            payload["input_reference"] = f"data:image/jpeg;base64,{ref_image.base64}"
+
+        return self._submit_task(payload)
 
     def _submit_task(self, payload: dict) -> Optional[str]:
         """提交异步任务"""
@@ -118,7 +100,7 @@ class VeoBandianwa(VeoBase):
         )
 
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
+            resp = http_client.post(url, headers=headers, json=payload, timeout=60)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
             resp.raise_for_status()
@@ -143,55 +125,43 @@ class VeoBandianwa(VeoBase):
             logger.error(f"[{self.provider_name}] 任务提交异常: {exc}")
             return None
 
-    def _poll_task(
-        self,
-        task_id: str,
-        timeout_seconds: int = 600,
-        interval_seconds: int = 35,
-    ) -> Optional[VeoResult]:
-        """轮询任务状态"""
+    def query(self, task_id: str, **kwargs) -> Optional[VeoResult]:
+        """查询一次任务状态，仍在处理中时返回携带进度的 PollPending，查询异常时返回 None"""
         url = f"{self.base_url.rstrip('/')}/v1/videos/{task_id}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
         }
-        deadline = time.time() + timeout_seconds
-
-        while time.time() < deadline:
-            try:
-                resp = requests.get(url, headers=headers, timeout=30)
-                logger.info(f"[{self.provider_name}] 轮询状态码: {resp.status_code}")
-                logger.info(f"[{self.provider_name}] 轮询响应: {resp.text[:500]}")
-                resp.raise_for_status()
-
-                data = resp.json()
-                status = str(data.get("status") or "").lower()
-
-                # 检查是否完成
-                if status == "completed":
-                    logger.info(f"[{self.provider_name}] 任务完成 | task_id={task_id}")
-                    return self._extract_result(data)
-
-                # 检查是否失败
-                if status in _FAILED_STATUSES:
-                    error_msg = self._extract_error_from_response(data)
-                    logger.error(f"[{self.provider_name}] 任务失败 | task_id={task_id} | error={error_msg}")
-                    return VeoResult(success=False, error_message=str(error_msg))
-
-                # 继续轮询
-                if status not in _PENDING_STATUSES and status != "":
-                    logger.warning(f"[{self.provider_name}] 未识别状态: {status}")
-
-                time.sleep(interval_seconds)
-
-            except requests.exceptions.Timeout:
-                logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
-                time.sleep(interval_seconds)
-            except Exception as exc:
-                logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
-                time.sleep(interval_seconds)
-
-        return VeoResult(success=False, error_message="轮询视频结果超时")
+        try:
+            resp = http_client.get(url, headers=headers, timeout=30)
+            logger.info(f"[{self.provider_name}] 轮询状态码: {resp.status_code}")
+            logger.info(f"[{self.provider_name}] 轮询响应: {resp.text[:500]}")
+            resp.raise_for_status()
+
+            data = resp.json()
+            status = str(data.get("status") or "").lower()
+
+            # 检查是否完成
+            if status == "completed":
+                logger.info(f"[{self.provider_name}] 任务完成 | task_id={task_id}")
+                return self._extract_result(data)
+
+            # 检查是否失败
+            if status in _FAILED_STATUSES:
+                error_msg = self._extract_error_from_response(data)
+                logger.error(f"[{self.provider_name}] 任务失败 | task_id={task_id} | error={error_msg}")
+                return VeoResult(success=False, error_message=str(error_msg))
+
+            # 继续轮询
+            if status not in _PENDING_STATUSES and status != "":
+                logger.warning(f"[{self.provider_name}] 未识别状态: {status}")
+            return PollPending(parse_progress(data.get("progress")))
+        except requests.exceptions.Timeout:
+            logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
+        except Exception as exc:
+            logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
+
+        return None
 
     def _extract_result(self, data: dict) -> VeoResult:
         """从响应中提取视频结果"""
@@ -1,9 +1,13 @@
 """VEO 视频生成基类"""
 
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Callable, Optional, Union
+
+from ..polling import PollPending, remote_task_poller
+from .utils import download_video
 
 
 class VeoTaskStatus(Enum):
@@ -40,10 +44,18 @@ class VeoResult:
 class VeoBase(ABC):
     """VEO 视频生成基类
 
-    每个子类对应一个渠道，必须实现 generate() 方法。
-    generate() 的返回值是 VeoResult，其中 file_path 为最终落盘的本地路径。
+    异步任务型渠道拆分为三步：submit() 提交任务并返回远程任务 ID，query() 查询一次状态，
+    fetch() 下载成品。generate() 按 提交 → 轮询 → 下载 的顺序串联三步，同步阻塞直到完成。
+    调用方也可以分步调用并持久化远程任务 ID，重启后直接续查，而不是重新提交。
+
+    不支持拆分的渠道（如流式返回的荷塘）需将 supports_resume 置为 False 并覆盖 generate()。
     """
 
+    supports_resume: bool = True
+    poll_interval_seconds: int = 10
+    poll_timeout_seconds: int = 600
+    download_prefix: str = "veo"
+
     def __init__(self, api_key: str, base_url: str = ""):
         """
         初始化
@@ -67,7 +79,49 @@ class VeoBase(ABC):
         """API 基础地址"""
         pass
 
-    @abstractmethod
+    def submit(
+        self,
+        prompt: str,
+        orientation: str = "portrait",
+        duration: int = 10,
+        ref_image_path: Optional[str] = None,
+        **kwargs,
+    ) -> Optional[str]:
+        """提交生成任务，返回远程任务 ID；提交失败返回 None"""
+        raise NotImplementedError(f"{self.provider_name} 不支持分步提交")
+
+    def query(self, task_id: str, **kwargs) -> Union[VeoResult, PollPending, None]:
+        """查询一次任务状态：仍在处理中返回 None 或 PollPending（带进度），否则返回最终结果"""
+        raise NotImplementedError(f"{self.provider_name} 不支持分步查询")
+
+    def watch(
+        self,
+        task_id: str,
+        timeout_seconds: Optional[int] = None,
+        interval_seconds: Optional[int] = None,
+        on_progress: Optional[Callable[[int], None]] = None,
+        record_history: bool = True,
+        **query_kwargs,
+    ) -> Future:
+        """交给统一轮询器跟踪任务，返回在任务结束时完成的 Future（结果为 VeoResult）；on_progress 接收 0-100 进度。
+
+        record_history=False 用于重启后续查的任务：只观察到后半段耗时，不计入供应商历史耗时。
+        """
+        return remote_task_poller.watch(
+            lambda: self.query(task_id, **query_kwargs),
+            interval_seconds=self.poll_interval_seconds if interval_seconds is None else interval_seconds,
+            timeout_seconds=self.poll_timeout_seconds if timeout_seconds is None else timeout_seconds,
+            default=VeoResult(success=False, error_message="轮询视频结果超时"),
+            key=type(self).__name__,
+            succeeded=lambda result: result.success,
+            on_progress=on_progress,
+            record_history=record_history,
+        )
+
+    def fetch(self, video_url: str, download_dir: str) -> str:
+        """下载成品视频，返回本地文件路径；失败时抛出异常"""
+        return download_video(video_url, download_dir, self.download_prefix)
+
     def generate(
         self,
         prompt: str,
@@ -84,11 +138,30 @@ class VeoBase(ABC):
             prompt:          视频描述提示词
             orientation:     方向，portrait（竖屏）/ landscape（横屏）
             duration:        视频时长（秒），通常 5 / 10
-            ref_image_path:  参考图片本地路径（图生视频时使用），None 则为文生视频
+            ref_image_path:  参考图片本地路径或 ReferenceImage（图生视频时使用），None 则为文生视频
             download_dir:    视频下载目录；传入后自动下载到本地并写入 file_path
             **kwargs:        渠道专有扩展参数
 
         Returns:
             VeoResult: 生成结果，file_path 为本地视频文件绝对路径
         """
-        pass
+        task_id = self.submit(prompt, orientation, duration, ref_image_path, **kwargs)
+        if not task_id:
+            return VeoResult(success=False, error_message="任务提交失败")
+
+        result = self._poll_task(task_id)
+        if not result or not result.success:
+            return result or VeoResult(success=False, error_message="任务轮询失败")
+
+        if result.video_url and download_dir:
+            result.file_path = self.fetch(result.video_url, download_dir)
+        return result
+
+    def _poll_task(
+        self,
+        task_id: str,
+        timeout_seconds: Optional[int] = None,
+        interval_seconds: Optional[int] = None,
+        **query_kwargs,
+    ) -> Optional[VeoResult]:
+        return self.watch(task_id, timeout_seconds, interval_seconds, **query_kwargs).result()
@@ -1,16 +1,14 @@
 """CatKing API (api.catking.top) VEO 视频生成（异步任务型）"""
 
-import base64
-import mimetypes
-import os
-import time
 from typing import Optional
 
 import requests
 
 from ...logger import logger
+from .. import http_client
+from ..polling import PollPending, parse_progress
+from ..ref_image import ReferenceImage
 from .base import VeoBase, VeoResult
-from .utils import download_video
 
 CATKING_BASE = "https://api.catking.top"
 
@@ -18,14 +16,12 @@ _PENDING_STATUSES = {"queued", "processing"}
 _FAILED_STATUSES = {"failed", "cancelled"}
 
 
-def _guess_mime_type(path):
-    mime_type, _ = mimetypes.guess_type(str(path))
-    return mime_type or "image/jpeg"
-
-
 class VeoCatking(VeoBase):
     """CatKing VEO 视频生成"""
 
+    poll_interval_seconds = 10
+    download_prefix = "veo_catking"
+
     @property
     def provider_name(self) -> str:
         return "CatKing"
@@ -38,41 +34,23 @@ class VeoCatking(VeoBase):
         super().__init__(api_key)
         self._base_url = (base_url or "").strip().rstrip("/")
 
-    def generate(
+    def submit(
         self,
         prompt: str,
         orientation: str = "portrait",
         duration: int = 10,
         ref_image_path: Optional[str] = None,
-        download_dir: Optional[str] = None,
         **kwargs,
-    ) -> VeoResult:
+    ) -> Optional[str]:
         model = kwargs.get("model") or f"ali-veo-3.1-{orientation}-8s-1080p"
 
-        reference_images = self._build_reference_images(ref_image_path)
-
-        task_id = self._submit_task(model, prompt, reference_images)
-        if not task_id:
-            return VeoResult(success=False, error_message="任务提交失败")
-
-        result = self._poll_task(task_id)
-        if not result or not result.success:
-            return result or VeoResult(success=False, error_message="任务轮询失败")
+        reference_images = self._build_reference_images(ReferenceImage.coerce(ref_image_path))
+        return self._submit_task(model, prompt, reference_images)
 
-        if result.success and result.video_url and download_dir:
-            result.file_path = download_video(result.video_url, download_dir, prefix="veo_catking")
-
-        return result
-
-    def _build_reference_images(self, ref_image_path: Optional[str]) -> list:
-        if not ref_image_path or not os.path.isfile(ref_image_path):
+    def _build_reference_images(self, ref_image: Optional[ReferenceImage]) -> list:
+        if not ref_image or not ref_image.exists():
             return []
-
-        mime_type = _guess_mime_type(ref_image_path)
-        with open(ref_image_path, "rb") as f:
-            img_b64 = base64.b64encode(f.read()).decode()
-
-        return [f"data:{mime_type};base64,{img_b64}"]
+        return [ref_image.data_url]
 
     def _submit_task(self, model: str, prompt: str, reference_images: list) -> Optional[str]:
         url = f"{self.base_url}/v1/videos"
@@ -91,7 +69,7 @@ class VeoCatking(VeoBase):
         )
 
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
+            resp = http_client.post(url, headers=headers, json=payload, timeout=60)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
 
@@ -123,51 +101,40 @@ class VeoCatking(VeoBase):
             logger.error(f"[{self.provider_name}] 任务提交异常: {exc}")
             return None
 
-    def _poll_task(
-        self,
-        task_id: str,
-        timeout_seconds: int = 600,
-        interval_seconds: int = 10,
-    ) -> Optional[VeoResult]:
+    def query(self, task_id: str, **kwargs) -> Optional[VeoResult]:
+        """查询一次任务状态，仍在处理中时返回携带进度的 PollPending，查询异常时返回 None"""
         url = f"{self.base_url}/v1/videos/{task_id}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
         }
-        deadline = time.time() + timeout_seconds
-
-        while time.time() < deadline:
-            try:
-                resp = requests.get(url, headers=headers, timeout=30)
-                logger.info(f"[{self.provider_name}] 轮询状态码: {resp.status_code}")
-                logger.info(f"[{self.provider_name}] 轮询响应: {resp.text[:500]}")
-                resp.raise_for_status()
-
-                data = resp.json()
-                status = str(data.get("status") or "").lower()
-
-                if status == "completed":
-                    logger.info(f"[{self.provider_name}] 任务完成 | id={task_id}")
-                    return self._extract_result(data, task_id)
+        try:
+            resp = http_client.get(url, headers=headers, timeout=30)
+            logger.info(f"[{self.provider_name}] 轮询状态码: {resp.status_code}")
+            logger.info(f"[{self.provider_name}] 轮询响应: {resp.text[:500]}")
+            resp.raise_for_status()
 
-                if status in _FAILED_STATUSES:
-                    error_msg = data.get("error") or "任务执行失败"
-                    logger.error(f"[{self.provider_name}] 任务失败 | id={task_id} | error={error_msg}")
-                    return VeoResult(success=False, error_message=str(error_msg))
+            data = resp.json()
+            status = str(data.get("status") or "").lower()
 
-                if status not in _PENDING_STATUSES and status != "":
-                    logger.warning(f"[{self.provider_name}] 未识别状态: {status}")
+            if status == "completed":
+                logger.info(f"[{self.provider_name}] 任务完成 | id={task_id}")
+                return self._extract_result(data, task_id)
 
-                time.sleep(interval_seconds)
+            if status in _FAILED_STATUSES:
+                error_msg = data.get("error") or "任务执行失败"
+                logger.error(f"[{self.provider_name}] 任务失败 | id={task_id} | error={error_msg}")
+                return VeoResult(success=False, error_message=str(error_msg))
 
-            except requests.exceptions.Timeout:
-                logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
-                time.sleep(interval_seconds)
-            except Exception as exc:
-                logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
-                time.sleep(interval_seconds)
+            if status not in _PENDING_STATUSES and status != "":
+                logger.warning(f"[{self.provider_name}] 未识别状态: {status}")
+            return PollPending(parse_progress(data.get("progress")))
+        except requests.exceptions.Timeout:
+            logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
+        except Exception as exc:
+            logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
 
-        return VeoResult(success=False, error_message="轮询视频结果超时")
+        return None
 
     def _extract_result(self, data: dict, task_id: str) -> VeoResult:
         video_url = data.get("url") or ""
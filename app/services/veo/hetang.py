@@ -1,19 +1,29 @@
 """荷塘渠道 VEO 生成"""
 
-import json
 import re
 from typing import Optional
 
 import requests
 
 from ...logger import logger
+from .. import http_client
+from ..ref_image import ReferenceImage
+from ..sse import ContentBuffer, iter_chat_deltas
 from .base import VeoBase, VeoResult, VeoTask, VeoTaskStatus
 from .utils import download_video
 
 
+_VIDEO_SRC_RE = re.compile(r"<video\s+src='([^']+)'")
+# 在新增量之前额外回看的字符数，覆盖被拆开的 <video src='...'> 标签
+_VIDEO_TAG_OVERLAP = 2048
+
+
 class VeoHetang(VeoBase):
     """荷塘渠道 — 基于 Chat Completions SSE 流式接口"""
 
+    # 流式接口在一次请求内返回结果，没有可续查的远程任务 ID
+    supports_resume = False
+
     # 文生视频模型，按方向索引
     _T2V_MODELS = {
         "portrait":  "veo_3_1_t2v_fast_portrait",
@@ -50,15 +60,12 @@ class VeoHetang(VeoBase):
             )
 
         # 根据是否有参考图片和方向选择模型
-        if ref_image_path:
+        ref_image = ReferenceImage.coerce(ref_image_path)
+        if ref_image:
             model = self._I2V_MODELS.get(orientation, self._I2V_MODELS["portrait"])
-            import base64, mimetypes
-            mime = mimetypes.guess_type(ref_image_path)[0] or "image/jpeg"
-            with open(ref_image_path, "rb") as f:
-                img_b64 = base64.b64encode(f.read()).decode()
             content = [
                 {"type": "text", "text": prompt},
-                {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{img_b64}"}},
+                {"type": "image_url", "image_url": {"url": ref_image.data_url}},
             ]
             messages = [{"role": "user", "content": content}]
         else:
@@ -77,37 +84,31 @@ class VeoHetang(VeoBase):
                 f"[VEO/{self.provider_name}] 开始生成 | model={model} | "
                 f"orientation={orientation} | ref={'有' if ref_image_path else '无'}"
             )
-            resp = requests.post(
+            resp = http_client.post(
                 url, headers=headers, json=payload, stream=True, timeout=600
             )
             resp.raise_for_status()
 
             video_url = ""
             error_message = ""
-            for line in resp.iter_lines(decode_unicode=True):
-                if not line or not line.startswith("data: "):
-                    continue
-                raw = line[6:].strip()
-                if raw == "[DONE]":
-                    break
-                try:
-                    data = json.loads(raw)
-                except json.JSONDecodeError:
-                    continue
-
-                choices = data.get("choices", [])
-                if not choices:
-                    continue
-                delta = choices[0].get("delta", {})
-                content_str = delta.get("content", "")
-                if content_str:
-                    match = re.search(r"<video\s+src='([^']+)'", content_str)
-                    if match:
-                        video_url = match.group(1)
-
-                reasoning = delta.get("reasoning_content", "")
-                if reasoning and ("❌" in reasoning or "失败" in reasoning):
-                    error_message = reasoning.strip()
+            content = ContentBuffer()
+            try:
+                for delta in iter_chat_deltas(resp):
+                    content_str = delta.get("content") or ""
+                    if content_str:
+                        content.append(content_str)
+                        # 视频标签可能跨多个增量到达，只在新内容及其前一小段中查找
+                        match = _VIDEO_SRC_RE.search(content.recent(len(content_str) + _VIDEO_TAG_OVERLAP))
+                        if match:
+                            video_url = match.group(1)
+                            break
+
+                    reasoning = delta.get("reasoning_content", "")
+                    if reasoning and ("❌" in reasoning or "失败" in reasoning):
+                        error_message = reasoning.strip()
+            finally:
+                # 拿到视频链接后不再等待流结束
+                resp.close()
 
             if not video_url:
                 return VeoResult(
@@ -117,9 +118,12 @@ class VeoHetang(VeoBase):
 
             file_path = None
             if download_dir:
-                file_path = download_video(
-                    video_url, download_dir, f"veo_hetang"
-                )
+                try:
+                    file_path = download_video(
+                        video_url, download_dir, f"veo_hetang"
+                    )
+                except Exception as exc:
+                    return VeoResult(success=False, video_url=video_url, error_message=f"视频下载失败: {exc}")
 
             logger.info(f"[VEO/{self.provider_name}] 生成成功 | video_url={video_url}")
             return VeoResult(success=True, video_url=video_url, file_path=file_path)
@@ -1,14 +1,13 @@
 """HOLO API (api.dealonhorizon.us) VEO 视频生成（异步任务型）"""
 
-import base64
-import mimetypes
-import os
-import time
 from typing import Optional
 
 import requests
 
 from ...logger import logger
+from .. import http_client
+from ..polling import PollPending, parse_progress
+from ..ref_image import ReferenceImage
 from .base import VeoBase, VeoResult
 from .utils import download_video
 
@@ -18,14 +17,12 @@ _PENDING_STATUSES = {"queued", "processing"}
 _FAILED_STATUSES = {"failed", "cancelled"}
 
 
-def _guess_mime_type(path):
-    mime_type, _ = mimetypes.guess_type(str(path))
-    return mime_type or "image/jpeg"
-
-
 class VeoHolo(VeoBase):
     """HOLO VEO 视频生成"""
 
+    poll_interval_seconds = 10
+    download_prefix = "veo_holo"
+
     @property
     def provider_name(self) -> str:
         return "HOLO"
@@ -38,46 +35,35 @@ class VeoHolo(VeoBase):
         super().__init__(api_key)
         self._base_url = (base_url or "").strip().rstrip("/")
 
-    def generate(
+    def submit(
         self,
         prompt: str,
         orientation: str = "portrait",
         duration: int = 10,
         ref_image_path: Optional[str] = None,
-        download_dir: Optional[str] = None,
         **kwargs,
-    ) -> VeoResult:
-        mode = "i2v" if (ref_image_path and os.path.isfile(ref_image_path)) else "t2v"
+    ) -> Optional[str]:
+        ref_image = ReferenceImage.coerce(ref_image_path)
+        if ref_image and not ref_image.exists():
+            ref_image = None
+        mode = "i2v" if ref_image else "t2v"
         tier = kwargs.get("tier", "fast")
         model = kwargs.get("model") or f"veo_3_1_{mode}_{tier}_{orientation}"
 
-        messages = self._build_messages(prompt, ref_image_path)
-
-        task_id = self._submit_task(model, messages)
-        if not task_id:
-            return VeoResult(success=False, error_message="任务提交失败")
-
-        result = self._poll_task(task_id)
-        if not result or not result.success:
-            return result or VeoResult(success=False, error_message="任务轮询失败")
-
-        if result.success and result.video_url and download_dir:
-            result.file_path = self._download_video(result.video_url, download_dir)
+        messages = self._build_messages(prompt, ref_image)
+        return self._submit_task(model, messages)
 
-        return result
+    def fetch(self, video_url: str, download_dir: str) -> str:
+        return self._download_video(video_url, download_dir)
 
-    def _build_messages(self, prompt: str, ref_image_path: Optional[str]) -> list:
-        if not ref_image_path or not os.path.isfile(ref_image_path):
+    def _build_messages(self, prompt: str, ref_image: Optional[ReferenceImage]) -> list:
+        if not ref_image:
             return [{"role": "user", "content": prompt}]
 
-        mime_type = _guess_mime_type(ref_image_path)
-        with open(ref_image_path, "rb") as f:
-            img_b64 = base64.b64encode(f.read()).decode()
-
         return [{
             "role": "user",
             "content": [
-                {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{img_b64}"}},
+                {"type": "image_url", "image_url": {"url": ref_image.data_url}},
                 {"type": "text", "text": prompt},
             ],
         }]
@@ -97,7 +83,7 @@ class VeoHolo(VeoBase):
         )
 
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
+            resp = http_client.post(url, headers=headers, json=payload, timeout=60)
             logger.info(f"[{self.provider_name}] 响应状态码: {resp.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {resp.text[:500]}")
 
@@ -129,51 +115,40 @@ class VeoHolo(VeoBase):
             logger.error(f"[{self.provider_name}] 任务提交异常: {exc}")
             return None
 
-    def _poll_task(
-        self,
-        task_id: str,
-        timeout_seconds: int = 600,
-        interval_seconds: int = 10,
-    ) -> Optional[VeoResult]:
+    def query(self, task_id: str, **kwargs) -> Optional[VeoResult]:
+        """查询一次任务状态，仍在处理中时返回携带进度的 PollPending，查询异常时返回 None"""
         url = f"{self.base_url}/v1/tasks/{task_id}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
         }
-        deadline = time.time() + timeout_seconds
-
-        while time.time() < deadline:
-            try:
-                resp = requests.get(url, headers=headers, timeout=30)
-                logger.info(f"[{self.provider_name}] 轮询状态码: {resp.status_code}")
-                logger.info(f"[{self.provider_name}] 轮询响应: {resp.text[:500]}")
-                resp.raise_for_status()
-
-                data = resp.json()
-                status = str(data.get("status") or "").lower()
-
-                if status == "completed":
-                    logger.info(f"[{self.provider_name}] 任务完成 | task_id={task_id}")
-                    return self._extract_result(data, task_id)
+        try:
+            resp = http_client.get(url, headers=headers, timeout=30)
+            logger.info(f"[{self.provider_name}] 轮询状态码: {resp.status_code}")
+            logger.info(f"[{self.provider_name}] 轮询响应: {resp.text[:500]}")
+            resp.raise_for_status()
 
-                if status in _FAILED_STATUSES:
-                    error_msg = data.get("error") or "任务执行失败"
-                    logger.error(f"[{self.provider_name}] 任务失败 | task_id={task_id} | error={error_msg}")
-                    return VeoResult(success=False, error_message=str(error_msg))
+            data = resp.json()
+            status = str(data.get("status") or "").lower()
 
-                if status not in _PENDING_STATUSES and status != "":
-                    logger.warning(f"[{self.provider_name}] 未识别状态: {status}")
+            if status == "completed":
+                logger.info(f"[{self.provider_name}] 任务完成 | task_id={task_id}")
+                return self._extract_result(data, task_id)
 
-                time.sleep(interval_seconds)
+            if status in _FAILED_STATUSES:
+                error_msg = data.get("error") or "任务执行失败"
+                logger.error(f"[{self.provider_name}] 任务失败 | task_id={task_id} | error={error_msg}")
+                return VeoResult(success=False, error_message=str(error_msg))
 
-            except requests.exceptions.Timeout:
-                logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
-                time.sleep(interval_seconds)
-            except Exception as exc:
-                logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
-                time.sleep(interval_seconds)
+            if status not in _PENDING_STATUSES and status != "":
+                logger.warning(f"[{self.provider_name}] 未识别状态: {status}")
+            return PollPending(parse_progress(data.get("progress")))
+        except requests.exceptions.Timeout:
+            logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
+        except Exception as exc:
+            logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
 
-        return VeoResult(success=False, error_message="轮询视频结果超时")
+        return None
 
     def _extract_result(self, data: dict, task_id: str) -> VeoResult:
         result = data.get("result", {})
@@ -182,28 +157,14 @@ class VeoHolo(VeoBase):
         logger.info(f"[{self.provider_name}] 成功获取视频 URL: {video_url}")
         return VeoResult(success=True, video_url=video_url)
 
-    def _download_video(self, video_url: str, download_dir: str) -> Optional[str]:
+    def _download_video(self, video_url: str, download_dir: str) -> str:
         """下载视频（带认证头）"""
-        try:
-            os.makedirs(download_dir, exist_ok=True)
-            headers = {"Authorization": f"Bearer {self.api_key}"}
-            resp = requests.get(video_url, headers=headers, timeout=120, stream=True)
-            resp.raise_for_status()
-
-            from datetime import datetime
-
-            filename = f"veo_holo_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.mp4"
-            file_path = os.path.join(download_dir, filename)
-            with open(file_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-
-            logger.info(f"[{self.provider_name}] 视频已下载: {file_path}")
-            return file_path
-        except Exception as exc:
-            logger.error(f"[{self.provider_name}] 视频下载失败: {exc}")
-            return None
+        return download_video(
+            video_url,
+            download_dir,
+            self.download_prefix,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
 
     @staticmethod
     def _extract_error_message(response) -> str:
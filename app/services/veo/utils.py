@@ -4,9 +4,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-import requests
-
 from ...logger import logger
+from ..downloader import VIDEO_SEGMENTS, download_file
 
 
 def download_video(
@@ -14,8 +13,9 @@ def download_video(
     download_dir: str,
     prefix: str = "veo",
     default_ext: str = ".mp4",
-) -> Optional[str]:
-    """从远程 URL 下载视频到本地，返回本地文件绝对路径。"""
+    headers: Optional[dict] = None,
+) -> str:
+    """从远程 URL 下载视频到本地，返回本地文件绝对路径；下载失败时抛出异常（DownloadError 等）。"""
     target = Path(download_dir)
     target.mkdir(parents=True, exist_ok=True)
 
@@ -24,14 +24,9 @@ def download_video(
 
     try:
         logger.info(f"[VEO/download] 开始下载 | url={url} | dest={file_path}")
-        with requests.get(url, timeout=120, stream=True) as resp:
-            resp.raise_for_status()
-            with open(file_path, "wb") as fh:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    if chunk:
-                        fh.write(chunk)
+        download_file(url, file_path, headers=headers, segments=VIDEO_SEGMENTS)
         logger.info(f"[VEO/download] 下载完成 | {file_path}")
         return str(file_path)
     except Exception as exc:
         logger.error(f"[VEO/download] 下载失败: {exc}")
-        return None
+        raise
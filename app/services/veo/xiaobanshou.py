@@ -2,15 +2,15 @@
 
 import mimetypes
 import os
-import time
 from typing import Optional
 
 import requests
 
 from ...constants import ApiUrls
 from ...logger import logger
+from .. import http_client
+from ..polling import PollPending, parse_progress
 from .base import VeoBase, VeoResult
-from .utils import download_video
 
 _PENDING_STATUSES = {"queued", "in_progress", "processing", "running"}
 _FAILED_STATUSES = {"failed", "error", "cancelled"}
@@ -23,6 +23,9 @@ _SIZE_BY_ORIENTATION = {
 class VeoXiaobanshou(VeoBase):
     """小扳手渠道 VEO 视频生成"""
 
+    poll_interval_seconds = 5
+    download_prefix = "veo_xiaobanshou"
+
     @property
     def provider_name(self) -> str:
         return "小扳手 API"
@@ -31,38 +34,27 @@ class VeoXiaobanshou(VeoBase):
     def base_url(self) -> str:
         return ApiUrls.XIAOBANSHOU_VEO
 
-    def generate(
+    def submit(
         self,
         prompt: str,
         orientation: str = "portrait",
         duration: int = 10,
         ref_image_path: Optional[str] = None,
-        download_dir: Optional[str] = None,
         **kwargs,
-    ) -> VeoResult:
-        """生成视频并轮询结果。"""
+    ) -> Optional[str]:
+        """提交视频任务，返回远程任务 ID。"""
         del duration  # 小扳手文档未暴露时长参数，当前仅保留接口兼容。
 
         has_reference = bool(ref_image_path and os.path.isfile(ref_image_path))
         size = str(kwargs.get("size") or _SIZE_BY_ORIENTATION.get(orientation, _SIZE_BY_ORIENTATION["portrait"]))
         model = "veo_3_1-fast-fl" if has_reference else "veo_3_1-fast"
 
-        task_id = self._submit_task(
+        return self._submit_task(
             prompt=prompt,
             model=model,
             size=size,
             ref_image_path=ref_image_path if has_reference else None,
         )
-        if not task_id:
-            return VeoResult(success=False, error_message="任务提交失败")
-
-        result = self._poll_task(task_id)
-        if not result or not result.success:
-            return result or VeoResult(success=False, error_message="任务轮询失败")
-
-        if result.video_url and download_dir:
-            result.file_path = download_video(result.video_url, download_dir, "veo_xiaobanshou")
-        return result
 
     def _submit_task(
         self,
@@ -95,7 +87,7 @@ class VeoXiaobanshou(VeoBase):
                 f"模式={'图生视频' if ref_image_path else '文生视频'} | size={size} | POST {url}"
             )
 
-            response = requests.post(url, headers=headers, files=multipart, timeout=120)
+            response = http_client.post(url, headers=headers, files=multipart, timeout=120)
             logger.info(f"[{self.provider_name}] 响应状态码: {response.status_code}")
             logger.info(f"[{self.provider_name}] 响应体: {response.text[:500]}")
             response.raise_for_status()
@@ -124,52 +116,43 @@ class VeoXiaobanshou(VeoBase):
     def _encode_form_value(value: object) -> bytes:
         return str(value or "").encode("utf-8")
 
-    def _poll_task(
-        self,
-        task_id: str,
-        timeout_seconds: int = 600,
-        interval_seconds: int = 5,
-    ) -> Optional[VeoResult]:
+    def query(self, task_id: str, **kwargs) -> Optional[VeoResult]:
+        """查询一次任务状态，仍在处理中时返回携带进度的 PollPending，查询异常时返回 None"""
         url = f"{self.base_url.rstrip('/')}/v1/videos/{task_id}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
         }
-        deadline = time.time() + timeout_seconds
-
-        while time.time() < deadline:
-            try:
-                response = requests.get(url, headers=headers, timeout=30)
-                logger.info(f"[{self.provider_name}] 轮询状态码: {response.status_code}")
-                logger.info(f"[{self.provider_name}] 轮询响应: {response.text[:500]}")
-                response.raise_for_status()
-
-                data = response.json()
-                status = str(data.get("status") or "").lower()
-
-                if status == "completed":
-                    video_url = data.get("url") or data.get("video_url")
-                    if video_url:
-                        return VeoResult(success=True, video_url=video_url)
-                    return VeoResult(success=False, error_message="任务已完成，但未返回视频地址")
-
-                if status in _FAILED_STATUSES:
-                    return VeoResult(
-                        success=False,
-                        error_message=self._extract_error_from_response(data) or "任务执行失败",
-                    )
-
-                if status and status not in _PENDING_STATUSES:
-                    logger.warning(f"[{self.provider_name}] 未识别状态，继续轮询: {status}")
-                time.sleep(interval_seconds)
-            except requests.exceptions.Timeout:
-                logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
-                time.sleep(interval_seconds)
-            except Exception as exc:
-                logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
-                time.sleep(interval_seconds)
-
-        return VeoResult(success=False, error_message="轮询视频结果超时")
+        try:
+            response = http_client.get(url, headers=headers, timeout=30)
+            logger.info(f"[{self.provider_name}] 轮询状态码: {response.status_code}")
+            logger.info(f"[{self.provider_name}] 轮询响应: {response.text[:500]}")
+            response.raise_for_status()
+
+            data = response.json()
+            status = str(data.get("status") or "").lower()
+
+            if status == "completed":
+                video_url = data.get("url") or data.get("video_url")
+                if video_url:
+                    return VeoResult(success=True, video_url=video_url)
+                return VeoResult(success=False, error_message="任务已完成，但未返回视频地址")
+
+            if status in _FAILED_STATUSES:
+                return VeoResult(
+                    success=False,
+                    error_message=self._extract_error_from_response(data) or "任务执行失败",
+                )
+
+            if status and status not in _PENDING_STATUSES:
+                logger.warning(f"[{self.provider_name}] 未识别状态，继续轮询: {status}")
+            return PollPending(parse_progress(data.get("progress")))
+        except requests.exceptions.Timeout:
+            logger.warning(f"[{self.provider_name}] 轮询请求超时，继续重试")
+        except Exception as exc:
+            logger.error(f"[{self.provider_name}] 轮询异常: {exc}")
+
+        return None
 
     @staticmethod
     def _extract_error_message(response) -> str:
@@ -0,0 +1,102 @@
+"""视频任务状态推送
+
+任务的创建、状态变化、进度和删除由 API 层与扫描器在写库成功后发布为事件，按任务 ID 合并（同一任务在一个推送周期内
+只保留最新字段），由后台线程按固定间隔通过 window.evaluate_js 批量推送给前端：
+
+    window.dispatchEvent(new CustomEvent("glin:task-events", {detail: [...]}))
+
+每条事件形如 {"id": 1, "event": "completed", "status": "completed", "video_url": "..."}，
+event 取值 created / processing / progress / completed / failed / pending / updated / deleted / cleared。
+界面刷新的开销只与变化的任务数有关，与任务表大小无关。
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .logger import logger
+
+DEFAULT_INTERVAL_MS = 500
+_JS_TEMPLATE = 'window.dispatchEvent(new CustomEvent("{name}", {{detail: {payload}}}))'
+# 只推送界面关心的字段
+_PUSHED_FIELDS = ("status", "progress", "video_url", "video_path", "remote_task_id", "prompt", "image_path")
+
+
+class TaskEventBroadcaster:
+    """合并并按间隔批量推送任务事件；未绑定窗口时事件直接丢弃"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[int, dict] = {}
+        self._window = None
+        self._interval = DEFAULT_INTERVAL_MS / 1000
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, window, interval_ms: int = DEFAULT_INTERVAL_MS) -> None:
+        """绑定 pywebview 窗口并启动推送线程"""
+        self._window = window
+        self._interval = max(50, int(interval_ms)) / 1000
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="TaskEvents")
+            self._thread.start()
+        logger.info(f"[Events] 任务事件推送已启动, 间隔 {self._interval * 1000:.0f}ms")
+
+    def detach(self) -> None:
+        self._window = None
+
+    def publish(self, task_id: int, event: str = "updated", **fields) -> None:
+        if self._window is None:
+            return
+        pushed = {key: value for key, value in fields.items() if key in _PUSHED_FIELDS}
+        with self._lock:
+            if event == "cleared":
+                self._pending = {0: {"id": 0, "event": "cleared"}}
+                return
+            entry = self._pending.setdefault(task_id, {"id": task_id})
+            if entry.get("event") == "created" and event != "deleted":
+                # 创建后又更新：界面仍按新任务处理
+                event = "created"
+            entry.update(pushed)
+            entry["event"] = event
+
+    def publish_update(self, task_id: int, **fields) -> None:
+        """按更新的字段推断事件类型：有状态取状态，只有进度为 progress，否则为 updated"""
+        event = fields.get("status") or ("progress" if "progress" in fields else "updated")
+        self.publish(task_id, event, **fields)
+
+    def flush(self) -> int:
+        """立即推送积累的事件，返回推送条数"""
+        with self._lock:
+            batch = list(self._pending.values())
+            self._pending = {}
+        window = self._window
+        if not batch or window is None:
+            return 0
+        self._dispatch(window, "glin:task-events", batch)
+        return len(batch)
+
+    def push(self, name: str, detail: Any) -> bool:
+        """立即向前端派发一个不合并的事件（如作业完成通知）；未绑定窗口时返回 False"""
+        window = self._window
+        if window is None:
+            return False
+        return self._dispatch(window, name, detail)
+
+    @staticmethod
+    def _dispatch(window, name: str, detail: Any) -> bool:
+        payload = json.dumps(detail, ensure_ascii=False, default=str)
+        try:
+            window.evaluate_js(_JS_TEMPLATE.format(name=name, payload=payload))
+            return True
+        except Exception as exc:
+            logger.debug(f"[Events] 推送事件 {name} 失败: {exc}")
+            return False
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self._interval)
+            self.flush()
+
+
+task_events = TaskEventBroadcaster()
@@ -1,20 +1,34 @@
 """公用线程池"""
 
+import threading
 from concurrent.futures import ThreadPoolExecutor, Future
 from typing import Optional, Callable
 
 from .logger import logger
 
 _pool: Optional[ThreadPoolExecutor] = None
+_pool_size = 0
 
+# 有界提交：每个槽位对应一个真实空闲的工作线程，拿不到槽位的调用方在外部排队，
+# 避免把成百上千个任务一次性堆进执行器的无界队列
+_slots: Optional[threading.BoundedSemaphore] = None
+_stats_lock = threading.Lock()
+_active_count = 0
+_waiting_count = 0
 
-def init_pool(size: int = 10) -> None:
-    """初始化线程池"""
-    global _pool
+
+def init_pool(size: int = 10, initializer: Optional[Callable] = None) -> None:
+    """初始化线程池；initializer 在每个工作线程启动时执行一次（如打开线程独立的数据库连接）"""
+    global _pool, _pool_size, _slots, _active_count
     if _pool is not None:
         logger.warning("[ThreadPool] 线程池已存在, 先关闭旧的")
         _pool.shutdown(wait=False)
-    _pool = ThreadPoolExecutor(max_workers=size)
+    size = max(1, size)
+    _pool = ThreadPoolExecutor(max_workers=size, initializer=initializer)
+    _pool_size = size
+    _slots = threading.BoundedSemaphore(size)
+    with _stats_lock:
+        _active_count = 0
     logger.info(f"[ThreadPool] 线程池已初始化, max_workers={size}")
 
 
@@ -33,11 +47,151 @@ def submit_task(fn: Callable, *args, **kwargs) -> Optional[Future]:
     return future
 
 
+def acquire_slot(timeout: Optional[float] = None) -> bool:
+    """占用一个工作线程槽位，槽位已满时阻塞等待。超时或线程池未初始化返回 False"""
+    global _waiting_count
+    slots = _slots
+    if slots is None:
+        logger.error("[ThreadPool] 线程池未初始化, 无法占用槽位")
+        return False
+
+    with _stats_lock:
+        _waiting_count += 1
+    try:
+        acquired = slots.acquire(timeout=timeout)
+    finally:
+        with _stats_lock:
+            _waiting_count -= 1
+    return acquired
+
+
+def release_slot() -> None:
+    """归还未使用的槽位（占用槽位后决定不提交任务时调用）"""
+    if _slots is not None:
+        _slots.release()
+
+
+def submit_reserved(fn: Callable, *args, **kwargs) -> Optional[Future]:
+    """在已占用的槽位上提交任务，任务结束后自动归还槽位"""
+    global _active_count
+    slots = _slots
+    if _pool is None or slots is None:
+        logger.error("[ThreadPool] 线程池未初始化, 无法提交任务")
+        return None
+
+    def _run():
+        global _active_count
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with _stats_lock:
+                _active_count -= 1
+            slots.release()
+
+    with _stats_lock:
+        _active_count += 1
+    try:
+        future = _pool.submit(_run)
+    except Exception:
+        with _stats_lock:
+            _active_count -= 1
+        slots.release()
+        raise
+    logger.debug(f"[ThreadPool] 已提交有界任务: {fn.__name__}")
+    return future
+
+
+def submit_bounded(fn: Callable, *args, **kwargs) -> Optional[Future]:
+    """有界提交：等待空闲槽位后再提交任务"""
+    if not acquire_slot():
+        return None
+    return submit_reserved(fn, *args, **kwargs)
+
+
+def get_pool_stats() -> dict:
+    """线程池运行状态：最大并发、正在执行的有界任务数、等待槽位的调用方数"""
+    with _stats_lock:
+        return {
+            "max_workers": _pool_size,
+            "active": _active_count,
+            "waiting": _waiting_count,
+        }
+
+
+# ==================== 下载池 ====================
+# 成品下载独立于生成线程：远程任务一拿到视频地址就交给下载池，
+# 生成槽位随即释放，慢速 CDN 不会阻塞新任务提交
+
+_download_pool: Optional[ThreadPoolExecutor] = None
+_download_pool_size = 0
+_download_queued = 0
+_download_active = 0
+
+
+def init_download_pool(size: int = 3, initializer: Optional[Callable] = None) -> None:
+    """初始化下载池；initializer 同 init_pool"""
+    global _download_pool, _download_pool_size, _download_queued, _download_active
+    if _download_pool is not None:
+        logger.warning("[ThreadPool] 下载池已存在, 先关闭旧的")
+        _download_pool.shutdown(wait=False)
+    size = max(1, size)
+    _download_pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix="Download", initializer=initializer)
+    _download_pool_size = size
+    with _stats_lock:
+        _download_queued = 0
+        _download_active = 0
+    logger.info(f"[ThreadPool] 下载池已初始化, max_workers={size}")
+
+
+def submit_download(fn: Callable, *args, **kwargs) -> Optional[Future]:
+    """提交下载任务；超出并发上限的任务在下载池队列中排队"""
+    global _download_queued
+    if _download_pool is None:
+        logger.error("[ThreadPool] 下载池未初始化, 无法提交下载任务")
+        return None
+
+    def _run():
+        global _download_queued, _download_active
+        with _stats_lock:
+            _download_queued -= 1
+            _download_active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with _stats_lock:
+                _download_active -= 1
+
+    with _stats_lock:
+        _download_queued += 1
+    try:
+        future = _download_pool.submit(_run)
+    except Exception:
+        with _stats_lock:
+            _download_queued -= 1
+        raise
+    logger.debug(f"[ThreadPool] 已提交下载任务: {fn.__name__}")
+    return future
+
+
+def get_download_pool_stats() -> dict:
+    """下载池运行状态：最大并发、正在下载数、排队数"""
+    with _stats_lock:
+        return {
+            "max_workers": _download_pool_size,
+            "active": _download_active,
+            "queued": _download_queued,
+        }
+
+
 def shutdown_pool() -> None:
-    """关闭线程池"""
-    global _pool
+    """关闭线程池与下载池"""
+    global _pool, _download_pool
     if _pool:
         logger.info("[ThreadPool] 正在关闭线程池...")
         _pool.shutdown(wait=False)
         logger.info("[ThreadPool] 线程池已关闭")
         _pool = None
+    if _download_pool:
+        _download_pool.shutdown(wait=False)
+        logger.info("[ThreadPool] 下载池已关闭")
+        _download_pool = None
@@ -1,22 +1,75 @@
-"""视频任务扫描器 - 后台线程持续扫描待处理任务并交给统一视频生成器。"""
+"""视频任务扫描器 - 后台调度线程消费任务队列并交给统一视频生成器。
 
-import base64
-import mimetypes
+新任务由 API 层通过 enqueue_video_task 直接推入调度队列，毫秒级被取走；
+数据库扫描只作为低频对账，兜底处理遗漏的 pending 任务。
+"""
+
+import queue
 import threading
 import time
-from pathlib import Path
 
 from .api import get_media_download_dir
 from .constants import SettingKeys
 from .database import (
+    claim_video_task,
     get_all_settings,
     get_pending_video_tasks,
     get_processing_video_tasks,
+    get_settings_version,
     update_video_task,
 )
 from .logger import logger
 from .services.media_generation import VideoGenerationRequest, media_generation_registry
-from .thread_pool import get_pool
+from .services.provider_health import provider_health
+from .services.rate_limiter import rate_limiters
+from .services.ref_image import load_ref_images
+from .task_events import task_events
+from .thread_pool import (
+    acquire_slot,
+    get_download_pool_stats,
+    get_pool,
+    get_pool_stats,
+    release_slot,
+    submit_download,
+    submit_reserved,
+)
+
+# 对账扫描间隔（秒）：正常情况下任务都经由队列派发，扫描只用于兜底
+_RECONCILE_INTERVAL_SECONDS = 60
+_RETRY_DELAY_SECONDS = 5
+# 调度线程检查设置版本的最长间隔（秒）：set_setting 等不经过 save_settings 的写入也能及时生效
+_SETTINGS_CHECK_INTERVAL_SECONDS = 5
+
+_dispatch_queue: "queue.Queue[int]" = queue.Queue()
+_queued_ids: set = set()
+_queued_lock = threading.Lock()
+
+# 任务 ID -> 已重试次数（仅在本次运行期间有效）
+_retry_attempts: dict = {}
+# 任务 ID -> 开始处理的时间（monotonic），用于统计渠道耗时
+_task_started_at: dict = {}
+
+# 成品下载失败只重试下载：视频已生成并付费，不重新生成，也不计入渠道健康度
+_DOWNLOAD_MAX_RETRY = 3
+_DOWNLOAD_RETRY_DELAY_SECONDS = 30
+# 任务 ID -> 已重试下载次数（仅在本次运行期间有效）
+_download_attempts: dict = {}
+
+
+def enqueue_video_task(task_id: int) -> bool:
+    """将任务 ID 推入调度队列，重复推入会被忽略。返回是否新入队。"""
+    with _queued_lock:
+        if task_id in _queued_ids:
+            return False
+        _queued_ids.add(task_id)
+    _dispatch_queue.put(task_id)
+    logger.debug(f"[Scanner] 任务已入队 id={task_id}")
+    return True
+
+
+def get_dispatch_queue_size() -> int:
+    """调度队列中等待派发的任务数。"""
+    return _dispatch_queue.qsize()
 
 
 def _resolve_task_generator(settings: dict):
@@ -31,22 +84,6 @@ def _resolve_task_generator(settings: dict):
     )
 
 
-def _read_ref_images(image_path: str) -> list:
-    path = Path((image_path or "").strip())
-    if not path.is_file():
-        return []
-
-    mime_type = mimetypes.guess_type(path.name)[0] or "image/jpeg"
-    try:
-        return [{
-            "base64": base64.b64encode(path.read_bytes()).decode("ascii"),
-            "mime": mime_type,
-        }]
-    except Exception as exc:
-        logger.warning(f"[Scanner] 读取参考图失败 {path}: {exc}")
-        return []
-
-
 def _build_request(generator, task, settings: dict) -> VideoGenerationRequest:
     if generator.platform == "sora2":
         orientation = settings.get(SettingKeys.SORA2_ORIENTATION, "portrait") or "portrait"
@@ -57,107 +94,333 @@ def _build_request(generator, task, settings: dict) -> VideoGenerationRequest:
 
     return VideoGenerationRequest(
         prompt=task.prompt or "",
-        ref_images=_read_ref_images(task.image_path or ""),
+        ref_images=load_ref_images(task.image_path),
         orientation=orientation,
         duration=duration,
         download_dir=get_media_download_dir("video"),
     )
 
 
+def _get_max_retry(settings: dict) -> int:
+    auto_retry = settings.get(SettingKeys.AUTO_RETRY, "false") == "true"
+    return int(settings.get(SettingKeys.VIDEO_MAX_RETRY, "3")) if auto_retry else 0
+
+
+def _update_task(task_db_id: int, **fields) -> None:
+    """写库并通知界面；任务已被删除（没有行被更新）时不发布事件"""
+    if update_video_task(task_db_id, **fields):
+        task_events.publish_update(task_db_id, **fields)
+
+
+def _pop_elapsed(task_db_id: int) -> float:
+    started = _task_started_at.pop(task_db_id, None)
+    return time.monotonic() - started if started is not None else 0.0
+
+
+def _record_generation_success(task_db_id: int, generator) -> None:
+    """拿到成品地址即视为渠道生成成功；之后的下载成败与渠道无关"""
+    provider_health.record_success(generator.key, _pop_elapsed(task_db_id))
+
+
+def _complete_task(task_db_id: int, generator, video_url: str, file_path: str) -> None:
+    _update_task(
+        task_db_id,
+        status="completed",
+        video_url=video_url,
+        video_path=file_path,
+        progress=100,
+    )
+    _retry_attempts.pop(task_db_id, None)
+    _download_attempts.pop(task_db_id, None)
+    logger.info(
+        f"[Scanner] 任务完成 id={task_db_id} | "
+        f"generator={generator.key} | "
+        f"video_url={video_url[:80]}"
+    )
+
+
+def _fail_task(task_db_id: int, generator_key: str, error_message: str) -> None:
+    """记录一次失败；未超过重试次数时延迟重新入队，否则标记为 failed。"""
+    logger.error(f"[Scanner] 任务失败 id={task_db_id} | generator={generator_key} | {error_message}")
+    elapsed = _pop_elapsed(task_db_id)
+    if generator_key:
+        provider_health.record_failure(generator_key, error_message, elapsed)
+
+    max_retry = _get_max_retry(get_all_settings())
+    attempt = _retry_attempts.get(task_db_id, 0) + 1
+    if attempt <= max_retry:
+        _retry_attempts[task_db_id] = attempt
+        logger.info(f"[Scanner] 视频任务重试 id={task_db_id} | 第 {attempt}/{max_retry} 次重试")
+        # 清空上一轮的远程任务和成品地址，避免重启后 _resume_processing_tasks 续查已失败的任务或重下旧地址
+        _update_task(
+            task_db_id, status="pending", remote_task_id="", video_url="", generator_key="", progress=0
+        )
+        timer = threading.Timer(_RETRY_DELAY_SECONDS, enqueue_video_task, args=(task_db_id,))
+        timer.daemon = True
+        timer.start()
+        return
+
+    _retry_attempts.pop(task_db_id, None)
+    logger.error(f"[Scanner] 视频任务最终失败 id={task_db_id} (已重试 {max_retry} 次)")
+    _update_task(task_db_id, status="failed", remote_task_id="", generator_key="")
+
+
+def _download_and_complete(task_db_id: int, generator, video_url: str, settings: dict) -> None:
+    """在下载池中执行：下载成品并标记任务完成。"""
+    try:
+        file_path = generator.fetch(video_url, get_media_download_dir("video"), settings)
+    except Exception as exc:
+        _fail_download(task_db_id, generator, video_url, settings, f"{type(exc).__name__}: {exc}")
+        return
+    _complete_task(task_db_id, generator, video_url, file_path)
+
+
+def _fail_download(task_db_id: int, generator, video_url: str, settings: dict, error_message: str) -> None:
+    """成品下载失败：保留 video_url，延迟后只重新提交下载（按 URL 续传）；重试耗尽标记为 failed，仍保留地址供手动下载。"""
+    attempt = _download_attempts.get(task_db_id, 0) + 1
+    if attempt <= _DOWNLOAD_MAX_RETRY:
+        _download_attempts[task_db_id] = attempt
+        logger.warning(
+            f"[Scanner] 成品下载失败 id={task_db_id} | {error_message} | "
+            f"{_DOWNLOAD_RETRY_DELAY_SECONDS}s 后重试下载 ({attempt}/{_DOWNLOAD_MAX_RETRY})"
+        )
+        timer = threading.Timer(
+            _DOWNLOAD_RETRY_DELAY_SECONDS,
+            _run_on_download_pool,
+            args=(_download_and_complete, task_db_id, generator, video_url, settings),
+        )
+        timer.daemon = True
+        timer.start()
+        return
+
+    _download_attempts.pop(task_db_id, None)
+    _retry_attempts.pop(task_db_id, None)
+    logger.error(f"[Scanner] 成品下载最终失败 id={task_db_id} | {error_message} | video_url={video_url[:80]}")
+    _update_task(task_db_id, status="failed")
+
+
+def _run_on_download_pool(fn, *args) -> None:
+    """提交到独立下载池；下载池未初始化时（如测试环境）在当前线程执行"""
+    if submit_download(fn, *args) is None:
+        fn(*args)
+
+
+def _queue_download(task_db_id: int, generator, video_url: str, settings: dict) -> None:
+    """视频地址已知：先持久化地址（重启后可直接重新下载），再交给下载池，生成槽位不等待下载。"""
+    _update_task(task_db_id, video_url=video_url, generator_key=generator.key)
+    _run_on_download_pool(_download_and_complete, task_db_id, generator, video_url, settings)
+
+
+def _finish_remote_task(task_db_id: int, generator, settings: dict, future) -> None:
+    """远程任务结束后的收尾（在下载池中执行）：失败则记录，成功则下载成品。"""
+    try:
+        result = future.result()
+        if not result.success or not result.video_url:
+            _fail_task(task_db_id, generator.key, result.error_message or "视频生成失败")
+            return
+        _update_task(task_db_id, video_url=result.video_url)
+        _record_generation_success(task_db_id, generator)
+    except Exception as exc:
+        _fail_task(task_db_id, generator.key, f"{type(exc).__name__}: {exc}")
+        return
+    _download_and_complete(task_db_id, generator, result.video_url, settings)
+
+
+def _track_remote_task(task_db_id: int, generator, remote_task_id: str, settings: dict, resumed: bool = False) -> None:
+    """把远程任务交给统一轮询器跟踪，不占用线程池槽位；结束后由下载池执行收尾。
+
+    resumed 为重启后续查：只能观察到剩余耗时，不计入轮询历史。
+    """
+    _task_started_at.setdefault(task_db_id, time.monotonic())
+    future = generator.watch(
+        remote_task_id,
+        settings,
+        on_progress=lambda progress: _update_task(task_db_id, progress=progress),
+        record_history=not resumed,
+    )
+    future.add_done_callback(
+        lambda done: _run_on_download_pool(_finish_remote_task, task_db_id, generator, settings, done)
+    )
+    logger.info(f"[Scanner] 远程任务跟踪中 id={task_db_id} | generator={generator.key} | remote_id={remote_task_id}")
+
+
 def _process_task(task) -> None:
-    """处理单个视频任务（带重试）。"""
+    """处理单个视频任务：分步生成器只负责提交，轮询交给统一轮询器；其余生成器同步执行。"""
     task_db_id = task.id
     logger.info(f"[Scanner] 开始处理视频任务 id={task_db_id}")
+    _task_started_at[task_db_id] = time.monotonic()
+    generator_key = ""
 
     try:
         settings = get_all_settings()
-        auto_retry = settings.get(SettingKeys.AUTO_RETRY, "false") == "true"
-        max_retry = int(settings.get(SettingKeys.VIDEO_MAX_RETRY, "3")) if auto_retry else 0
-
         generator, platform, provider = _resolve_task_generator(settings)
         if not generator:
             logger.error(f"[Scanner] 未找到视频生成器: {platform}/{provider}")
-            update_video_task(task_db_id, status="failed")
+            _update_task(task_db_id, status="failed")
             return
+        generator_key = generator.key
 
         request = _build_request(generator, task, settings)
 
-        attempt = 0
-        while attempt <= max_retry:
-            if attempt > 0:
-                logger.info(f"[Scanner] 视频任务重试 id={task_db_id} | 第 {attempt}/{max_retry} 次重试")
-
+        if not generator.supports_resume:
+            # 生成器内部不下载，拿到地址后交给下载池
+            request.download_dir = None
             result = generator.generate(request, settings)
             if result.success and result.video_url:
-                update_video_task(
-                    task_db_id,
-                    status="completed",
-                    remote_task_id="",
-                    video_url=result.video_url,
-                    video_path=result.file_path or "",
-                )
-                logger.info(
-                    f"[Scanner] 任务完成 id={task_db_id} | "
-                    f"generator={platform}/{provider} | "
-                    f"video_url={result.video_url[:80]}"
-                )
-                return
-
-            error_message = result.error_message or "视频生成失败"
-            logger.error(f"[Scanner] 任务失败 id={task_db_id} | generator={platform}/{provider} | {error_message}")
-            attempt += 1
-            if attempt <= max_retry:
-                time.sleep(5)
-
-        logger.error(f"[Scanner] 视频任务最终失败 id={task_db_id} (已重试 {max_retry} 次)")
-        update_video_task(task_db_id, status="failed", remote_task_id="")
+                _record_generation_success(task_db_id, generator)
+                _queue_download(task_db_id, generator, result.video_url, settings)
+            else:
+                _fail_task(task_db_id, generator_key, result.error_message or "视频生成失败")
+            return
+
+        submission = generator.submit(request, settings)
+        if not submission.success:
+            _fail_task(task_db_id, generator_key, submission.error_message or "视频任务提交失败")
+            return
+
+        # 提交成功立即持久化远程任务 ID，崩溃或重启后据此续查，避免重复提交
+        _update_task(
+            task_db_id,
+            remote_task_id=submission.remote_task_id or "",
+            generator_key=generator_key,
+            **({"video_url": submission.video_url} if submission.video_url else {}),
+        )
+        if submission.video_url:
+            _record_generation_success(task_db_id, generator)
+            _run_on_download_pool(_download_and_complete, task_db_id, generator, submission.video_url, settings)
+            return
+
+        _track_remote_task(task_db_id, generator, submission.remote_task_id, settings)
 
     except Exception as exc:
-        logger.error(f"[Scanner] 处理任务异常 id={task_db_id}: {type(exc).__name__}: {exc}")
-        update_video_task(task_db_id, status="failed", remote_task_id="")
+        _fail_task(task_db_id, generator_key, f"处理任务异常: {type(exc).__name__}: {exc}")
 
 
 def _resume_processing_tasks() -> None:
-    """启动时将处理中任务重置为 pending，交由统一生成器重新处理。"""
+    """启动时恢复处理中任务：已持久化远程任务 ID 的继续轮询，其余重置为 pending 重新派发。"""
     try:
         tasks = get_processing_video_tasks()
         if not tasks:
             logger.info("[Scanner] 无需恢复的处理中任务")
             return
 
+        settings = get_all_settings()
+        resumed = 0
         for task in tasks:
-            update_video_task(task.id, status="pending", remote_task_id="")
+            generator = None
+            if task.generator_key:
+                platform, _, provider = task.generator_key.partition("/")
+                generator = media_generation_registry.get_video_generator(platform, provider)
+
+            if generator and task.video_url:
+                # 已拿到视频地址但未下载完成：直接重新下载
+                _queue_download(task.id, generator, task.video_url, settings)
+                resumed += 1
+                continue
+
+            if generator and generator.supports_resume and task.remote_task_id:
+                try:
+                    _track_remote_task(task.id, generator, task.remote_task_id, settings, resumed=True)
+                    resumed += 1
+                    continue
+                except Exception as exc:
+                    logger.error(f"[Scanner] 续查远程任务失败 id={task.id}: {type(exc).__name__}: {exc}")
+
+            _update_task(task.id, status="pending", remote_task_id="", generator_key="")
+            enqueue_video_task(task.id)
 
-        logger.info(f"[Scanner] 已将 {len(tasks)} 个处理中任务重置为 pending")
+        logger.info(
+            f"[Scanner] 已恢复 {len(tasks)} 个处理中任务: "
+            f"续查远程任务 {resumed} 个, 重置为 pending {len(tasks) - resumed} 个"
+        )
     except Exception as exc:
         logger.error(f"[Scanner] 恢复处理中任务异常: {type(exc).__name__}: {exc}")
 
 
+def _reconcile_pending_tasks() -> int:
+    """对账扫描：把数据库中未入队的 pending 任务补入调度队列。"""
+    count = 0
+    for task in get_pending_video_tasks():
+        if enqueue_video_task(task.id):
+            count += 1
+    if count:
+        logger.info(f"[Scanner] 对账扫描补入 {count} 个待处理任务")
+    return count
+
+
+def _dispatch_task(task_id: int) -> None:
+    """等待空闲工作槽位后领取任务（pending → processing）并提交到线程池。
+
+    只有真正拿到槽位的任务才会被标记为 processing，其余任务保持 pending 在队列中排队。
+    """
+    if get_pool() is None:
+        logger.warning(f"[Scanner] 线程池未初始化, 任务 id={task_id} 留待下次对账")
+        return
+
+    if not acquire_slot():
+        return
+
+    try:
+        task = claim_video_task(task_id)
+    except Exception:
+        release_slot()
+        raise
+    if task is None:
+        release_slot()
+        return
+    task_events.publish(task_id, "processing", status="processing")
+
+    submit_reserved(_process_task, task)
+    logger.info(f"[Scanner] 已提交任务 id={task_id} 到线程池, 队列剩余 {get_dispatch_queue_size()}")
+
+
+def get_dispatch_status() -> dict:
+    """调度状态：队列中等待的任务数以及线程池槽位占用情况。"""
+    stats = get_pool_stats()
+    stats["queued"] = get_dispatch_queue_size()
+    stats["downloads"] = get_download_pool_stats()
+    return stats
+
+
+def _sync_settings() -> None:
+    """设置版本变化时把新设置应用到长期运行的组件（目前是按主机限流），版本未变时为空操作"""
+    rate_limiters.configure_from_settings(get_all_settings(), get_settings_version())
+
+
+def _dispatch_loop() -> None:
+    logger.info(f"[Scanner] 视频任务调度器已启动, 对账间隔: {_RECONCILE_INTERVAL_SECONDS}秒")
+    last_reconcile = time.monotonic()
+    while True:
+        try:
+            _sync_settings()
+            timeout = max(0.0, _RECONCILE_INTERVAL_SECONDS - (time.monotonic() - last_reconcile))
+            timeout = min(timeout, _SETTINGS_CHECK_INTERVAL_SECONDS)
+            try:
+                task_id = _dispatch_queue.get(timeout=timeout)
+            except queue.Empty:
+                task_id = None
+
+            if task_id is not None:
+                with _queued_lock:
+                    _queued_ids.discard(task_id)
+                _dispatch_task(task_id)
+
+            if time.monotonic() - last_reconcile >= _RECONCILE_INTERVAL_SECONDS:
+                last_reconcile = time.monotonic()
+                _reconcile_pending_tasks()
+        except Exception as exc:
+            logger.error(f"[Scanner] 调度异常: {type(exc).__name__}: {exc}")
+            time.sleep(1)
+
+
 def start_scanner() -> None:
-    """启动后台扫描线程。"""
+    """启动后台调度线程。"""
     _resume_processing_tasks()
+    try:
+        _reconcile_pending_tasks()
+    except Exception as exc:
+        logger.error(f"[Scanner] 启动对账异常: {type(exc).__name__}: {exc}")
 
-    def _scan_loop():
-        logger.info("[Scanner] 视频任务扫描器已启动, 扫描间隔: 5秒")
-        scan_count = 0
-        while True:
-            try:
-                scan_count += 1
-                tasks = get_pending_video_tasks()
-                pool = get_pool()
-                if tasks and pool:
-                    logger.info(f"[Scanner] 第{scan_count}轮扫描, 发现 {len(tasks)} 个待处理任务")
-                    for task in tasks:
-                        update_video_task(task.id, status="processing")
-                        pool.submit(_process_task, task)
-                        logger.info(f"[Scanner] 已提交任务 id={task.id} 到线程池")
-                elif scan_count % 60 == 0:
-                    logger.debug(f"[Scanner] 第{scan_count}轮扫描, 无待处理任务")
-            except Exception as exc:
-                logger.error(f"[Scanner] 扫描异常: {type(exc).__name__}: {exc}")
-
-            time.sleep(5)
-
-    t = threading.Thread(target=_scan_loop, daemon=True, name="VideoScanner")
+    t = threading.Thread(target=_dispatch_loop, daemon=True, name="VideoScanner")
     t.start()
-    logger.info("[Scanner] 扫描线程已启动")
+    logger.info("[Scanner] 调度线程已启动")
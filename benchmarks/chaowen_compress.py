@@ -0,0 +1,137 @@
+"""超稳 AI 首帧图预处理耗时基准
+
+对比三种情况：
+- 原实现：全分辨率逐个编码全部候选（无损 PNG / WebP method=6、多档 JPEG / WebP）后取最小，按 baseline 代码原样复刻；
+- 现在提交任务实际走的路径：prepare_ref_image(..., CHAOWEN_IMAGE_SPEC) 缩到 1920px 后做有界质量搜索，再生成 data URL；
+- 同一张图再次提交（按内容 SHA-256 命中缓存）。
+
+--corpus 指定图片目录；未指定时生成一组典型商品图（默认 4K 宽，渐变背景 + 色块，JPEG 与带透明通道的 PNG 各半）。
+
+用法：python benchmarks/chaowen_compress.py [--corpus DIR] [--count 6] [--width 3840]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageDraw, ImageFilter  # noqa: E402
+
+from app.services import image_prep  # noqa: E402
+from app.services.ref_image import ReferenceImage  # noqa: E402
+from app.services.veo.chaowen import CHAOWEN_IMAGE_SPEC  # noqa: E402
+
+_IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def _product_image(index: int, path: Path, width: int) -> None:
+    """16:9 商品图：渐变背景、几个色块和轻微噪点；奇数张为透明背景的 PNG 抠图"""
+    height = width * 9 // 16
+    scale = width / 3840
+    transparent = index % 2 == 1
+    img = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    img = Image.blend(img, Image.new("RGB", (width, height), (200, 120 + index * 10, 90)), 0.6)
+    if transparent:
+        img = img.convert("RGBA")
+        img.putalpha(0)
+    draw = ImageDraw.Draw(img)
+    for n in range(4):
+        left, top = (600 + n * 700) * scale, (400 + (n % 2) * 300) * scale
+        draw.ellipse((left, top, left + 900 * scale, top + 1200 * scale), fill=(40 * n, 90, 200 - 30 * n, 255))
+    noise = Image.frombytes("L", (width, height), os.urandom(width * height)).filter(ImageFilter.GaussianBlur(1))
+    img = Image.composite(img, noise.convert(img.mode), Image.new("L", (width, height), 235))
+    if transparent:
+        img.save(path, format="PNG")
+    else:
+        img.save(path, format="JPEG", quality=98)
+
+
+def _legacy_compress(path: Path) -> int:
+    """原实现的候选编码：全分辨率编码全部候选，返回最小候选的字节数"""
+    sizes = []
+    with Image.open(path) as img:
+        def save(image, fmt, **kwargs):
+            output = BytesIO()
+            if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(output, format=fmt, **kwargs)
+            sizes.append(len(output.getvalue()))
+
+        if img.format == "PNG":
+            save(img, "PNG", optimize=True, compress_level=9)
+            save(img, "WEBP", lossless=True, method=6)
+        else:
+            save(img, "JPEG", optimize=True, progressive=True, quality=95, subsampling=0)
+        if "A" in img.getbands():
+            for quality in (95, 90, 85, 80):
+                save(img.convert("RGBA"), "WEBP", quality=quality, method=6)
+        else:
+            for quality in (95, 90, 85, 80):
+                save(img, "JPEG", optimize=True, progressive=True, quality=quality)
+            for quality in (95, 90, 85):
+                save(img, "WEBP", quality=quality, method=6)
+    return min(sizes)
+
+
+def _run_legacy(paths: list) -> tuple:
+    elapsed, sizes = [], []
+    for path in paths:
+        started = time.perf_counter()
+        sizes.append(_legacy_compress(path))
+        elapsed.append(time.perf_counter() - started)
+    return sum(elapsed) / len(elapsed), sum(sizes) / len(sizes)
+
+
+def _run(paths: list, spec, clear_cache: bool = True) -> tuple:
+    elapsed, sizes = [], []
+    if clear_cache:
+        image_prep._cache.clear()
+    for path in paths:
+        started = time.perf_counter()
+        prepared = image_prep.prepare_ref_image(ReferenceImage.from_path(path), spec)
+        data_url = prepared.data_url
+        elapsed.append(time.perf_counter() - started)
+        sizes.append(prepared.size)
+        assert data_url
+    return sum(elapsed) / len(elapsed), sum(sizes) / len(sizes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default="")
+    parser.add_argument("--count", type=int, default=6)
+    parser.add_argument("--width", type=int, default=3840)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            paths = sorted(p for p in Path(args.corpus).iterdir() if p.suffix.lower() in _IMAGE_SUFFIXES)
+        else:
+            paths = []
+            for index in range(args.count):
+                path = Path(tmp) / f"product_{index}{'.png' if index % 2 else '.jpg'}"
+                _product_image(index, path, args.width)
+                paths.append(path)
+        total_mb = sum(p.stat().st_size for p in paths) / 1024 / 1024
+        print(
+            f"{len(paths)} 张图片，共 {total_mb:.1f} MB，规格 {CHAOWEN_IMAGE_SPEC.max_side}px / "
+            f"{CHAOWEN_IMAGE_SPEC.max_bytes // 1024} KB"
+        )
+
+        modes = [
+            ("原实现", lambda: _run_legacy(paths)),
+            ("首次处理", lambda: _run(paths, CHAOWEN_IMAGE_SPEC)),
+            ("命中缓存", lambda: _run(paths, CHAOWEN_IMAGE_SPEC, clear_cache=False)),
+        ]
+        for name, run in modes:
+            seconds, size = run()
+            print(f"{name:<10} 平均 {seconds:>6.2f}s/张 | 平均输出 {size / 1024:>7.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
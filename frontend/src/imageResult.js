@@ -0,0 +1,16 @@
+// 图片生成结果：后端落盘后只返回 file_path / file_url，界面直接加载 file:// 地址预览，
+// 下载、建视频任务、作为参考图时传路径；只有不落盘时才会收到内联 base64（image_data）。
+export function imageResult(res) {
+  if (!res?.ok || !res.mime_type || !(res.file_url || res.image_data)) return null
+  return {
+    src: res.file_url || `data:${res.mime_type};base64,${res.image_data}`,
+    base64: res.image_data || '',
+    path: res.file_path || '',
+    mime: res.mime_type,
+  }
+}
+
+// 作为参考图传回后端：有路径时后端直接读文件，base64 为空也无妨
+export function imageRef(path, base64, mime) {
+  return path ? { path, base64, mime } : { base64, mime }
+}
@@ -0,0 +1,29 @@
+// 长耗时的生成接口以后台作业方式调用：桥调用立即返回 job_id，不占住 pywebview 的调用通道，
+// 后端完成时派发 glin:job-done 事件唤醒等待方；事件丢失时每 3 秒查询一次兜底。
+const waiters = new Map()
+
+window.addEventListener('glin:job-done', (e) => {
+  const wake = waiters.get(e.detail?.job_id)
+  if (wake) wake()
+})
+
+const waitForSignal = (jobId, ms) => new Promise((resolve) => {
+  const timer = setTimeout(resolve, ms)
+  waiters.set(jobId, () => { clearTimeout(timer); resolve() })
+})
+
+export async function runJob(method, ...args) {
+  const started = await window.pywebview.api.start_job(method, args)
+  if (!started.ok) return started
+  const jobId = started.job_id
+  try {
+    while (true) {
+      const res = await window.pywebview.api.get_job(jobId)
+      if (!res.ok) return res
+      if (res.status === 'done') return res.result
+      await waitForSignal(jobId, 3000)
+    }
+  } finally {
+    waiters.delete(jobId)
+  }
+}
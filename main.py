@@ -5,10 +5,15 @@ import sys
 import webview
 
 from app import Api, logger
-from app.config import STATIC_DIR, DB_PATH, LOGS_DIR
-from app.database import init_db, get_setting
+from app.config import DATA_DIR, STATIC_DIR, DB_PATH, LOGS_DIR
+from app.database import connect_thread, init_db, get_all_settings, get_setting, get_settings_version
 from app.activation import get_device_id
-from app.thread_pool import init_pool
+from app.services.http_client import configure_http_pool
+from app.services.polling import CompletionHistory, remote_task_poller
+from app.services.rate_limiter import rate_limiters
+from app.services.downloader import VIDEO_SEGMENTS
+from app.task_events import DEFAULT_INTERVAL_MS, task_events
+from app.thread_pool import init_download_pool, init_pool
 from app.video_scanner import start_scanner
 
 
@@ -34,7 +39,16 @@ def main() -> None:
     # 初始化线程池
     pool_size = int(get_setting("thread_pool_size") or "10")
     logger.info(f"线程池大小配置: {pool_size}")
-    init_pool(pool_size)
+    init_pool(pool_size, initializer=connect_thread)
+    download_pool_size = int(get_setting("download_pool_size") or "3")
+    logger.info(f"下载池大小配置: {download_pool_size}")
+    init_download_pool(download_pool_size, initializer=connect_thread)
+    # 每个下载最多 VIDEO_SEGMENTS 个分段连接
+    configure_http_pool(pool_size + download_pool_size * VIDEO_SEGMENTS)
+    # 供应商历史完成耗时持久化到数据目录，用于自适应轮询间隔
+    remote_task_poller.use_history(CompletionHistory(DATA_DIR / "poll_history.json"))
+    # 按主机限流（所有入口共享）
+    rate_limiters.configure_from_settings(get_all_settings(), get_settings_version())
 
     # 启动视频任务扫描器
     logger.info("启动视频任务扫描器...")
@@ -59,6 +73,9 @@ def main() -> None:
         min_size=(900, 600),
     )
     window.events.closed += _on_closed
+    # 页面加载完成后开始向前端推送任务状态变化
+    event_interval_ms = int(get_setting("task_event_interval_ms") or DEFAULT_INTERVAL_MS)
+    window.events.loaded += lambda: task_events.attach(window, event_interval_ms)
     logger.info("窗口已创建, 启动 webview...")
     webview.start()
     logger.info("万米霖-带货神器 已退出")
@@ -0,0 +1,206 @@
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from app.api import Api
+from app.services.media_generation import ImageGenerationResult
+
+
+class CreateVideoTasksBatchTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.data_dir = root / "data"
+        self.data_dir.mkdir()
+        self.folder = root / "products"
+        self.folder.mkdir()
+        for name in ("b.png", "a.jpg", "notes.txt"):
+            (self.folder / name).write_bytes(b"img")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    @patch("app.video_scanner.enqueue_video_task")
+    @patch("app.database.create_video_tasks", return_value=[11, 12])
+    def test_folder_import_links_images_and_inserts_once(self, mock_create, mock_enqueue):
+        with patch("app.config.DATA_DIR", self.data_dir):
+            result = Api().create_video_tasks_batch(folder=str(self.folder), prompt_template="{index}: {name}")
+
+        self.assertEqual(result, {"ok": True, "task_ids": [11, 12], "skipped": []})
+        rows = mock_create.call_args.args[0]
+        self.assertEqual([row["prompt"] for row in rows], ["1: a", "2: b"])
+        self.assertTrue(all(Path(row["image_path"]).parent == self.data_dir / "images" for row in rows))
+        self.assertTrue(all(Path(row["image_path"]).read_bytes() == b"img" for row in rows))
+        self.assertEqual([call.args[0] for call in mock_enqueue.call_args_list], [11, 12])
+
+    @patch("app.api.get_setting", return_value=None)
+    @patch("app.video_scanner.enqueue_video_task")
+    @patch("app.database.create_video_tasks", side_effect=RuntimeError("db locked"))
+    def test_failed_insert_removes_imported_images(self, mock_create, mock_enqueue, mock_setting):
+        with patch("app.config.DATA_DIR", self.data_dir):
+            result = Api().create_video_tasks_batch(paths=[str(self.folder / "a.jpg")])
+
+        self.assertFalse(result["ok"])
+        self.assertEqual(list((self.data_dir / "images").iterdir()), [])
+        mock_enqueue.assert_not_called()
+
+
+class VideoTaskLookupTests(unittest.TestCase):
+    @patch("app.api.update_video_task")
+    @patch("app.api.get_video_task", return_value=None)
+    def test_retry_and_download_report_missing_task(self, mock_get, mock_update):
+        api = Api()
+        with patch("app.api.get_media_download_dir"):
+            self.assertEqual(api.download_video_task(9), {"ok": False, "msg": "任务不存在"})
+        self.assertEqual(api.retry_video_task(9), {"ok": False, "msg": "任务不存在"})
+        mock_get.assert_called_with(9)
+        mock_update.assert_not_called()
+
+    @patch("app.api.update_video_task")
+    @patch("app.api.get_video_task")
+    def test_retry_refuses_processing_task(self, mock_get, mock_update):
+        mock_get.return_value = MagicMock(id=9, status="processing")
+
+        self.assertFalse(Api().retry_video_task(9)["ok"])
+        mock_update.assert_not_called()
+
+
+class VideoTaskChangesTests(unittest.TestCase):
+    @patch("app.database.count_video_tasks", return_value=1)
+    @patch("app.database.get_video_tasks_changed_since", return_value=[])
+    def test_changes_report_deleted_ids_and_reload_after_clear(self, mock_changed, mock_count):
+        version = f"{datetime.now().isoformat()}|0"
+
+        with patch("app.database.get_video_tasks_deleted_since", return_value=[7]):
+            res = Api().get_video_task_changes(version)
+        self.assertEqual((res["deleted"], res["reload"]), ([7], False))
+
+        with patch("app.database.get_video_tasks_deleted_since", return_value=[7, 0]):
+            res = Api().get_video_task_changes(version)
+        self.assertEqual((res["deleted"], res["reload"]), ([7], True))
+
+    @patch("app.database.count_video_tasks", return_value=0)
+    @patch("app.database.get_video_tasks_deleted_since", return_value=[])
+    @patch("app.database.get_video_tasks_changed_since", return_value=[])
+    def test_version_older_than_tombstones_forces_reload(self, *_):
+        res = Api().get_video_task_changes(f"{(datetime.now() - timedelta(days=2)).isoformat()}|0")
+
+        self.assertTrue(res["reload"])
+
+
+class BulkDownloadTests(unittest.TestCase):
+    @patch("app.api.submit_download", return_value=None)
+    @patch("app.api.get_download_pool_stats", return_value={"max_workers": 2, "active": 0, "queued": 0})
+    @patch("app.api.iter_video_tasks")
+    def test_bulk_download_skips_existing_files_and_counts_results(self, mock_iter, mock_stats, mock_submit):
+        with tempfile.NamedTemporaryFile() as existing:
+            mock_iter.return_value = iter([
+                MagicMock(id=1, video_url="https://cdn/1.mp4", video_path=""),
+                MagicMock(id=2, video_url="https://cdn/2.mp4", video_path=existing.name),
+                MagicMock(id=3, video_url="", video_path=""),
+                MagicMock(id=4, video_url="https://cdn/4.mp4", video_path="/missing.mp4"),
+            ])
+            api = Api()
+            with patch.object(api, "_download_task_video", side_effect=["/d/1.mp4", RuntimeError("403")]) as mock_dl, \
+                    patch("app.api.logger"):
+                api._run_bulk_download(Path("/d"), {}, only_missing=True)
+
+        mock_iter.assert_called_once_with(status="completed")
+        self.assertEqual([call.args[0].id for call in mock_dl.call_args_list], [1, 4])
+        self.assertEqual(
+            api.get_bulk_download_status(), {"ok": True, "running": False, "total": 2, "done": 1, "failed": 1}
+        )
+
+    @patch("app.api.get_download_pool_stats", return_value={"max_workers": 2, "active": 0, "queued": 0})
+    @patch("app.api.iter_video_tasks")
+    def test_failing_iterator_keeps_running_until_submitted_jobs_finish(self, mock_iter, mock_stats):
+        iterator_failed = threading.Event()
+        release = threading.Event()
+
+        def tasks():
+            yield MagicMock(id=1, video_url="https://cdn/1.mp4", video_path="")
+            iterator_failed.set()
+            raise RuntimeError("database is locked")
+
+        mock_iter.return_value = tasks()
+        api = Api()
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        with patch("app.api.submit_download", side_effect=pool.submit), \
+                patch.object(api, "_download_task_video", side_effect=lambda *_: release.wait(5)), \
+                patch("app.api.get_media_download_dir"), \
+                patch("app.api.get_all_settings", return_value={}), \
+                patch("app.api.logger"):
+            self.assertTrue(api.download_completed_video_tasks()["ok"])
+            self.assertTrue(iterator_failed.wait(5))
+
+            self.assertTrue(api.get_bulk_download_status()["running"])
+            self.assertFalse(api.download_completed_video_tasks()["ok"])
+
+            release.set()
+            deadline = time.monotonic() + 5
+            while api.get_bulk_download_status()["running"] and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+        self.assertEqual(
+            api.get_bulk_download_status(), {"ok": True, "running": False, "total": 1, "done": 1, "failed": 0}
+        )
+
+
+
+@patch("app.api.get_result_cache", return_value=None)
+@patch("app.api.get_download_root_dir")
+@patch("app.api.media_generation_registry.resolve_image_generator", return_value=(MagicMock(), "nanobanana", "yunwu"))
+@patch("app.api.get_all_settings", return_value={})
+class ImageResultResponseTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.download_dir = Path(self._tmp.name)
+        self.image_path = self.download_dir / "nanobanana_yw_1.png"
+        self.image_path.write_bytes(b"img")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_saved_image_is_returned_as_file_url_without_base64(self, *_):
+        result = ImageGenerationResult(success=True, image_bytes=b"img", mime_type="image/png", file_path=str(self.image_path))
+        with patch("app.api.generate_tracked", return_value=result), \
+                patch.object(Api, "_resolve_download_dir", return_value=self.download_dir):
+            response = Api()._generate_image_via_registry("p")
+
+        self.assertTrue(response["ok"])
+        self.assertNotIn("image_data", response)
+        self.assertEqual(response["file_path"], str(self.image_path))
+        self.assertEqual(response["file_url"], self.image_path.resolve().as_uri())
+
+    def test_unsaved_image_is_inlined_as_base64(self, *_):
+        result = ImageGenerationResult(success=True, image_bytes=b"img", mime_type="image/png")
+        with patch("app.api.generate_tracked", return_value=result):
+            response = Api()._generate_image_via_registry("p", download=False)
+
+        self.assertEqual(response["image_data"], "aW1n")
+        self.assertNotIn("file_url", response)
+
+    def test_download_image_reuses_saved_file(self, *_):
+        other_dir = self.download_dir / "debug"
+        other_dir.mkdir()
+        outside = other_dir / "x.webp"
+        outside.write_bytes(b"webp")
+        with patch("app.api.get_media_download_dir", return_value=self.download_dir):
+            same = Api().download_image("", "image/png", "nanobanana", str(self.image_path))
+            copied = Api().download_image("", "image/png", "nanobanana", str(outside))
+
+        self.assertEqual(same, {"ok": True, "path": str(self.image_path)})
+        self.assertTrue(copied["ok"])
+        self.assertEqual(Path(copied["path"]).parent, self.download_dir)
+        self.assertEqual(Path(copied["path"]).suffix, ".webp")
+        self.assertEqual(Path(copied["path"]).read_bytes(), b"webp")
+
+
+if __name__ == "__main__":
+    unittest.main()
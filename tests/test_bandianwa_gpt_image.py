@@ -3,11 +3,17 @@ from unittest.mock import MagicMock, patch
 
 from app.services.gpt_image import GptImageBandianwa
 from app.services.media_generation import media_generation_registry
+from app.services.polling import CompletionHistory, remote_task_poller
 
 
 class GptImageBandianwaTests(unittest.TestCase):
-    @patch("app.services.gpt_image.bandianwa.requests.get")
-    @patch("app.services.gpt_image.bandianwa.requests.post")
+    def setUp(self):
+        history = patch.object(remote_task_poller.schedule, "history", CompletionHistory())
+        history.start()
+        self.addCleanup(history.stop)
+
+    @patch("app.services.gpt_image.bandianwa.requests.Session.get")
+    @patch("app.services.gpt_image.bandianwa.requests.Session.post")
     def test_generate_uses_auto_image_contract(self, mock_post, mock_get):
         service = GptImageBandianwa("test-key")
 
@@ -49,8 +55,8 @@ class GptImageBandianwaTests(unittest.TestCase):
         self.assertEqual(GptImageBandianwa._resolve_size("4:3"), "1536x1152")
         self.assertEqual(GptImageBandianwa._resolve_size("3:4"), "1152x1536")
 
-    @patch("app.services.gpt_image.bandianwa.requests.get")
-    @patch("app.services.gpt_image.bandianwa.requests.post")
+    @patch("app.services.gpt_image.bandianwa.requests.Session.get")
+    @patch("app.services.gpt_image.bandianwa.requests.Session.post")
     def test_generate_uploads_base64_reference_as_url_array(self, mock_post, mock_get):
         service = GptImageBandianwa("test-key")
 
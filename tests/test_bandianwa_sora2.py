@@ -17,7 +17,7 @@ class Sora2BandianwaTests(unittest.TestCase):
         self.assertEqual(self.service._infer_seconds_from_model("sora-2-landscape-15s-guanzhuan"), 15)
         self.assertIsNone(self.service._infer_seconds_from_model("invalid-model"))
 
-    @patch("app.services.sora2.bandianwa.requests.post")
+    @patch("app.services.sora2.bandianwa.requests.Session.post")
     def test_create_task_image_uses_multipart_contract(self, mock_post):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -40,20 +40,27 @@ class Sora2BandianwaTests(unittest.TestCase):
                 image_path=tmp.name,
                 size="720p",
             )
+            _, kwargs = mock_post.call_args
+            body = kwargs["data"].to_bytes()
 
         self.assertEqual(result.task_id, "task_123")
         self.assertEqual(result.status, Sora2TaskStatus.PENDING)
 
-        _, kwargs = mock_post.call_args
         self.assertEqual(kwargs["headers"]["Authorization"], "Bearer test-key")
-        self.assertEqual(kwargs["data"]["model"], "sora-2-portrait-10s-guanzhuan")
-        self.assertEqual(kwargs["data"]["prompt"], "make a video")
-        self.assertEqual(kwargs["data"]["seconds"], "10")
-        self.assertEqual(kwargs["data"]["size"], "720p")
-        self.assertEqual(kwargs["data"]["n"], "1")
-        self.assertIn("input_reference", kwargs["files"])
-
-    @patch("app.services.sora2.bandianwa.requests.post")
+        self.assertEqual(kwargs["headers"]["Content-Type"], kwargs["data"].content_type)
+        self.assertNotIn("files", kwargs)
+        for name, value in (
+            ("model", "sora-2-portrait-10s-guanzhuan"),
+            ("prompt", "make a video"),
+            ("seconds", "10"),
+            ("size", "720p"),
+            ("n", "1"),
+        ):
+            self.assertIn(f'name="{name}"\r\n\r\n{value}\r\n'.encode(), body)
+        self.assertIn(b'name="input_reference"; filename="', body)
+        self.assertIn(b"\r\n\r\nfake-image\r\n", body)
+
+    @patch("app.services.sora2.bandianwa.requests.Session.post")
     def test_create_task_image_extracts_real_unauthorized_error_shape(self, mock_post):
         mock_response = MagicMock()
         mock_response.status_code = 401
@@ -86,7 +93,7 @@ class Sora2BandianwaTests(unittest.TestCase):
         self.assertEqual(result.status, Sora2TaskStatus.FAILED)
         self.assertIn("无效的令牌", result.error_message)
 
-    @patch("app.services.sora2.dayangyu.requests.get")
+    @patch("app.services.sora2.dayangyu.requests.Session.get")
     def test_query_task_extracts_real_unauthorized_error_shape(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 401
@@ -111,7 +118,7 @@ class Sora2BandianwaTests(unittest.TestCase):
         self.assertEqual(result.status, Sora2TaskStatus.FAILED)
         self.assertIn("无效的令牌", result.error_message)
 
-    @patch("app.services.sora2.dayangyu.requests.get")
+    @patch("app.services.sora2.dayangyu.requests.Session.get")
     def test_query_task_keeps_polling_on_connection_reset(self, mock_get):
         mock_get.side_effect = requests.exceptions.ConnectionError(
             "('Connection aborted.', ConnectionResetError(10054, '远程主机强迫关闭了一个现有的连接。', None, 10054, None))"
@@ -123,7 +130,7 @@ class Sora2BandianwaTests(unittest.TestCase):
         self.assertEqual(result.status, Sora2TaskStatus.PROCESSING)
         self.assertIn("Connection aborted", result.error_message)
 
-    @patch("app.services.sora2.dayangyu.requests.get")
+    @patch("app.services.sora2.dayangyu.requests.Session.get")
     def test_get_video_content_extracts_real_unauthorized_error_shape(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 401
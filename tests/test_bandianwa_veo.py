@@ -9,7 +9,7 @@ class VeoBandianwaTests(unittest.TestCase):
     def setUp(self):
         self.service = VeoBandianwa("test-key")
 
-    @patch("app.services.veo.bandianwa.requests.post")
+    @patch("app.services.veo.bandianwa.requests.Session.post")
     def test_submit_task_serializes_seconds_as_string(self, mock_post):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -0,0 +1,67 @@
+import base64
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+from app.constants import SettingKeys
+from app.services import image_prep
+from app.services.media_generation import ChaowenVeoGenerator, VideoGenerationRequest
+from app.services.ref_image import ReferenceImage
+from app.services.veo import chaowen
+
+
+class ChaowenSubmitTests(unittest.TestCase):
+    def setUp(self):
+        image_prep._cache.clear()
+        img = Image.frombytes("RGB", (1200, 1200), os.urandom(1200 * 1200 * 3))
+        handle = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
+        handle.close()
+        img.save(handle.name, format="PNG")
+        self.path = handle.name
+        self.addCleanup(os.remove, self.path)
+
+    def _submit(self):
+        response = MagicMock(status_code=200, text="{}")
+        response.json.return_value = {"id": "task-1"}
+        request = VideoGenerationRequest(prompt="a cat", ref_images=[ReferenceImage.from_path(self.path)])
+        settings = {SettingKeys.CHAOWEN_VEO_API_KEY: "key"}
+        with patch.object(chaowen.http_client, "post", return_value=response) as post, \
+                patch("app.services.ref_image.tempfile.mkstemp") as mkstemp:
+            submission = ChaowenVeoGenerator().submit(request, settings)
+        self.assertEqual(submission.remote_task_id, "task-1")
+        mkstemp.assert_not_called()
+        return post.call_args.kwargs["json"]["firstFrameBase64"]
+
+    def test_oversized_frame_is_prepared_in_memory_under_channel_limit(self):
+        self.assertGreater(os.path.getsize(self.path), chaowen.CHAOWEN_IMAGE_SPEC.max_bytes)
+
+        data_url = self._submit()
+
+        header, _, encoded = data_url.partition(",")
+        self.assertEqual(header, "data:image/jpeg;base64")
+        payload = base64.b64decode(encoded)
+        self.assertLessEqual(len(payload), chaowen.CHAOWEN_IMAGE_SPEC.max_bytes)
+        with Image.open(BytesIO(payload)) as result:
+            self.assertEqual(result.size, (1200, 1200))
+
+    def test_frame_is_prepared_once_per_submit(self):
+        with patch.object(image_prep, "prepare_ref_image", wraps=image_prep.prepare_ref_image) as prepare:
+            self._submit()
+
+        prepare.assert_called_once()
+
+    def test_repeated_submit_reuses_prepared_frame(self):
+        with patch.object(image_prep, "_process", wraps=image_prep._process) as process:
+            first = self._submit()
+            second = self._submit()
+
+        process.assert_called_once()
+        self.assertEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
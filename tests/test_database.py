@@ -0,0 +1,199 @@
+import datetime
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from peewee import SqliteDatabase
+
+from app import database
+from app.database import DeletedVideoTask, Settings, VideoTask
+
+
+class _MemoryDatabaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.db = SqliteDatabase(":memory:")
+        self._bind = self.db.bind_ctx([Settings, VideoTask, DeletedVideoTask])
+        self._bind.__enter__()
+        self.db.create_tables([Settings, VideoTask, DeletedVideoTask])
+        self._patch = patch.object(database, "db", self.db)
+        self._patch.__enter__()
+
+    def tearDown(self):
+        self._patch.__exit__(None, None, None)
+        self._bind.__exit__(None, None, None)
+        self.db.close()
+
+
+class SettingsSnapshotTests(_MemoryDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        database.reload_settings()
+        Settings.create(key="theme", value="dark")
+
+    def tearDown(self):
+        database.reload_settings()
+        super().tearDown()
+
+    def test_reads_hit_the_table_once(self):
+        with patch.object(Settings, "select", wraps=Settings.select) as mock_select:
+            self.assertEqual(database.get_setting("theme"), "dark")
+            self.assertIsNone(database.get_setting("missing"))
+            self.assertEqual(database.get_all_settings(), {"theme": "dark"})
+
+        mock_select.assert_called_once_with()
+
+    def test_writes_replace_snapshot_and_bump_version(self):
+        before = database.get_all_settings()
+        version = database.get_settings_version()
+
+        database.set_settings({"theme": "light", "auto_retry": "true"})
+
+        self.assertEqual(before, {"theme": "dark"})
+        self.assertEqual(database.get_all_settings(), {"theme": "light", "auto_retry": "true"})
+        self.assertEqual(database.get_settings_version(), version + 1)
+        self.assertEqual(Settings.get_by_id("auto_retry").value, "true")
+
+    def test_returned_settings_are_private_copies(self):
+        database.get_all_settings()["theme"] = "mutated"
+
+        self.assertEqual(database.get_setting("theme"), "dark")
+
+
+class VideoTaskBatchTests(_MemoryDatabaseTestCase):
+    def test_create_video_tasks_inserts_rows_in_one_transaction(self):
+        with patch.object(self.db, "atomic", wraps=self.db.atomic) as mock_atomic:
+            task_ids = database.create_video_tasks([
+                {"image_path": "/tmp/a.png", "prompt": "a"},
+                {"image_path": "/tmp/b.png", "prompt": "b"},
+            ])
+
+        mock_atomic.assert_called_once_with()
+        self.assertEqual(len(task_ids), 2)
+        tasks = [VideoTask.get_by_id(task_id) for task_id in task_ids]
+        self.assertEqual([task.prompt for task in tasks], ["a", "b"])
+        self.assertTrue(all(task.status == "pending" for task in tasks))
+
+    def test_create_video_tasks_with_no_rows_returns_empty_list(self):
+        self.assertEqual(database.create_video_tasks([]), [])
+
+
+class VideoTaskListingTests(_MemoryDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        base = datetime.datetime(2024, 1, 1, 12, 0, 0)
+        # 两条任务创建时间相同，验证键集分页按 id 打破平局
+        created = [base, base + datetime.timedelta(minutes=1), base + datetime.timedelta(minutes=1)]
+        statuses = ["completed", "pending", "failed"]
+        self.ids = [
+            VideoTask.insert(prompt=str(i), status=status, created_at=at, updated_at=at).execute()
+            for i, (status, at) in enumerate(zip(statuses, created))
+        ]
+
+    def test_keyset_pagination_walks_all_rows_newest_first(self):
+        first = database.list_video_tasks(limit=2)
+        second = database.list_video_tasks(limit=2, before=(first[-1].created_at, first[-1].id))
+
+        self.assertEqual([t.id for t in first + second], [self.ids[2], self.ids[1], self.ids[0]])
+        self.assertEqual(database.count_video_tasks(), 3)
+
+    def test_get_video_task_by_primary_key(self):
+        self.assertEqual(database.get_video_task(self.ids[1]).prompt, "1")
+        self.assertIsNone(database.get_video_task(999))
+
+    def test_iter_video_tasks_pages_through_filtered_rows(self):
+        self.assertEqual([t.id for t in database.iter_video_tasks(page_size=1)], list(reversed(self.ids)))
+        self.assertEqual([t.id for t in database.iter_video_tasks(status="completed", page_size=1)], [self.ids[0]])
+
+    def test_status_filter(self):
+        self.assertEqual([t.id for t in database.list_video_tasks(status="pending")], [self.ids[1]])
+        self.assertEqual(database.count_video_tasks("failed"), 1)
+
+    def test_changes_since_returns_only_updated_rows(self):
+        since = datetime.datetime(2024, 1, 2)
+        database.update_video_task(self.ids[0], status="failed")
+
+        changed = database.get_video_tasks_changed_since((since, 0))
+
+        self.assertEqual([t.id for t in changed], [self.ids[0]])
+
+    def test_change_cursor_breaks_timestamp_ties_by_id(self):
+        task_ids = database.create_video_tasks([{"prompt": "a"}, {"prompt": "b"}])
+        first = VideoTask.get_by_id(task_ids[0])
+
+        changed = database.get_video_tasks_changed_since((first.updated_at, first.id))
+
+        self.assertEqual([t.id for t in changed], [task_ids[1]])
+
+    def test_writes_after_watermark_are_never_skipped(self):
+        cursor = database.get_change_cursor()
+        # 同一时钟刻度内的连续写入也拿到严格递增的时间戳
+        with patch("app.database.datetime") as mock_datetime:
+            mock_datetime.datetime.now.return_value = cursor[0]
+            mock_datetime.timedelta = datetime.timedelta
+            database.update_video_task(self.ids[0], progress=10)
+            database.update_video_task(self.ids[2], progress=20)
+            database.update_video_task(self.ids[1], progress=30)
+
+        changed = database.get_video_tasks_changed_since(cursor)
+
+        self.assertEqual([t.id for t in changed], [self.ids[0], self.ids[2], self.ids[1]])
+        self.assertEqual(database.get_video_tasks_changed_since((changed[-1].updated_at, changed[-1].id)), [])
+
+    def test_update_returns_matched_row_count(self):
+        self.assertEqual(database.update_video_task(self.ids[0], progress=50), 1)
+        self.assertEqual(database.update_video_task(999, progress=50), 0)
+
+    def test_deleted_tasks_are_reported_after_since(self):
+        since = datetime.datetime.now() - datetime.timedelta(seconds=1)
+        database.delete_video_task(self.ids[1])
+
+        self.assertEqual(database.get_video_tasks_changed_since((since, 0)), [])
+        self.assertEqual(database.get_video_tasks_deleted_since(since), [self.ids[1]])
+        self.assertEqual(database.get_video_tasks_deleted_since(datetime.datetime.now()), [])
+
+        database.delete_all_video_tasks()
+        self.assertEqual(database.get_video_tasks_deleted_since(since), [self.ids[1], 0])
+
+    def test_old_tombstones_are_pruned_on_delete(self):
+        DeletedVideoTask.create(task_id=42, deleted_at=datetime.datetime(2024, 1, 1))
+
+        database.delete_video_task(self.ids[0])
+
+        self.assertEqual([row.task_id for row in DeletedVideoTask.select()], [self.ids[0]])
+
+
+class MigrationTests(_MemoryDatabaseTestCase):
+    def test_migration_adds_updated_at_with_index_to_old_table(self):
+        self.db.drop_tables([VideoTask])
+        self.db.execute_sql(
+            "CREATE TABLE videotask (id INTEGER PRIMARY KEY, image_path VARCHAR(255), prompt VARCHAR(255), "
+            "status VARCHAR(255), video_url VARCHAR(255), video_path VARCHAR(255), created_at DATETIME)"
+        )
+        self.db.execute_sql("INSERT INTO videotask (status, created_at) VALUES ('completed', '2024-01-01 00:00:00')")
+
+        database._migrate_db()
+
+        task = VideoTask.get()
+        self.assertEqual(task.updated_at, task.created_at)
+        indexes = [row[1] for row in self.db.execute_sql("PRAGMA index_list(videotask)").fetchall()]
+        self.assertIn("videotask_updated_at", indexes)
+
+
+class DatabasePragmaTests(unittest.TestCase):
+    def test_pragmas_enable_wal_and_normal_sync_on_each_connection(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            test_db = SqliteDatabase(str(Path(tmp) / "t.db"), pragmas=database.DB_PRAGMAS)
+            test_db.connect()
+            try:
+                self.assertEqual(test_db.journal_mode, "wal")
+                self.assertEqual(test_db.synchronous, 1)
+                self.assertEqual(test_db.execute_sql("PRAGMA busy_timeout").fetchone()[0], 5000)
+            finally:
+                test_db.close()
+
+        self.assertEqual(database.db._pragmas, list(database.DB_PRAGMAS.items()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import re
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app.services.downloader import DownloadError, download_file
+from app.services.veo.utils import download_video
+
+_PAYLOAD = bytes(range(256)) * 40
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, body: bytes, headers: dict = None, fail_after: int = None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+        self._body = body
+        self._fail_after = fail_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=1):
+        limit = len(self._body) if self._fail_after is None else self._fail_after
+        yield self._body[:limit]
+        if self._fail_after is not None:
+            raise ConnectionError("connection reset")
+
+
+class _RangeServer:
+    """按 Range 头返回 206 的假服务端；interrupt_first 时第一次请求在中途断开"""
+
+    def __init__(self, payload: bytes, interrupt_first: bool = False):
+        self.payload = payload
+        self.interrupt_first = interrupt_first
+        self.ranges = []
+
+    def get(self, url, headers=None, **kwargs):
+        header = (headers or {}).get("Range")
+        self.ranges.append(header)
+        total = len(self.payload)
+        if not header:
+            fail_after = total // 3 if self.interrupt_first and len(self.ranges) == 1 else None
+            return _FakeResponse(200, self.payload, {"Content-Length": str(total)}, fail_after)
+        start, end = re.match(r"bytes=(\d+)-(\d*)", header).groups()
+        start = int(start)
+        end = int(end) if end else total - 1
+        body = self.payload[start:end + 1]
+        return _FakeResponse(
+            206,
+            body,
+            {"Content-Range": f"bytes {start}-{end}/{total}", "Content-Length": str(len(body))},
+        )
+
+
+class DownloaderTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dest = Path(self._tmp.name) / "video.mp4"
+        sleep_patch = patch("app.services.downloader.time.sleep")
+        sleep_patch.start()
+        self.addCleanup(sleep_patch.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _leftover_parts(self):
+        return [path.name for path in Path(self._tmp.name).iterdir() if ".part" in path.name]
+
+    def test_interrupted_download_resumes_with_range_request(self):
+        server = _RangeServer(_PAYLOAD, interrupt_first=True)
+
+        with patch("app.services.downloader.http_client.get", side_effect=server.get):
+            download_file("https://cdn/video.mp4", self.dest)
+
+        self.assertEqual(self.dest.read_bytes(), _PAYLOAD)
+        self.assertEqual(server.ranges, [None, f"bytes={len(_PAYLOAD) // 3}-"])
+        self.assertEqual(self._leftover_parts(), [])
+
+    def test_parallel_segments_are_joined_in_order(self):
+        server = _RangeServer(_PAYLOAD)
+
+        with patch("app.services.downloader._MIN_SEGMENT_SIZE", 1024), \
+                patch("app.services.downloader.http_client.get", side_effect=server.get):
+            download_file("https://cdn/video.mp4", self.dest, segments=4)
+
+        self.assertEqual(self.dest.read_bytes(), _PAYLOAD)
+        self.assertEqual(server.ranges[0], "bytes=0-0")
+        self.assertEqual(len(server.ranges), 5)
+
+    def test_size_mismatch_raises_and_discards_part_file(self):
+        truncated = _FakeResponse(200, _PAYLOAD[:100], {"Content-Length": str(len(_PAYLOAD))})
+
+        with patch("app.services.downloader.http_client.get", return_value=truncated):
+            with self.assertRaises(DownloadError):
+                download_file("https://cdn/video.mp4", self.dest)
+
+        self.assertFalse(self.dest.exists())
+        self.assertEqual(self._leftover_parts(), [])
+
+    def test_sha256_verification(self):
+        server = _RangeServer(_PAYLOAD)
+
+        with patch("app.services.downloader.http_client.get", side_effect=server.get):
+            download_file("https://cdn/a.mp4", self.dest, sha256=hashlib.sha256(_PAYLOAD).hexdigest())
+            with self.assertRaises(DownloadError):
+                download_file("https://cdn/b.mp4", self.dest.with_name("b.mp4"), sha256="0" * 64)
+
+
+    def test_caller_retry_resumes_into_new_timestamped_file(self):
+        server = _RangeServer(_PAYLOAD)
+        state = {"failing": True}
+
+        def flaky_get(url, headers=None, **kwargs):
+            header = (headers or {}).get("Range")
+            if not state["failing"] or header == "bytes=0-0":
+                return server.get(url, headers=headers, **kwargs)
+            server.ranges.append(header)
+            if header is None:
+                return _FakeResponse(200, _PAYLOAD, {"Content-Length": str(len(_PAYLOAD))}, fail_after=1000)
+            return _FakeResponse(503, b"")
+
+        with patch("app.services.downloader.http_client.get", side_effect=flaky_get):
+            with self.assertRaises(DownloadError):
+                download_video("https://cdn/video.mp4", self._tmp.name, prefix="a")
+            self.assertEqual(len(self._leftover_parts()), 1)
+
+            state["failing"] = False
+            server.ranges.clear()
+            second = download_video("https://cdn/video.mp4", self._tmp.name, prefix="b")
+
+        self.assertEqual(Path(second).read_bytes(), _PAYLOAD)
+        self.assertEqual(server.ranges, ["bytes=1000-"])
+        self.assertEqual(self._leftover_parts(), [])
+
+    def test_stale_part_files_are_swept(self):
+        stale = Path(self._tmp.name) / ".0123456789abcdef.part2"
+        stale.write_bytes(b"x")
+        old = stale.stat().st_mtime - 2 * 24 * 3600
+        os.utime(stale, (old, old))
+        server = _RangeServer(_PAYLOAD)
+
+        with patch("app.services.downloader.http_client.get", side_effect=server.get):
+            download_file("https://cdn/video.mp4", self.dest)
+
+        self.assertFalse(stale.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from app.services import http_client
+
+
+class HttpClientSessionRegistryTests(unittest.TestCase):
+    def tearDown(self):
+        http_client.configure_http_pool(10)
+
+    def test_same_host_reuses_session(self):
+        first = http_client.get_session("https://api.example.com/v1/videos")
+        second = http_client.get_session("https://API.example.com/v1/videos/task_1")
+
+        self.assertIs(first, second)
+
+    def test_different_hosts_get_separate_sessions(self):
+        first = http_client.get_session("https://api.example.com/v1/videos")
+        second = http_client.get_session("https://cdn.example.com/file.mp4")
+
+        self.assertIsNot(first, second)
+
+    def test_configure_pool_rebuilds_sessions_with_new_size(self):
+        old = http_client.get_session("https://api.example.com")
+
+        http_client.configure_http_pool(3)
+        new = http_client.get_session("https://api.example.com")
+
+        self.assertIsNot(old, new)
+        self.assertEqual(new.get_adapter("https://api.example.com")._pool_maxsize, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
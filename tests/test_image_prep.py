@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+from PIL import Image, ImageFilter
+
+from app.services import image_prep
+from app.services.image_prep import ImageSpec, prepare_ref_image
+from app.services.ref_image import ReferenceImage
+
+
+def _noise_image(size, mode="RGB") -> Image.Image:
+    return Image.frombytes(mode, size, os.urandom(size[0] * size[1] * len(mode)))
+
+
+def _encoded(img: Image.Image, fmt: str) -> bytes:
+    output = BytesIO()
+    img.save(output, format=fmt)
+    return output.getvalue()
+
+
+class PrepareRefImageTests(unittest.TestCase):
+    def setUp(self):
+        image_prep._cache.clear()
+
+    def test_image_within_limits_is_returned_without_decoding(self):
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as handle:
+            handle.write(_encoded(_noise_image((64, 48)), "PNG"))
+        self.addCleanup(os.remove, handle.name)
+        image = ReferenceImage.from_path(handle.name)
+
+        with patch.object(image_prep, "_process") as process:
+            self.assertIs(prepare_ref_image(image, ImageSpec(max_side=128, max_bytes=1024 * 1024)), image)
+
+        process.assert_not_called()
+        self.assertIsNone(image._data)
+
+    def test_large_image_is_downscaled_and_reencoded(self):
+        image = ReferenceImage(data=_encoded(_noise_image((800, 400)), "PNG"), mime="image/png")
+
+        prepared = prepare_ref_image(image, ImageSpec(max_side=200, max_bytes=1024 * 1024))
+
+        self.assertEqual(prepared.mime, "image/jpeg")
+        with Image.open(BytesIO(prepared.data)) as result:
+            self.assertEqual(result.size, (200, 100))
+
+    def test_encode_search_is_bounded_and_respects_byte_limit(self):
+        smooth = _noise_image((300, 300)).filter(ImageFilter.GaussianBlur(2))
+        image = ReferenceImage(data=_encoded(smooth, "PNG"), mime="image/png")
+
+        with patch.object(image_prep, "_encode", wraps=image_prep._encode) as encode:
+            prepared = prepare_ref_image(image, ImageSpec(max_side=300, max_bytes=12 * 1024))
+
+        self.assertGreater(encode.call_count, 1)
+        self.assertLessEqual(encode.call_count, image_prep._MAX_ENCODES)
+        self.assertLessEqual(prepared.size, 12 * 1024)
+
+    def test_transparent_image_keeps_alpha(self):
+        image = ReferenceImage(data=_encoded(_noise_image((400, 400), "RGBA"), "PNG"), mime="image/png")
+
+        prepared = prepare_ref_image(image, ImageSpec(max_side=100, max_bytes=1024 * 1024))
+
+        self.assertEqual(prepared.mime, "image/png")
+        with Image.open(BytesIO(prepared.data)) as result:
+            self.assertEqual(result.mode, "RGBA")
+
+    def test_result_is_cached_by_content(self):
+        data = _encoded(_noise_image((400, 400)), "PNG")
+        spec = ImageSpec(max_side=100, max_bytes=1024 * 1024)
+
+        with patch.object(image_prep, "_process", wraps=image_prep._process) as process:
+            first = prepare_ref_image(ReferenceImage(data=data, mime="image/png"), spec)
+            second = prepare_ref_image(ReferenceImage(data=data, mime="image/png"), spec)
+
+        process.assert_called_once()
+        self.assertEqual(first.data, second.data)
+
+    def test_undecodable_image_falls_back_to_original(self):
+        image = ReferenceImage(data=b"not-an-image", mime="image/png")
+
+        self.assertIs(prepare_ref_image(image, ImageSpec(max_side=100, max_bytes=4)), image)
+
+
+if __name__ == "__main__":
+    unittest.main()
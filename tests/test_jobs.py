@@ -0,0 +1,83 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app import thread_pool
+from app.api import Api
+from app.jobs import JOB_DONE, JOB_RUNNING, JobRegistry
+
+
+class JobRegistryTests(unittest.TestCase):
+    def setUp(self):
+        thread_pool.init_pool(2)
+        self.jobs = JobRegistry()
+        self.done = threading.Event()
+        patcher = patch("app.jobs.task_events.push", side_effect=lambda *_: self.done.set())
+        self.push = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        thread_pool.shutdown_pool()
+
+    def test_result_is_returned_once_after_completion(self):
+        release = threading.Event()
+
+        def _work(value):
+            release.wait(5)
+            return {"ok": True, "value": value}
+
+        job_id = self.jobs.submit("work", _work, 7)
+        self.assertNotEqual(self.jobs.get(job_id).status, JOB_DONE)
+
+        release.set()
+        self.assertTrue(self.done.wait(5))
+
+        job = self.jobs.get(job_id)
+        self.assertEqual(job.status, JOB_DONE)
+        self.assertEqual(job.result, {"ok": True, "value": 7})
+        self.assertIsNone(self.jobs.get(job_id))
+        self.push.assert_called_once_with("glin:job-done", {"job_id": job_id, "ok": True})
+
+    def test_exception_becomes_failed_result(self):
+        def _boom():
+            raise RuntimeError("boom")
+
+        job_id = self.jobs.submit("boom", _boom)
+        self.assertTrue(self.done.wait(5))
+
+        self.assertEqual(self.jobs.get(job_id).result, {"ok": False, "msg": "boom"})
+
+    def test_jobs_wait_for_free_pool_slot(self):
+        release = threading.Event()
+        blockers = [thread_pool.submit_bounded(release.wait, 5) for _ in range(2)]
+
+        job_id = self.jobs.submit("work", lambda: {"ok": True})
+        self.assertFalse(self.done.wait(0.1))
+        self.assertNotIn(self.jobs.get(job_id).status, (JOB_RUNNING, JOB_DONE))
+
+        release.set()
+        for future in blockers:
+            future.result(timeout=5)
+        self.assertTrue(self.done.wait(5))
+
+
+class ApiJobTests(unittest.TestCase):
+    def test_start_job_rejects_unknown_method(self):
+        result = Api().start_job("delete_all_video_tasks")
+
+        self.assertFalse(result["ok"])
+
+    def test_get_job_returns_wrapped_result(self):
+        job = MagicMock(status=JOB_DONE, result={"ok": True, "image_url": "x"})
+        with patch("app.api.job_registry.get", return_value=job):
+            result = Api().get_job("job_1")
+
+        self.assertEqual(result, {"ok": True, "status": JOB_DONE, "result": {"ok": True, "image_url": "x"}})
+
+    def test_get_job_reports_missing_job(self):
+        with patch("app.api.job_registry.get", return_value=None):
+            self.assertFalse(Api().get_job("job_404")["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
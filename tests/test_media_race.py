@@ -0,0 +1,106 @@
+import threading
+import unittest
+from concurrent.futures import Future
+from pathlib import Path
+from unittest.mock import patch
+
+from app.services import media_generation
+from app.services.media_generation import (
+    BaseVideoGenerator,
+    MediaGenerationRegistry,
+    VideoGenerationRequest,
+    VideoGenerationResult,
+    VideoSubmission,
+)
+from app.services.provider_health import ProviderHealth
+
+
+class _FakeGenerator(BaseVideoGenerator):
+    supports_resume = True
+
+    def __init__(self, platform: str, provider: str, configured: bool = True):
+        self.platform = platform
+        self.provider = provider
+        self.configured = configured
+        self.watch_future = Future()
+        self.submit_result = VideoSubmission(success=True, remote_task_id=f"{provider}_task")
+        self.fetched = []
+
+    def is_configured(self, settings: dict) -> bool:
+        return self.configured
+
+    def generate(self, request, settings):
+        raise AssertionError("race mode should use submit/watch")
+
+    def submit(self, request, settings):
+        return self.submit_result
+
+    def watch(self, remote_task_id, settings):
+        return self.watch_future
+
+    def fetch(self, video_url, download_dir, settings):
+        self.fetched.append(video_url)
+        return str(Path(download_dir) / "video.mp4")
+
+
+class MediaRaceTests(unittest.TestCase):
+    def setUp(self):
+        self.registry = MediaGenerationRegistry()
+        self.primary = _FakeGenerator("veo3", "a")
+        self.same_platform = _FakeGenerator("veo3", "b")
+        self.other_platform = _FakeGenerator("sora2", "c")
+        self.unconfigured = _FakeGenerator("veo3", "d", configured=False)
+        for generator in (self.primary, self.other_platform, self.unconfigured, self.same_platform):
+            self.registry.register_video(generator)
+
+    def test_resolve_prefers_same_platform_and_respects_fan_out(self):
+        contestants = self.registry.resolve_race_generators({}, "veo3", "a", fan_out=2)
+
+        self.assertEqual(contestants, [self.primary, self.same_platform])
+
+    def test_resolve_skips_other_platforms_and_open_circuits(self):
+        contestants = self.registry.resolve_race_generators({}, "veo3", "a", fan_out=3)
+        self.assertNotIn(self.other_platform, contestants)
+
+        health = ProviderHealth(cooldown_seconds=60)
+        for _ in range(3):
+            health.record_failure(self.same_platform.key, "timeout")
+        with patch.object(media_generation, "provider_health", health):
+            contestants = self.registry.resolve_race_generators({}, "veo3", "a", fan_out=3)
+
+        self.assertEqual(contestants, [self.primary])
+
+    def test_first_successful_contestant_wins_and_only_winner_downloads(self):
+        request = VideoGenerationRequest(prompt="p", ref_images=[], download_dir=Path("/tmp/race"))
+        self.primary.watch_future.set_result(VideoGenerationResult(success=False, error_message="boom"))
+        timer = threading.Timer(
+            0.05,
+            self.same_platform.watch_future.set_result,
+            args=(VideoGenerationResult(success=True, video_url="https://b/video.mp4"),),
+        )
+        timer.start()
+
+        race = self.registry.race_video(request, {}, [self.primary, self.same_platform, self.other_platform])
+
+        self.assertTrue(race.result.success)
+        self.assertIs(race.winner, self.same_platform)
+        self.assertEqual(self.same_platform.fetched, ["https://b/video.mp4"])
+        self.assertEqual(self.primary.fetched, [])
+        self.assertTrue(self.other_platform.watch_future.cancelled())
+
+    def test_all_contestants_failing_reports_errors(self):
+        request = VideoGenerationRequest(prompt="p", ref_images=[])
+        self.primary.submit_result = VideoSubmission(success=False, error_message="no quota")
+        self.same_platform.watch_future.set_result(VideoGenerationResult(success=False, error_message="timeout"))
+
+        with patch("app.services.media_generation.logger"):
+            race = self.registry.race_video(request, {}, [self.primary, self.same_platform])
+
+        self.assertFalse(race.result.success)
+        self.assertIsNone(race.winner)
+        self.assertIn("veo3/a: no quota", race.result.error_message)
+        self.assertIn("veo3/b: timeout", race.result.error_message)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from app.services.multipart import MultipartEncoder
+
+
+class MultipartEncoderTests(unittest.TestCase):
+    def setUp(self):
+        handle = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
+        handle.write(b"0123456789" * 1000)
+        handle.close()
+        self.path = handle.name
+        self.addCleanup(os.remove, self.path)
+
+    def _encoder(self) -> MultipartEncoder:
+        return MultipartEncoder(
+            fields=[("model", "sora-2"), ("prompt", "一只猫")],
+            files=[("input_reference", "ref.png", self.path, None)],
+            boundary="b",
+        )
+
+    def test_body_matches_multipart_layout(self):
+        expected = (
+            b'--b\r\nContent-Disposition: form-data; name="model"\r\n\r\nsora-2\r\n'
+            b'--b\r\nContent-Disposition: form-data; name="prompt"\r\n\r\n' + "一只猫".encode("utf-8") + b"\r\n"
+            b'--b\r\nContent-Disposition: form-data; name="input_reference"; filename="ref.png"\r\n'
+            b"Content-Type: image/png\r\n\r\n" + b"0123456789" * 1000 + b"\r\n--b--\r\n"
+        )
+
+        encoder = self._encoder()
+
+        self.assertEqual(len(encoder), len(expected))
+        self.assertEqual(encoder.to_bytes(), expected)
+        self.assertEqual(encoder.content_type, "multipart/form-data; boundary=b")
+
+    def test_file_is_read_lazily_in_chunks(self):
+        with patch("builtins.open", wraps=open) as mock_open:
+            encoder = self._encoder()
+            mock_open.assert_not_called()
+
+            chunks = list(iter(lambda: encoder.read(333), b""))
+
+        self.assertTrue(all(len(chunk) <= 333 for chunk in chunks))
+        self.assertEqual(b"".join(chunks), encoder.to_bytes())
+        self.assertIsNone(encoder._handle)
+
+    def test_seek_allows_resending_from_any_offset(self):
+        encoder = self._encoder()
+        full = encoder.to_bytes()
+
+        encoder.seek(200)
+        self.assertEqual(encoder.read(50), full[200:250])
+        encoder.seek(0)
+        self.assertEqual(encoder.read(), full)
+        self.assertEqual(encoder.tell(), len(full))
+
+    def test_requests_sends_content_length_instead_of_chunked(self):
+        encoder = self._encoder()
+
+        prepared = requests.Request(
+            "POST", "https://example.com/upload", data=encoder, headers={"Content-Type": encoder.content_type}
+        ).prepare()
+
+        self.assertIs(prepared.body, encoder)
+        self.assertEqual(prepared.headers["Content-Length"], str(len(encoder)))
+        self.assertNotIn("Transfer-Encoding", prepared.headers)
+
+    def test_in_memory_source_and_truncated_file(self):
+        encoder = MultipartEncoder(files=[("file", "a.jpg", b"jpeg", "image/jpeg")], boundary="b")
+        self.assertIn(b"Content-Type: image/jpeg\r\n\r\njpeg\r\n", encoder.to_bytes())
+
+        encoder = self._encoder()
+        with open(self.path, "wb") as handle:
+            handle.write(b"short")
+        with self.assertRaises(OSError):
+            encoder.read()
+
+
+if __name__ == "__main__":
+    unittest.main()
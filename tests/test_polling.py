@@ -0,0 +1,142 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from app.services.polling import (
+    AdaptivePollSchedule,
+    CompletionHistory,
+    PollPending,
+    RemoteTaskPoller,
+    parse_progress,
+)
+
+
+class RemoteTaskPollerTests(unittest.TestCase):
+    def setUp(self):
+        self.poller = RemoteTaskPoller(io_workers=2)
+
+    def test_wait_returns_first_non_none_outcome(self):
+        outcomes = iter([None, None, "done"])
+        calls = []
+
+        def _check():
+            calls.append(1)
+            return next(outcomes)
+
+        result = self.poller.wait(_check, interval_seconds=0, timeout_seconds=5)
+
+        self.assertEqual(result, "done")
+        self.assertEqual(len(calls), 3)
+
+    def test_wait_returns_default_on_timeout(self):
+        result = self.poller.wait(lambda: None, interval_seconds=0.01, timeout_seconds=0.05, default="timeout")
+
+        self.assertEqual(result, "timeout")
+
+    def test_check_exception_propagates_to_waiter(self):
+        def _check():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            self.poller.wait(_check, interval_seconds=0, timeout_seconds=5)
+
+    def test_watch_resolves_many_tasks_concurrently(self):
+        futures = [
+            self.poller.watch(lambda i=i: i, interval_seconds=0, timeout_seconds=5)
+            for i in range(50)
+        ]
+
+        self.assertEqual([future.result(timeout=5) for future in futures], list(range(50)))
+        self.assertEqual(self.poller.pending_count, 0)
+
+    @patch("app.services.polling._MIN_SAMPLE_SECONDS", 0)
+    def test_poll_pending_keeps_polling_and_records_successful_duration(self):
+        outcomes = iter([PollPending(30), PollPending(80), "done"])
+
+        result = self.poller.wait(lambda: next(outcomes), interval_seconds=0, timeout_seconds=5, key="demo")
+
+        self.assertEqual(result, "done")
+        self.assertEqual(len(self.poller.schedule.history._samples["demo"]), 1)
+
+    @patch("app.services.polling._MIN_SAMPLE_SECONDS", 0)
+    def test_resumed_watch_is_not_recorded(self):
+        future = self.poller.watch(lambda: "done", interval_seconds=0, timeout_seconds=5, key="demo", record_history=False)
+
+        self.assertEqual(future.result(timeout=5), "done")
+        self.assertNotIn("demo", self.poller.schedule.history._samples)
+
+    def test_progress_callback_fires_only_on_change(self):
+        outcomes = iter([PollPending(30), PollPending(30), PollPending(None), PollPending(80), "done"])
+        reported = []
+
+        future = self.poller.watch(
+            lambda: next(outcomes), interval_seconds=0, timeout_seconds=5, on_progress=reported.append
+        )
+
+        self.assertEqual(future.result(timeout=5), "done")
+        self.assertEqual(reported, [30, 80])
+
+    def test_failed_outcome_is_not_recorded(self):
+        self.poller.wait(lambda: "failed", interval_seconds=0, timeout_seconds=5, key="demo", succeeded=lambda r: False)
+
+        self.assertNotIn("demo", self.poller.schedule.history._samples)
+
+
+class AdaptivePollScheduleTests(unittest.TestCase):
+    def setUp(self):
+        self.schedule = AdaptivePollSchedule(CompletionHistory())
+
+    def test_parse_progress_accepts_common_formats(self):
+        self.assertEqual(parse_progress("45%"), 45)
+        self.assertEqual(parse_progress(60), 60)
+        self.assertEqual(parse_progress(0.5), 50)
+        self.assertIsNone(parse_progress("pending"))
+        self.assertIsNone(parse_progress(None))
+
+    def test_falls_back_to_base_interval_without_signal(self):
+        self.assertEqual(self.schedule.next_interval("demo", elapsed=30, progress=None, base_interval=10), 10)
+
+    def test_progress_stretches_early_and_tightens_late_intervals(self):
+        early = self.schedule.next_interval("demo", elapsed=60, progress=10, base_interval=10)
+        late = self.schedule.next_interval("demo", elapsed=300, progress=95, base_interval=10)
+
+        self.assertEqual(early, 60)
+        self.assertAlmostEqual(late, 300 * 5 / 95 / 2)
+
+    def test_history_median_drives_interval(self):
+        for duration in (200, 220, 240):
+            self.schedule.history.record("demo", duration)
+
+        self.assertEqual(self.schedule.next_interval("demo", elapsed=10, progress=None, base_interval=10), 60)
+        self.assertEqual(self.schedule.next_interval("demo", elapsed=190, progress=None, base_interval=10), 15)
+        self.assertEqual(self.schedule.next_interval("demo", elapsed=230, progress=None, base_interval=10), 5)
+        self.assertEqual(self.schedule.next_interval("demo", elapsed=400, progress=None, base_interval=10), 2.5)
+
+    def test_zero_base_interval_never_sleeps(self):
+        self.assertEqual(self.schedule.next_interval("demo", elapsed=10, progress=10, base_interval=0), 0)
+
+    def test_history_ignores_near_zero_and_negative_durations(self):
+        for duration in (0.0, 0.3, -5.0, 200.0):
+            self.schedule.history.record("demo", duration)
+
+        self.assertEqual(list(self.schedule.history._samples["demo"]), [200.0])
+
+    def test_history_persists_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "poll_history.json"
+            for duration in (10.0, 12.0, 14.0):
+                CompletionHistory(path).record("demo", duration)
+
+            self.assertEqual(CompletionHistory(path).quantiles("demo"), (12.0, 14.0))
+
+    def test_loading_drops_zero_samples_from_old_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "poll_history.json"
+            path.write_text('{"VeoZyg": [0.0, 0.0, 0.0, 180.0]}', encoding="utf-8")
+
+            self.assertIsNone(CompletionHistory(path).quantiles("VeoZyg"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from app.services import media_generation
+from app.services.provider_health import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    ProviderHealth,
+    classify_error,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ProviderHealthTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        self.health = ProviderHealth(cooldown_seconds=60, clock=self.clock)
+
+    def test_consecutive_failures_open_circuit_until_cooldown(self):
+        for _ in range(3):
+            self.health.record_failure("veo3/a", "轮询视频结果超时", 600)
+
+        self.assertEqual(self.health.state("veo3/a"), STATE_OPEN)
+        self.assertFalse(self.health.is_available("veo3/a"))
+
+        self.clock.now += 61
+        self.assertEqual(self.health.state("veo3/a"), STATE_HALF_OPEN)
+        self.assertTrue(self.health.is_available("veo3/a"))
+
+    def test_half_open_failure_reopens_and_success_closes(self):
+        for _ in range(3):
+            self.health.record_failure("veo3/a", "boom")
+        self.clock.now += 61
+
+        self.health.record_failure("veo3/a", "boom")
+        self.assertEqual(self.health.state("veo3/a"), STATE_OPEN)
+
+        self.clock.now += 61
+        self.health.record_success("veo3/a", 120)
+        self.assertEqual(self.health.state("veo3/a"), STATE_CLOSED)
+
+    def test_half_open_lets_only_one_concurrent_probe_through(self):
+        for _ in range(3):
+            self.health.record_failure("veo3/a", "boom")
+        self.clock.now += 61
+
+        barrier = threading.Barrier(2)
+        allowed = []
+
+        def call():
+            barrier.wait()
+            allowed.append(self.health.is_available("veo3/a"))
+
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(allowed), [False, True])
+        self.assertEqual(self.health.state("veo3/a"), STATE_HALF_OPEN)
+
+        self.health.record_success("veo3/a", 10)
+        self.assertTrue(self.health.is_available("veo3/a"))
+        self.assertTrue(self.health.is_available("veo3/a"))
+
+    def test_failed_probe_reopens_and_abandoned_probe_is_released(self):
+        for _ in range(3):
+            self.health.record_failure("veo3/a", "boom")
+        self.clock.now += 61
+        self.assertTrue(self.health.is_available("veo3/a"))
+
+        self.health.record_failure("veo3/a", "boom")
+        self.assertFalse(self.health.is_available("veo3/a"))
+
+        self.clock.now += 61
+        self.assertTrue(self.health.is_available("veo3/a"))
+        # 视频生成远长于冷却期，试探未回报前名额不能被别人抢走
+        self.clock.now += 900
+        self.assertFalse(self.health.is_available("veo3/a"))
+        self.clock.now += 901
+        self.assertTrue(self.health.is_available("veo3/a"))
+
+    def test_config_errors_do_not_open_circuit(self):
+        for _ in range(6):
+            self.health.record_failure("veo3/a", "未配置 XBS API Key，请前往设置页面配置")
+
+        self.assertEqual(self.health.state("veo3/a"), STATE_CLOSED)
+        self.assertEqual(self.health.snapshot()["veo3/a"]["errors"], {"config": 6})
+
+        self.health.record_failure("veo3/a", "boom")
+        self.health.record_failure("veo3/a", "boom")
+        self.assertEqual(self.health.state("veo3/a"), STATE_CLOSED)
+
+    def test_failure_rate_over_window_opens_circuit(self):
+        for success in (True, False, True, False, True, False):
+            if success:
+                self.health.record_success("sora2/b", 100)
+            else:
+                self.health.record_failure("sora2/b", "HTTP 500")
+
+        self.assertEqual(self.health.state("sora2/b"), STATE_OPEN)
+        snapshot = self.health.snapshot()["sora2/b"]
+        self.assertEqual(snapshot["success_rate"], 0.5)
+        self.assertEqual(snapshot["avg_latency"], 100)
+
+    def test_classify_error(self):
+        self.assertEqual(classify_error("轮询视频结果超时"), "timeout")
+        self.assertEqual(classify_error("未配置 XBS API Key"), "config")
+        self.assertEqual(classify_error("HTTP 401 Unauthorized"), "auth")
+        self.assertEqual(classify_error("HTTP 429 rate limit"), "quota")
+        self.assertEqual(classify_error("something"), "error")
+
+
+class _Generator(media_generation.BaseVideoGenerator):
+    platform = "veo3"
+
+    def __init__(self, provider: str):
+        self.provider = provider
+
+    def is_configured(self, settings: dict) -> bool:
+        return True
+
+    def generate(self, request, settings):
+        raise NotImplementedError
+
+
+class HealthAwareRoutingTests(unittest.TestCase):
+    def setUp(self):
+        self.health = ProviderHealth(cooldown_seconds=60)
+        self.registry = media_generation.MediaGenerationRegistry()
+        self.first = _Generator("a")
+        self.second = _Generator("b")
+        self.registry.register_video(self.first)
+        self.registry.register_video(self.second)
+
+    def test_open_circuit_falls_back_to_same_platform(self):
+        for _ in range(3):
+            self.health.record_failure(self.first.key, "timeout")
+
+        with patch.object(media_generation, "provider_health", self.health):
+            generator, platform, provider = self.registry.resolve_video_generator({}, "veo3", "a")
+
+        self.assertIs(generator, self.second)
+        self.assertEqual((platform, provider), ("veo3", "b"))
+
+    def test_all_open_keeps_requested_provider(self):
+        for generator in (self.first, self.second):
+            for _ in range(3):
+                self.health.record_failure(generator.key, "timeout")
+
+        with patch.object(media_generation, "provider_health", self.health):
+            generator, _, _ = self.registry.resolve_video_generator({}, "veo3", "a")
+
+        self.assertIs(generator, self.first)
+
+    def test_half_open_probe_goes_to_one_request_only(self):
+        clock = _Clock()
+        self.health = ProviderHealth(cooldown_seconds=60, clock=clock)
+        for _ in range(3):
+            self.health.record_failure(self.first.key, "timeout")
+        clock.now += 61
+
+        with patch.object(media_generation, "provider_health", self.health):
+            probe, _, _ = self.registry.resolve_video_generator({}, "veo3", "a")
+            other, _, _ = self.registry.resolve_video_generator({}, "veo3", "a")
+
+        self.assertIs(probe, self.first)
+        self.assertIs(other, self.second)
+
+
+if __name__ == "__main__":
+    unittest.main()
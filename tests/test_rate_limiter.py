@@ -0,0 +1,112 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.services import http_client
+from app.services.rate_limiter import RateLimit, RateLimiter, RateLimiterRegistry, parse_overrides
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+class RateLimiterTests(unittest.TestCase):
+    def test_token_bucket_queues_requests_beyond_rate(self):
+        clock = _FakeClock()
+        limiter = RateLimiter(RateLimit(rpm=60), clock=clock, sleep=clock.sleep)
+
+        for _ in range(3):
+            limiter.acquire()
+            limiter.release()
+
+        self.assertEqual(clock.sleeps, [1.0, 1.0])
+
+    def test_waiters_reserve_successive_tokens(self):
+        clock = _FakeClock()
+        limiter = RateLimiter(RateLimit(rpm=120), clock=clock, sleep=lambda seconds: clock.sleeps.append(seconds))
+
+        delays = [limiter._reserve_token() for _ in range(4)]
+
+        self.assertEqual(delays, [0.0, 0.0, 0.5, 1.0])
+
+    def test_max_in_flight_blocks_until_release(self):
+        limiter = RateLimiter(RateLimit(max_in_flight=1))
+        limiter.acquire()
+        entered = threading.Event()
+
+        def _second():
+            with limiter.slot():
+                entered.set()
+
+        worker = threading.Thread(target=_second)
+        worker.start()
+        self.assertFalse(entered.wait(0.05))
+        self.assertEqual(limiter.waiting, 1)
+
+        limiter.release()
+        self.assertTrue(entered.wait(1))
+        worker.join(1)
+
+
+class RateLimiterRegistryTests(unittest.TestCase):
+    def test_overrides_are_keyed_by_host_and_unlimited_hosts_skip_limiter(self):
+        registry = RateLimiterRegistry()
+        registry.configure(RateLimit(), parse_overrides("https://API.example.com 30 2\n# comment\nbad x"))
+
+        limiter = registry.get("https://api.example.com/v1/videos/task_1")
+
+        self.assertEqual(limiter.limit, RateLimit(30, 2))
+        self.assertIs(limiter, registry.get("https://api.example.com/v1/videos"))
+        self.assertIsNone(registry.get("https://cdn.example.com/file.mp4"))
+
+    def test_configure_from_settings_applies_default_limit(self):
+        registry = RateLimiterRegistry()
+        registry.configure_from_settings({"rate_limit_rpm": "90", "rate_limit_max_in_flight": "abc"})
+
+        self.assertEqual(registry.get("https://other.example.com").limit, RateLimit(90, 0))
+
+    def test_configure_from_settings_follows_settings_version(self):
+        registry = RateLimiterRegistry()
+        registry.configure_from_settings({"rate_limit_rpm": "90"}, version=1)
+        limiter = registry.get("https://api.example.com")
+
+        with patch.object(registry, "configure", wraps=registry.configure) as configure:
+            registry.configure_from_settings({"rate_limit_rpm": "30"}, version=1)
+            registry.configure_from_settings({"rate_limit_rpm": "90", "theme": "dark"}, version=2)
+            configure.assert_not_called()
+            self.assertIs(registry.get("https://api.example.com"), limiter)
+
+            registry.configure_from_settings({"rate_limit_rpm": "30"}, version=3)
+
+        configure.assert_called_once()
+        self.assertEqual(registry.get("https://api.example.com").limit, RateLimit(30, 0))
+
+
+class HttpClientThrottleTests(unittest.TestCase):
+    def test_requests_go_through_limiter_unless_throttle_disabled(self):
+        registry = RateLimiterRegistry()
+        registry.configure(RateLimit(max_in_flight=1))
+        session = MagicMock()
+
+        with patch.object(http_client, "rate_limiters", registry), \
+                patch.object(http_client, "get_session", return_value=session), \
+                patch.object(registry, "limit", wraps=registry.limit) as mock_limit:
+            http_client.post("https://api.example.com/v1", json={})
+            http_client.get("https://cdn.example.com/file.mp4", throttle=False)
+
+        mock_limit.assert_called_once_with("https://api.example.com/v1")
+        session.post.assert_called_once_with("https://api.example.com/v1", json={})
+        session.get.assert_called_once_with("https://cdn.example.com/file.mp4")
+
+
+if __name__ == "__main__":
+    unittest.main()
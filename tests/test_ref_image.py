@@ -0,0 +1,72 @@
+import base64
+import gc
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.services.media_generation import VideoGenerationRequest
+from app.services.ref_image import ReferenceImage, coerce_ref_images, load_ref_images
+
+
+class ReferenceImageTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
+        self._tmp.write(b"png-bytes")
+        self._tmp.close()
+        self.path = self._tmp.name
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_path_image_reads_file_once_and_encodes_lazily(self):
+        image = ReferenceImage.from_path(self.path)
+        self.assertEqual(image.mime, "image/png")
+
+        with patch("builtins.open", wraps=open) as mock_open:
+            self.assertEqual(image.data_url, "data:image/png;base64," + base64.b64encode(b"png-bytes").decode())
+            self.assertEqual(image.base64, base64.b64encode(b"png-bytes").decode())
+            self.assertEqual(image.data, b"png-bytes")
+
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertEqual(os.fspath(image), self.path)
+
+    def test_base64_image_materializes_temp_file_only_on_demand(self):
+        image = ReferenceImage.from_base64(base64.b64encode(b"jpeg-bytes").decode(), "image/jpeg")
+        self.assertIsNone(image._temp_path)
+
+        temp_path = os.fspath(image)
+
+        self.assertTrue(temp_path.endswith(".jpg"))
+        with open(image, "rb") as handle:
+            self.assertEqual(handle.read(), b"jpeg-bytes")
+
+        del image
+        gc.collect()
+        self.assertFalse(os.path.exists(temp_path))
+
+    def test_supports_legacy_dict_access(self):
+        image = ReferenceImage.coerce({"base64": base64.b64encode(b"x").decode(), "mime": "image/webp"})
+
+        self.assertEqual(image.get("mime", "image/jpeg"), "image/webp")
+        self.assertEqual(image["base64"], base64.b64encode(b"x").decode())
+        self.assertIsNone(image.get("url"))
+
+    def test_requests_coerce_ref_images_and_drop_empty_entries(self):
+        request = VideoGenerationRequest(
+            prompt="p",
+            ref_images=[{"base64": ""}, {"base64": "eA==", "mime": "image/png"}, self.path],
+        )
+
+        self.assertEqual(len(request.ref_images), 2)
+        self.assertTrue(all(isinstance(image, ReferenceImage) for image in request.ref_images))
+        self.assertEqual(coerce_ref_images(None), [])
+
+    def test_load_ref_images_skips_missing_files(self):
+        self.assertEqual(load_ref_images(""), [])
+        self.assertEqual(load_ref_images("/nonexistent/file.png"), [])
+        self.assertEqual(load_ref_images(self.path)[0].path, self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import base64
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.services.result_cache import ResultCache, get_result_cache, make_cache_key
+
+
+class ResultCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _make_file(self, name: str, size: int) -> str:
+        path = self.root / name
+        path.write_bytes(os.urandom(size))
+        return str(path)
+
+    def test_key_depends_on_ref_image_bytes_and_params(self):
+        image_a = [{"base64": base64.b64encode(b"a").decode(), "mime": "image/png"}]
+        image_b = [{"base64": base64.b64encode(b"b").decode(), "mime": "image/png"}]
+
+        key = make_cache_key("video", "sora2", "dayangyu", "prompt", image_a, orientation="portrait", duration=10)
+
+        self.assertEqual(key, make_cache_key("video", "sora2", "dayangyu", "prompt", image_a, duration=10, orientation="portrait"))
+        self.assertNotEqual(key, make_cache_key("video", "sora2", "dayangyu", "prompt", image_b, orientation="portrait", duration=10))
+        self.assertNotEqual(key, make_cache_key("video", "sora2", "dayangyu", "prompt", image_a, orientation="portrait", duration=15))
+
+    def test_put_then_get_and_materialize(self):
+        cache = ResultCache(self.root / "cache", max_bytes=1024 * 1024)
+        source = self._make_file("video.mp4", 128)
+
+        cache.put("abcdef", source, video_url="https://example.com/v.mp4")
+        cached = cache.get("abcdef")
+
+        self.assertEqual(cached.video_url, "https://example.com/v.mp4")
+        target = cache.materialize(cached, self.root / "downloads", "sora2")
+        self.assertEqual(Path(target).read_bytes(), Path(source).read_bytes())
+        self.assertIsNone(cache.get("missing"))
+
+    def test_evicts_least_recently_used_entries(self):
+        cache = ResultCache(self.root / "cache", max_bytes=2500)
+        cache.put("aa0001", self._make_file("1.png", 1000))
+        cache.put("bb0002", self._make_file("2.png", 1000))
+        old = cache._meta_path("aa0001")
+        os.utime(old, (1, 1))
+        cache.get("bb0002")
+
+        cache.put("cc0003", self._make_file("3.png", 1000))
+
+        self.assertIsNone(cache.get("aa0001"))
+        self.assertIsNotNone(cache.get("bb0002"))
+        self.assertIsNotNone(cache.get("cc0003"))
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(get_result_cache({}, self.root))
+        cache = get_result_cache({"result_cache_enabled": "true", "result_cache_max_mb": "10"}, self.root)
+        self.assertEqual(cache.max_bytes, 10 * 1024 * 1024)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import base64
+import json
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.services.nanobanana.glin import NanoBananaGlinCustom
+from app.services.sse import ContentBuffer, MarkdownImageBuffer, iter_chat_deltas, iter_sse_data
+from app.services.veo.hetang import VeoHetang
+
+
+def _event(content: str = "", **delta) -> bytes:
+    if content:
+        delta["content"] = content
+    return f"data: {json.dumps({'choices': [{'delta': delta}]})}\n\n".encode("utf-8")
+
+
+def _response(chunks: list) -> MagicMock:
+    response = MagicMock()
+    response.consumed = 0
+
+    def _iter_content(chunk_size=None):
+        for chunk in chunks:
+            response.consumed += 1
+            yield chunk
+
+    response.iter_content.side_effect = _iter_content
+    return response
+
+
+class IterSseDataTests(unittest.TestCase):
+    def test_lines_split_across_chunks_and_crlf(self):
+        response = _response([b"data: {\"a\"", b": 1}\r\n\r\n: ping\n", b"data:[1]\n", b"event: x\ndata: tail"])
+
+        self.assertEqual(list(iter_sse_data(response)), ['{"a": 1}', "[1]", "tail"])
+
+    def test_stops_at_done(self):
+        response = _response([b"data: 1\n\ndata: [DONE]\n\n", b"data: 2\n\n"])
+
+        self.assertEqual(list(iter_sse_data(response)), ["1"])
+        self.assertEqual(response.consumed, 1)
+
+    def test_chat_deltas_skip_invalid_events(self):
+        response = _response([b"data: not-json\n\n", b'data: {"choices": []}\n\n', _event("hi")])
+
+        self.assertEqual(list(iter_chat_deltas(response)), [{"content": "hi"}])
+
+
+class ContentBufferTests(unittest.TestCase):
+    def test_recent_and_getvalue(self):
+        buffer = ContentBuffer()
+        for part in ("abc", "", "def", "gh"):
+            buffer.append(part)
+
+        self.assertEqual(len(buffer), 8)
+        self.assertEqual(buffer.recent(3), "fgh")
+        self.assertEqual(buffer.recent(100), "abcdefgh")
+        self.assertEqual(buffer.getvalue(), "abcdefgh")
+
+    def test_markdown_image_detected_across_pieces(self):
+        buffer = MarkdownImageBuffer()
+        pieces = ["好的 !", "[image", "]", "(", "data:image/png;base64,", "QUJD", "REVG", ") 之后的文字"]
+        states = []
+        for piece in pieces:
+            buffer.append(piece)
+            states.append(buffer.complete)
+
+        self.assertEqual(states, [False] * 7 + [True])
+        self.assertEqual(buffer.image_src(), "data:image/png;base64,QUJDREVG")
+
+    def test_markdown_image_requires_link_after_alt_text(self):
+        buffer = MarkdownImageBuffer()
+        buffer.append("(说明) ![a](")
+        self.assertFalse(buffer.complete)
+        buffer.append(" https://cdn/x.png )")
+
+        self.assertEqual(buffer.image_src(), "https://cdn/x.png")
+
+
+class StreamingProviderTests(unittest.TestCase):
+    @patch("app.services.veo.hetang.http_client.post")
+    def test_hetang_closes_stream_once_video_tag_arrives(self, mock_post):
+        response = _response([
+            _event(reasoning_content="生成中"),
+            _event("<video src='https://cdn/"),
+            _event("v.mp4' controls></video>"),
+            _event("剩余内容"),
+            b"data: [DONE]\n\n",
+        ])
+        mock_post.return_value = response
+
+        result = VeoHetang("key", "https://hetang").generate("p")
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.video_url, "https://cdn/v.mp4")
+        self.assertEqual(response.consumed, 3)
+        response.close.assert_called_once()
+
+    @patch("app.services.nanobanana.glin.http_client.post")
+    def test_glin_extracts_streamed_base64_image_and_stops_early(self, mock_post):
+        image = base64.b64encode(b"png-bytes" * 100).decode()
+        image_events = [_event(image[i:i + 100]) for i in range(0, len(image), 100)]
+        response = _response(
+            [_event("![image](data:image/png;base64,")] + image_events + [_event(")"), _event("多余内容")]
+        )
+        mock_post.return_value = response
+
+        result = NanoBananaGlinCustom("key", "https://hetang").generate("p")
+
+        self.assertTrue(result.success)
+        self.assertEqual(result.mime_type, "image/png")
+        self.assertEqual(result.image_bytes, b"png-bytes" * 100)
+        self.assertEqual(response.consumed, len(image_events) + 2)
+        response.close.assert_called_once()
+
+    @patch("app.services.nanobanana.glin.http_client.post")
+    def test_glin_writes_line_wrapped_base64_as_decoded_bytes(self, mock_post):
+        image = base64.b64encode(b"\x89PNG" + bytes(range(256)) * 4).decode()
+        wrapped = "\r\n ".join(image[i:i + 76] for i in range(0, len(image), 76))
+        mock_post.return_value = _response([_event(f"![image](data:image/png;base64,{wrapped})")])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            result = NanoBananaGlinCustom("key", "https://hetang").generate("p", download_dir=tmp)
+
+            self.assertTrue(result.success)
+            with open(result.file_path, "rb") as handle:
+                self.assertEqual(handle.read(), b"\x89PNG" + bytes(range(256)) * 4)
+        self.assertEqual(result.image_data, image)
+
+
+if __name__ == "__main__":
+    unittest.main()
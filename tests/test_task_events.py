@@ -0,0 +1,57 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from app.task_events import TaskEventBroadcaster
+
+
+def _pushed(window) -> list:
+    script = window.evaluate_js.call_args.args[0]
+    return json.loads(script[script.index("detail: ") + len("detail: "):-3])
+
+
+class TaskEventBroadcasterTests(unittest.TestCase):
+    def setUp(self):
+        self.events = TaskEventBroadcaster()
+        self.window = MagicMock()
+        self.events._window = self.window
+
+    def test_events_for_same_task_are_coalesced_into_one_push(self):
+        self.events.publish_update(1, progress=10)
+        self.events.publish_update(1, progress=40)
+        self.events.publish_update(1, status="completed", video_url="https://cdn/v.mp4", updated_at="x")
+        self.events.publish_update(2, progress=5)
+
+        self.assertEqual(self.events.flush(), 2)
+
+        self.window.evaluate_js.assert_called_once()
+        self.assertEqual(_pushed(self.window), [
+            {"id": 1, "progress": 40, "status": "completed", "video_url": "https://cdn/v.mp4", "event": "completed"},
+            {"id": 2, "progress": 5, "event": "progress"},
+        ])
+
+    def test_created_task_stays_created_until_pushed(self):
+        self.events.publish(3, "created", status="pending")
+        self.events.publish(3, "processing", status="processing")
+
+        self.events.flush()
+
+        self.assertEqual(_pushed(self.window), [{"id": 3, "status": "processing", "event": "created"}])
+
+    def test_clear_drops_pending_events_and_nothing_is_pushed_when_idle(self):
+        self.events.publish_update(1, progress=10)
+        self.events.publish(0, "cleared")
+
+        self.events.flush()
+        self.assertEqual(_pushed(self.window), [{"id": 0, "event": "cleared"}])
+        self.assertEqual(self.events.flush(), 0)
+
+    def test_events_are_dropped_without_window(self):
+        self.events.detach()
+        self.events.publish_update(1, progress=10)
+
+        self.assertEqual(self.events.flush(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
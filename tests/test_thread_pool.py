@@ -0,0 +1,66 @@
+import threading
+import unittest
+
+from app import thread_pool
+
+
+class ThreadPoolBoundedSubmitTests(unittest.TestCase):
+    def setUp(self):
+        thread_pool.init_pool(2)
+
+    def tearDown(self):
+        thread_pool.shutdown_pool()
+
+    def test_acquire_slot_times_out_when_all_workers_busy(self):
+        release = threading.Event()
+        futures = [thread_pool.submit_bounded(release.wait, 5) for _ in range(2)]
+
+        self.assertFalse(thread_pool.acquire_slot(timeout=0.05))
+        self.assertEqual(thread_pool.get_pool_stats()["active"], 2)
+
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+
+        self.assertTrue(thread_pool.acquire_slot(timeout=1))
+        thread_pool.release_slot()
+
+    def test_slot_is_released_when_task_raises(self):
+        def _boom():
+            raise RuntimeError("boom")
+
+        future = thread_pool.submit_bounded(_boom)
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+
+        stats = thread_pool.get_pool_stats()
+        self.assertEqual(stats["active"], 0)
+        self.assertEqual(stats["max_workers"], 2)
+
+
+class DownloadPoolTests(unittest.TestCase):
+    def setUp(self):
+        thread_pool.init_download_pool(1)
+
+    def tearDown(self):
+        thread_pool.shutdown_pool()
+
+    def test_downloads_queue_beyond_pool_size_without_touching_generation_slots(self):
+        release = threading.Event()
+        futures = [thread_pool.submit_download(release.wait, 5) for _ in range(3)]
+
+        self.assertIsNone(thread_pool.get_pool())
+        for _ in range(50):
+            if thread_pool.get_download_pool_stats()["active"] == 1:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(thread_pool.get_download_pool_stats(), {"max_workers": 1, "active": 1, "queued": 2})
+
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(thread_pool.get_download_pool_stats()["queued"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app import video_scanner
+from app.services.media_generation import VideoSubmission
+
+
+class VideoScannerDispatchTests(unittest.TestCase):
+    def setUp(self):
+        self._drain_queue()
+
+    def tearDown(self):
+        self._drain_queue()
+
+    def _drain_queue(self):
+        while not video_scanner._dispatch_queue.empty():
+            video_scanner._dispatch_queue.get_nowait()
+        video_scanner._queued_ids.clear()
+
+    def test_enqueue_ignores_duplicate_task_ids(self):
+        self.assertTrue(video_scanner.enqueue_video_task(1))
+        self.assertFalse(video_scanner.enqueue_video_task(1))
+        self.assertTrue(video_scanner.enqueue_video_task(2))
+
+        self.assertEqual(video_scanner.get_dispatch_queue_size(), 2)
+
+    @patch("app.video_scanner.submit_reserved")
+    @patch("app.video_scanner.acquire_slot", return_value=True)
+    @patch("app.video_scanner.get_pool")
+    @patch("app.video_scanner.claim_video_task")
+    def test_dispatch_submits_claimed_task_to_pool(self, mock_claim, mock_get_pool, mock_acquire, mock_submit):
+        task = MagicMock(id=7)
+        mock_claim.return_value = task
+
+        video_scanner._dispatch_task(7)
+
+        mock_acquire.assert_called_once_with()
+        mock_claim.assert_called_once_with(7)
+        mock_submit.assert_called_once_with(video_scanner._process_task, task)
+
+    @patch("app.video_scanner.release_slot")
+    @patch("app.video_scanner.submit_reserved")
+    @patch("app.video_scanner.acquire_slot", return_value=True)
+    @patch("app.video_scanner.get_pool")
+    @patch("app.video_scanner.claim_video_task")
+    def test_dispatch_releases_slot_when_task_already_claimed(
+        self, mock_claim, mock_get_pool, mock_acquire, mock_submit, mock_release
+    ):
+        mock_claim.return_value = None
+
+        video_scanner._dispatch_task(7)
+
+        mock_submit.assert_not_called()
+        mock_release.assert_called_once_with()
+
+    @patch("app.video_scanner.get_pending_video_tasks")
+    def test_reconcile_enqueues_only_missing_pending_tasks(self, mock_pending):
+        video_scanner.enqueue_video_task(3)
+        mock_pending.return_value = [MagicMock(id=3), MagicMock(id=4)]
+
+        added = video_scanner._reconcile_pending_tasks()
+
+        self.assertEqual(added, 1)
+        self.assertEqual(video_scanner.get_dispatch_queue_size(), 2)
+
+    @patch("app.video_scanner.task_events")
+    @patch("app.video_scanner.update_video_task")
+    def test_update_publishes_only_when_row_matched(self, mock_update, mock_events):
+        mock_update.return_value = 1
+        video_scanner._update_task(7, progress=40)
+        mock_events.publish_update.assert_called_once_with(7, progress=40)
+
+        mock_events.reset_mock()
+        mock_update.return_value = 0
+        video_scanner._update_task(8, status="failed")
+        mock_events.publish_update.assert_not_called()
+
+
+
+class VideoScannerResumeTests(unittest.TestCase):
+    def _make_generator(self):
+        generator = MagicMock()
+        generator.key = "sora2/dayangyu"
+        generator.supports_resume = True
+        return generator
+
+    @patch("app.video_scanner._track_remote_task")
+    @patch("app.video_scanner.update_video_task")
+    @patch("app.video_scanner._build_request")
+    @patch("app.video_scanner._resolve_task_generator")
+    @patch("app.video_scanner.get_all_settings", return_value={})
+    def test_process_task_persists_remote_id_right_after_submit(
+        self, mock_settings, mock_resolve, mock_build, mock_update, mock_track
+    ):
+        generator = self._make_generator()
+        generator.submit.return_value = VideoSubmission(success=True, remote_task_id="remote_1")
+        mock_resolve.return_value = (generator, "sora2", "dayangyu")
+
+        video_scanner._process_task(MagicMock(id=5))
+
+        mock_update.assert_called_once_with(5, remote_task_id="remote_1", generator_key="sora2/dayangyu")
+        mock_track.assert_called_once_with(5, generator, "remote_1", {})
+        generator.generate.assert_not_called()
+
+    @patch("app.video_scanner.submit_download")
+    @patch("app.video_scanner.update_video_task")
+    @patch("app.video_scanner._build_request")
+    @patch("app.video_scanner._resolve_task_generator")
+    @patch("app.video_scanner.get_all_settings", return_value={})
+    def test_immediate_video_url_is_handed_to_download_pool(
+        self, mock_settings, mock_resolve, mock_build, mock_update, mock_submit_download
+    ):
+        generator = self._make_generator()
+        generator.submit.return_value = VideoSubmission(success=True, video_url="https://cdn/v.mp4")
+        mock_resolve.return_value = (generator, "sora2", "dayangyu")
+
+        video_scanner._process_task(MagicMock(id=6))
+
+        mock_update.assert_called_once_with(
+            6, remote_task_id="", generator_key="sora2/dayangyu", video_url="https://cdn/v.mp4"
+        )
+        mock_submit_download.assert_called_once_with(
+            video_scanner._download_and_complete, 6, generator, "https://cdn/v.mp4", {}
+        )
+        generator.fetch.assert_not_called()
+
+    @patch("app.video_scanner.submit_download")
+    @patch("app.video_scanner.update_video_task")
+    @patch("app.video_scanner.get_all_settings", return_value={})
+    @patch("app.video_scanner.get_processing_video_tasks")
+    @patch("app.video_scanner.media_generation_registry")
+    def test_resume_redownloads_tasks_with_known_video_url(
+        self, mock_registry, mock_processing, mock_settings, mock_update, mock_submit_download
+    ):
+        generator = self._make_generator()
+        mock_registry.get_video_generator.return_value = generator
+        mock_processing.return_value = [
+            MagicMock(id=3, remote_task_id="remote_3", generator_key="sora2/dayangyu", video_url="https://cdn/v.mp4")
+        ]
+
+        video_scanner._resume_processing_tasks()
+
+        mock_submit_download.assert_called_once_with(
+            video_scanner._download_and_complete, 3, generator, "https://cdn/v.mp4", {}
+        )
+        generator.watch.assert_not_called()
+
+    @patch("app.video_scanner.enqueue_video_task")
+    @patch("app.video_scanner._track_remote_task")
+    @patch("app.video_scanner.update_video_task")
+    @patch("app.video_scanner.get_all_settings", return_value={})
+    @patch("app.video_scanner.get_processing_video_tasks")
+    def test_resume_polls_persisted_remote_tasks_instead_of_resubmitting(
+        self, mock_processing, mock_settings, mock_update, mock_track, mock_enqueue
+    ):
+        resumable = MagicMock(id=1, remote_task_id="remote_1", generator_key="sora2/dayangyu", video_url="")
+        unsubmitted = MagicMock(id=2, remote_task_id="", generator_key="", video_url="")
+        mock_processing.return_value = [resumable, unsubmitted]
+
+        video_scanner._resume_processing_tasks()
+
+        self.assertEqual(mock_track.call_count, 1)
+        self.assertEqual(mock_track.call_args.args[0], 1)
+        self.assertEqual(mock_track.call_args.args[2], "remote_1")
+        self.assertTrue(mock_track.call_args.kwargs["resumed"])
+        mock_update.assert_called_once_with(2, status="pending", remote_task_id="", generator_key="")
+        mock_enqueue.assert_called_once_with(2)
+
+    @patch("app.video_scanner.threading.Timer")
+    @patch("app.video_scanner.provider_health")
+    @patch("app.video_scanner.update_video_task")
+    @patch("app.video_scanner.get_all_settings", return_value={"auto_retry": "true", "video_max_retry": "2"})
+    def test_retry_clears_stale_remote_task_and_video_url(self, mock_settings, mock_update, mock_health, mock_timer):
+        video_scanner._retry_attempts.pop(5, None)
+
+        video_scanner._fail_task(5, "veo/zyg", "视频生成失败")
+
+        mock_update.assert_called_once_with(
+            5, status="pending", remote_task_id="", video_url="", generator_key="", progress=0
+        )
+        mock_timer.return_value.start.assert_called_once_with()
+        video_scanner._retry_attempts.pop(5, None)
+
+    @patch("app.video_scanner.threading.Timer")
+    @patch("app.video_scanner.provider_health")
+    @patch("app.video_scanner.update_video_task")
+    @patch("app.video_scanner.get_media_download_dir", return_value="/d")
+    def test_download_failure_retries_only_the_download(self, mock_dir, mock_update, mock_health, mock_timer):
+        video_scanner._download_attempts.pop(8, None)
+        generator = MagicMock(key="veo3/zyg")
+        generator.fetch.side_effect = TimeoutError("cdn timeout")
+
+        video_scanner._download_and_complete(8, generator, "https://cdn/v.mp4", {})
+
+        mock_update.assert_not_called()
+        mock_health.record_failure.assert_not_called()
+        self.assertEqual(
+            mock_timer.call_args.kwargs["args"],
+            (video_scanner._download_and_complete, 8, generator, "https://cdn/v.mp4", {}),
+        )
+        mock_timer.return_value.start.assert_called_once_with()
+
+        video_scanner._download_attempts[8] = video_scanner._DOWNLOAD_MAX_RETRY
+        video_scanner._download_and_complete(8, generator, "https://cdn/v.mp4", {})
+
+        mock_update.assert_called_once_with(8, status="failed")
+        mock_health.record_failure.assert_not_called()
+        self.assertNotIn(8, video_scanner._download_attempts)
+
+    @patch("app.video_scanner.update_video_task")
+    @patch("app.video_scanner.get_media_download_dir", return_value="/d")
+    def test_successful_download_completes_with_local_path(self, mock_dir, mock_update):
+        generator = MagicMock(key="veo3/zyg")
+        generator.fetch.return_value = "/d/v.mp4"
+
+        video_scanner._download_and_complete(9, generator, "https://cdn/v.mp4", {})
+
+        mock_update.assert_called_once_with(
+            9, status="completed", video_url="https://cdn/v.mp4", video_path="/d/v.mp4", progress=100
+        )
+
+
+    @patch("app.video_scanner.get_all_settings", return_value={"rate_limit_rpm": "60"})
+    @patch("app.video_scanner.get_settings_version", return_value=7)
+    def test_sync_settings_reconfigures_rate_limits_by_version(self, mock_version, mock_settings):
+        with patch("app.video_scanner.rate_limiters") as mock_limiters:
+            video_scanner._sync_settings()
+
+        mock_limiters.configure_from_settings.assert_called_once_with({"rate_limit_rpm": "60"}, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,7 @@ from app.services.media_generation import media_generation_registry
 
 
 class GptImageXiaobanshouTests(unittest.TestCase):
-    @patch("app.services.gpt_image.xiaobanshou.requests.post")
+    @patch("app.services.gpt_image.xiaobanshou.requests.Session.post")
     def test_generate_uses_gpt_image_async_videos_contract(self, mock_post):
         service = GptImageXiaobanshou("test-key")
 
@@ -35,7 +35,7 @@ class GptImageXiaobanshouTests(unittest.TestCase):
         self.assertEqual(kwargs["json"]["metadata"]["size"], "1920x1080")
         self.assertEqual(kwargs["json"]["metadata"]["urls"], [])
 
-    @patch("app.services.gpt_image.xiaobanshou.requests.post")
+    @patch("app.services.gpt_image.xiaobanshou.requests.Session.post")
     def test_generate_puts_reference_images_in_metadata_urls(self, mock_post):
         service = GptImageXiaobanshou("test-key")
 
@@ -7,7 +7,7 @@ from app.services.nanobanana.xiaobanshou import NanoBananaXiaobanshou
 
 
 class NanoBananaXiaobanshouTests(unittest.TestCase):
-    @patch("app.services.nanobanana.xiaobanshou.requests.post")
+    @patch("app.services.nanobanana.xiaobanshou.requests.Session.post")
     def test_generate_uses_json_contract_from_docs(self, mock_post):
         service = NanoBananaXiaobanshou("test-key")
 
@@ -43,7 +43,7 @@ class NanoBananaXiaobanshouTests(unittest.TestCase):
             "data:image/jpeg;base64,AAA",
         )
 
-    @patch("app.services.nanobanana.xiaobanshou.requests.post")
+    @patch("app.services.nanobanana.xiaobanshou.requests.Session.post")
     def test_generate_parses_live_queued_shape(self, mock_post):
         service = NanoBananaXiaobanshou("test-key")
 
@@ -76,7 +76,7 @@ class NanoBananaXiaobanshouTests(unittest.TestCase):
         self.assertEqual(result.image_data, "QUJD")
         mock_poll.assert_called_once_with("task_l9p1L6ZzyJ6t5ZNx36wJS35uL3GjHDai")
 
-    @patch("app.services.nanobanana.xiaobanshou.requests.post")
+    @patch("app.services.nanobanana.xiaobanshou.requests.Session.post")
     def test_generate_extracts_real_unauthorized_error_shape(self, mock_post):
         service = NanoBananaXiaobanshou("test-key")
 
@@ -106,7 +106,7 @@ class NanoBananaXiaobanshouTests(unittest.TestCase):
         self.assertFalse(result.success)
         self.assertIn("无效的令牌", result.error_message)
 
-    @patch("app.services.nanobanana.xiaobanshou.requests.get")
+    @patch("app.services.nanobanana.xiaobanshou.requests.Session.get")
     def test_extract_result_parses_live_completed_video_url_shape(self, mock_get):
         service = NanoBananaXiaobanshou("test-key")
 
@@ -8,7 +8,7 @@ from app.services.sora2.xiaobanshou import Sora2Xiaobanshou
 
 
 class Sora2XiaobanshouTests(unittest.TestCase):
-    @patch("app.services.sora2.xiaobanshou.requests.post")
+    @patch("app.services.sora2.xiaobanshou.requests.Session.post")
     def test_text_create_uses_json_contract_from_docs(self, mock_post):
         service = Sora2Xiaobanshou("test-key")
 
@@ -34,7 +34,7 @@ class Sora2XiaobanshouTests(unittest.TestCase):
         self.assertEqual(kwargs["json"]["model"], "sora-2-portrait-10s")
         self.assertEqual(kwargs["json"]["prompt"], "a cat in a garden")
 
-    @patch("app.services.sora2.xiaobanshou.requests.post")
+    @patch("app.services.sora2.xiaobanshou.requests.Session.post")
     def test_text_create_parses_live_success_shape(self, mock_post):
         service = Sora2Xiaobanshou("test-key")
 
@@ -64,7 +64,7 @@ class Sora2XiaobanshouTests(unittest.TestCase):
         self.assertEqual(result.progress, 0)
         self.assertEqual(result.created_at, "1774004442")
 
-    @patch("app.services.sora2.xiaobanshou.requests.post")
+    @patch("app.services.sora2.xiaobanshou.requests.Session.post")
     def test_text_create_extracts_real_unauthorized_error_shape(self, mock_post):
         service = Sora2Xiaobanshou("test-key")
 
@@ -91,7 +91,7 @@ class Sora2XiaobanshouTests(unittest.TestCase):
         self.assertEqual(result.status, Sora2TaskStatus.FAILED)
         self.assertIn("无效的令牌", result.error_message)
 
-    @patch("app.services.sora2.xiaobanshou.requests.get")
+    @patch("app.services.sora2.xiaobanshou.requests.Session.get")
     def test_query_task_parses_live_completed_shape(self, mock_get):
         service = Sora2Xiaobanshou("test-key")
 
@@ -123,7 +123,7 @@ class Sora2XiaobanshouTests(unittest.TestCase):
         self.assertEqual(result.created_at, "1774004442")
         self.assertEqual(result.completed_at, "1774004604")
 
-    @patch("app.services.sora2.xiaobanshou.requests.get")
+    @patch("app.services.sora2.xiaobanshou.requests.Session.get")
     def test_query_task_keeps_polling_on_connection_reset(self, mock_get):
         service = Sora2Xiaobanshou("test-key")
 
@@ -137,7 +137,7 @@ class Sora2XiaobanshouTests(unittest.TestCase):
         self.assertEqual(result.status, Sora2TaskStatus.PROCESSING)
         self.assertIn("Connection aborted", result.error_message)
 
-    @patch("app.services.sora2.xiaobanshou.requests.get")
+    @patch("app.services.sora2.xiaobanshou.requests.Session.get")
     def test_get_video_content_parses_live_binary_download(self, mock_get):
         service = Sora2Xiaobanshou("test-key")
 
@@ -4,14 +4,18 @@ from unittest.mock import MagicMock, patch
 
 from app.constants import SettingKeys
 from app.services.media_generation import media_generation_registry
+from app.services.polling import CompletionHistory, remote_task_poller
 from app.services.veo.xiaobanshou import VeoXiaobanshou
 
 
 class VeoXiaobanshouTests(unittest.TestCase):
     def setUp(self):
         self.service = VeoXiaobanshou("test-key")
+        history = patch.object(remote_task_poller.schedule, "history", CompletionHistory())
+        history.start()
+        self.addCleanup(history.stop)
 
-    @patch("app.services.veo.xiaobanshou.requests.post")
+    @patch("app.services.veo.xiaobanshou.requests.Session.post")
     def test_submit_task_uses_multipart_contract_for_text_video(self, mock_post):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -40,7 +44,7 @@ class VeoXiaobanshouTests(unittest.TestCase):
         self.assertEqual(self.service._encode_form_value("一只可爱的小猫"), "一只可爱的小猫".encode("utf-8"))
 
     @patch("app.services.veo.xiaobanshou.VeoXiaobanshou._poll_task")
-    @patch("app.services.veo.xiaobanshou.requests.post")
+    @patch("app.services.veo.xiaobanshou.requests.Session.post")
     def test_generate_image_video_uses_fl_model_and_input_reference_array_field(self, mock_post, mock_poll_task):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -67,7 +71,7 @@ class VeoXiaobanshouTests(unittest.TestCase):
         self.assertEqual(len(file_fields), 1)
         self.assertEqual(file_fields[0][0], "input_reference[]")
 
-    @patch("app.services.veo.xiaobanshou.requests.get")
+    @patch("app.services.veo.xiaobanshou.requests.Session.get")
     def test_poll_task_reads_completed_url_field(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 200
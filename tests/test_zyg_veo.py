@@ -4,14 +4,19 @@ from unittest.mock import MagicMock, patch
 
 from app.constants import SettingKeys
 from app.services.media_generation import ZygVeoGenerator, media_generation_registry
+from app.services.multipart import MultipartEncoder
+from app.services.polling import CompletionHistory, remote_task_poller
 from app.services.veo.zyg import VeoZyg
 
 
 class VeoZygTests(unittest.TestCase):
     def setUp(self):
         self.service = VeoZyg("test-key")
+        history = patch.object(remote_task_poller.schedule, "history", CompletionHistory())
+        history.start()
+        self.addCleanup(history.stop)
 
-    @patch("app.services.veo.zyg.requests.post")
+    @patch("app.services.veo.zyg.requests.Session.post")
     def test_submit_task_uses_multipart_contract_for_text_video(self, mock_post):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -31,8 +36,9 @@ class VeoZygTests(unittest.TestCase):
         _, kwargs = mock_post.call_args
         self.assertEqual(kwargs["headers"]["Authorization"], "Bearer test-key")
         self.assertIn("multipart/form-data; boundary=", kwargs["headers"]["Content-Type"])
-        body = kwargs["data"]
-        self.assertIsInstance(body, bytes)
+        self.assertIsInstance(kwargs["data"], MultipartEncoder)
+        body = kwargs["data"].to_bytes()
+        self.assertEqual(len(body), len(kwargs["data"]))
         self.assertIn(b'name="model"', body)
         self.assertIn(b"veo_3_1-fast", body)
         self.assertIn(b'name="prompt"', body)
@@ -46,7 +52,7 @@ class VeoZygTests(unittest.TestCase):
         self.assertEqual(self.service._encode_form_value("一只可爱的小猫"), "一只可爱的小猫".encode("utf-8"))
 
     @patch("app.services.veo.zyg.VeoZyg._poll_task")
-    @patch("app.services.veo.zyg.requests.post")
+    @patch("app.services.veo.zyg.requests.Session.post")
     def test_generate_image_video_uses_fl_model_and_input_reference_array_field(self, mock_post, mock_poll_task):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -64,11 +70,12 @@ class VeoZygTests(unittest.TestCase):
                 orientation="landscape",
                 ref_image_path=tmp.name,
             )
+            # 请求体在发送时才读取文件，需在临时文件删除前读出
+            body = mock_post.call_args.kwargs["data"].to_bytes()
 
-        _, kwargs = mock_post.call_args
-        body = kwargs["data"]
         self.assertIn(b"veo_3_1-fast-fl", body)
         self.assertIn(b'Content-Disposition: form-data; name="input_reference[]";', body)
+        self.assertIn(b"Content-Type: image/png\r\n\r\nfake-image\r\n", body)
 
     def test_build_multipart_body_supports_chinese_prompt(self):
         body, content_type = self.service._build_multipart_body(
@@ -80,9 +87,9 @@ class VeoZygTests(unittest.TestCase):
         )
 
         self.assertIn("multipart/form-data; boundary=", content_type)
-        self.assertIn("一只可爱的小猫".encode("utf-8"), body)
+        self.assertIn("一只可爱的小猫".encode("utf-8"), body.to_bytes())
 
-    @patch("app.services.veo.zyg.requests.get")
+    @patch("app.services.veo.zyg.requests.Session.get")
     def test_poll_task_reads_completed_url_field(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -147,6 +154,24 @@ class ZygVeoGeneratorValidationTests(unittest.TestCase):
         self.assertFalse(result.success)
         self.assertIn("ZYG API Key 配置异常", result.error_message)
 
+    @patch("app.services.veo.zyg.VeoZyg._submit_task", return_value="task_zyg_456")
+    def test_submit_returns_remote_task_id_without_polling(self, mock_submit_task):
+        generator = ZygVeoGenerator()
+        submission = generator.submit(
+            request=MagicMock(
+                prompt="test",
+                ref_images=[],
+                orientation="portrait",
+                duration=10,
+                download_dir=None,
+            ),
+            settings={SettingKeys.ZYG_API_KEY: "test-key"},
+        )
+
+        self.assertTrue(submission.success)
+        self.assertEqual(submission.remote_task_id, "task_zyg_456")
+        mock_submit_task.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()